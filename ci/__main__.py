@@ -1,6 +1,7 @@
 import argparse
 import os
 import subprocess
+import sys
 
 PACKAGE_FOLDER = os.path.join(os.path.dirname(__file__), '../snakegame')
 
@@ -13,13 +14,47 @@ def test():
     subprocess.run(['python', '-m', 'unittest', 'discover', PACKAGE_FOLDER])
 
 
+def benchmark(output=None, threshold=None, save_baseline=False):
+    """Run the benchmark suite, returning non-zero if anything regressed"""
+    from ci.benchmarks import suite
+    argv = []
+    if output is not None:
+        argv += ['--output', output]
+    if threshold is not None:
+        argv += ['--threshold', str(threshold)]
+    if save_baseline:
+        argv.append('--save-baseline')
+    return suite.main(argv)
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument('--flake8', action='store_true')
     parser.add_argument('--test', action='store_true')
+    parser.add_argument(
+        '--benchmark', action='store_true',
+        help='Run the benchmarks, failing on regressions from the baseline'
+    )
+    parser.add_argument(
+        '--benchmark-output', type=str, default=None, metavar='FILE',
+        help='Write the benchmark results to FILE as JSON'
+    )
+    parser.add_argument(
+        '--benchmark-threshold', type=float, default=None,
+        help='Fraction slower than the baseline which counts as a regression'
+    )
+    parser.add_argument(
+        '--save-baseline', action='store_true',
+        help='Store the benchmark results as the new baseline'
+    )
 
     args = parser.parse_args()
     if args.flake8:
         flake8()
     if args.test:
         test()
+    if args.benchmark:
+        sys.exit(benchmark(
+            args.benchmark_output, args.benchmark_threshold,
+            args.save_baseline
+        ))
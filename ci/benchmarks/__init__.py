@@ -0,0 +1,2 @@
+"""Performance benchmarks for the game, each runnable as a module e.g.
+`python -m ci.benchmarks.bench_food_respawn`"""
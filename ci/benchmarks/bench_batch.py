@@ -0,0 +1,93 @@
+"""Measure the throughput of the batch engine in game ticks per second"""
+import argparse
+import random
+import time
+
+import numpy as np
+
+from snakegame.model import Game, Simulation, Snake
+from snakegame.model.batch import BatchGame, NO_ACTION
+from snakegame.model.util import DIRECTIONS, Point
+
+BATCH_SIZES = [1, 64, 1024, 4096]
+
+
+def make_game(seed=0):
+    """The two player layout used by snakegame.main"""
+    game = Game(dimensions=(12, 12), rng=random.Random(seed))
+    game.add_snake(Snake('snake1', [[3, 3], [3, 4], [3, 5]]))
+    game.add_snake(Snake('snake2', [[7, 8], [7, 7], [7, 6]]))
+    game.add_food(Point(5, 6))
+    return game
+
+
+def random_actions(rng, shape, turn_probability=0.2):
+    """Mostly carry straight on, occasionally turning"""
+    actions = rng.integers(0, len(DIRECTIONS), size=shape)
+    actions[rng.random(shape) > turn_probability] = NO_ACTION
+    return actions
+
+
+def run_batch(n_games, n_ticks, seed=0):
+    """Games ticks per second for the batch engine, resetting finished games
+    so the batch stays full"""
+    rng = np.random.default_rng(seed)
+    batch = BatchGame.repeat(make_game(), n_games, rng=seed)
+    actions = [random_actions(rng, (n_games, 2)) for _ in range(n_ticks)]
+    game_ticks = 0
+    start = time.perf_counter()
+    for tick_actions in actions:
+        game_ticks += int((~batch.done).sum())
+        done = batch.step(tick_actions)
+        if done.any():
+            batch.reset(done)
+    return game_ticks / (time.perf_counter() - start)
+
+
+def run_scalar(n_ticks, seed=0):
+    """Game ticks per second stepping Game objects one at a time"""
+    rng = np.random.default_rng(seed)
+    actions = random_actions(rng, (n_ticks, 2))
+    sim = Simulation(make_game(seed))
+    start = time.perf_counter()
+    for tick_actions in actions:
+        sim.step({
+            snake: DIRECTIONS[action]
+            for snake, action in zip(sim.game.snakes, tick_actions)
+            if action != NO_ACTION
+        })
+        if sim.finished:
+            sim = Simulation(make_game(seed))
+    return n_ticks / (time.perf_counter() - start)
+
+
+def run(batch_sizes=BATCH_SIZES, n_ticks=200):
+    """Time the scalar engine and the batch engine at each batch size
+
+    Returns
+    -------
+    list(dict)
+        One result per engine configuration
+    """
+    results = [{'engine': 'scalar', 'games': 1,
+                'game_ticks_per_s': run_scalar(n_ticks * 10)}]
+    for n_games in batch_sizes:
+        results.append({'engine': 'batch', 'games': n_games,
+                        'game_ticks_per_s': run_batch(n_games, n_ticks)})
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=BATCH_SIZES)
+    parser.add_argument('--ticks', type=int, default=200)
+    args = parser.parse_args()
+    for result in run(args.sizes, args.ticks):
+        print(
+            f"{result['engine']:>6} x{result['games']:<5} "
+            f"{result['game_ticks_per_s']:12.0f} game ticks/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
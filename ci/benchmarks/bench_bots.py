@@ -0,0 +1,82 @@
+"""Measure how long each bot takes to decide on a move"""
+import argparse
+import random
+import time
+
+from snakegame.bots import HamiltonianCycle, PathFinder, greedy
+from snakegame.model import Game, Snake
+from snakegame.model.util import Point
+
+BOTS = {
+    'greedy': lambda: greedy,
+    'path': PathFinder,
+    'hamiltonian': HamiltonianCycle,
+}
+
+
+def make_game(size, seed=0):
+    """A square board with one snake in the top left corner and one food"""
+    game = Game(dimensions=(size, size), rng=random.Random(seed))
+    game.add_snake(Snake('bot', [[1, 1], [2, 1], [3, 1]]))
+    game.add_food(Point(size // 2, size // 2))
+    return game
+
+
+def time_bot(make_bot, size, n_ticks, seed=0):
+    """Per decision times in microseconds, over a game or n_ticks"""
+    game = make_game(size, seed)
+    snake = game.snakes[0]
+    bot = make_bot()
+    times = []
+    while game.snakes and len(times) < n_ticks:
+        start = time.perf_counter()
+        direction = bot(game, snake)
+        times.append((time.perf_counter() - start) * 1e6)
+        if direction is not None:
+            snake.set_direction(direction)
+        game.update()
+    return times, game.score[snake]
+
+
+def run(bots=tuple(BOTS), size=100, n_ticks=2000):
+    """Time each bot
+
+    Returns
+    -------
+    list(dict)
+        One result per bot, times in microseconds per decision
+    """
+    results = []
+    for name in bots:
+        times, score = time_bot(BOTS[name], size, n_ticks)
+        times.sort()
+        results.append({
+            'bot': name,
+            'size': size,
+            'decisions': len(times),
+            'score': score,
+            'mean_us': sum(times) / len(times),
+            'p99_us': times[int(0.99 * (len(times) - 1))],
+            'max_us': times[-1],
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--bots', nargs='+', choices=BOTS, default=list(BOTS))
+    parser.add_argument('--size', type=int, default=100)
+    parser.add_argument('--ticks', type=int, default=2000)
+    args = parser.parse_args()
+    for result in run(args.bots, args.size, args.ticks):
+        print(
+            f"{result['bot']:>12} {result['size']}x{result['size']} "
+            f"mean: {result['mean_us']:8.1f} us  "
+            f"p99: {result['p99_us']:8.1f} us  "
+            f"max: {result['max_us']:8.1f} us  "
+            f"({result['decisions']} decisions, score {result['score']})"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""Measure how the cost of a game tick scales with the number of snakes"""
+import argparse
+import random
+import time
+
+from snakegame.model import Game, Snake
+from snakegame.model.game import (
+    BOUNDARY, SELF_COLLISION, SNAKE_COLLISION, TOO_SHORT
+)
+from snakegame.model.util import Point
+
+SNAKE_COUNTS = [2, 10, 50, 100, 250, 500]
+SNAKE_LENGTH = 5
+
+
+def make_game(n_snakes, n_ticks, seed=0):
+    """A board with a row for each snake, long enough for them all to run
+    right for n_ticks without reaching the far wall"""
+    width = SNAKE_LENGTH + n_ticks + 2
+    game = Game(dimensions=(width, 2 * n_snakes + 1), rng=random.Random(seed))
+    for i in range(n_snakes):
+        y = 2 * i + 1
+        game.add_snake(Snake(
+            name=f'snake{i}',
+            start_points=[[x, y] for x in range(1, SNAKE_LENGTH + 1)]
+        ))
+    for i in range(n_snakes):
+        game.add_food(Point(SNAKE_LENGTH + 1 + i % n_ticks, 2 * i + 2))
+    return game
+
+
+def legacy_update(game):
+    """Game.update as it was before the collision index, checking every
+    snake against every other one"""
+    game.ticks += 1
+    for snake in game.snakes:
+        snake.move()
+    to_remove = {}
+    for snake in game.snakes:
+        if snake.head in game.food:
+            game.remove_food(snake.head)
+            game.score[snake] += 1
+            snake.grow_next_turn()
+            game.spawn_food()
+        if not game.in_bounds(snake.head):
+            to_remove.setdefault(snake, BOUNDARY)
+        if snake.collided_with_self():
+            to_remove.setdefault(snake, SELF_COLLISION)
+        for othersnake in game.snakes:
+            if snake == othersnake:
+                continue
+            if othersnake.blocks(snake.head):
+                to_remove.setdefault(snake, SNAKE_COLLISION)
+            elif snake.head == othersnake.tail:
+                snake.grow_next_turn()
+                othersnake.lose_tail()
+    for snake in game.snakes:
+        if len(snake.points) < 2:
+            to_remove.setdefault(snake, TOO_SHORT)
+    for snake, reason in to_remove.items():
+        game.remove_snake(snake)
+        game.deaths[snake] = (game.ticks, reason)
+
+
+def time_ticks(n_snakes, n_ticks, update):
+    """Microseconds per tick"""
+    game = make_game(n_snakes, n_ticks)
+    start = time.perf_counter()
+    for _ in range(n_ticks):
+        update(game)
+    elapsed = time.perf_counter() - start
+    assert len(game.snakes) == n_snakes
+    return elapsed / n_ticks * 1e6
+
+
+def run(counts=SNAKE_COUNTS, n_ticks=50, legacy=False):
+    """Time ticks for each number of snakes
+
+    Returns
+    -------
+    list(dict)
+        One result per snake count, times in microseconds per tick
+    """
+    # Warm up, so the first count isn't charged for filling caches
+    time_ticks(counts[0], n_ticks, Game.update)
+    results = []
+    for n_snakes in counts:
+        result = {
+            'snakes': n_snakes,
+            'tick_us': time_ticks(n_snakes, n_ticks, Game.update),
+        }
+        if legacy:
+            result['legacy_tick_us'] = time_ticks(
+                n_snakes, n_ticks, legacy_update
+            )
+        results.append(result)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        '--snakes', type=int, nargs='+', default=SNAKE_COUNTS
+    )
+    parser.add_argument('--ticks', type=int, default=50)
+    parser.add_argument(
+        '--legacy', action='store_true',
+        help='Also time the original all-pairs collision checks'
+    )
+    args = parser.parse_args()
+    for result in run(args.snakes, args.ticks, args.legacy):
+        line = f"{result['snakes']:>4} snakes " \
+               f"tick: {result['tick_us']:10.1f} us " \
+               f"({result['tick_us'] / result['snakes']:6.2f} us/snake)"
+        if 'legacy_tick_us' in result:
+            line += f"  legacy: {result['legacy_tick_us']:12.1f} us"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Measure environment sample throughput, observations included"""
+import argparse
+import time
+
+import numpy as np
+
+from snakegame.env import SnakeEnv, VectorSnakeEnv
+from snakegame.model.batch import NO_ACTION
+
+N_ENVS = [1, 64, 1024, 4096]
+
+
+def random_actions(rng, shape, turn_probability=0.2):
+    """Mostly carry straight on, occasionally turning"""
+    actions = rng.integers(0, 4, size=shape)
+    actions[rng.random(shape) > turn_probability] = NO_ACTION
+    return actions
+
+
+def run_single(n_steps, seed=0):
+    """Samples per second from a SnakeEnv"""
+    rng = np.random.default_rng(seed)
+    actions = random_actions(rng, (n_steps, 2))
+    env = SnakeEnv(n_players=2)
+    env.reset(seed=seed)
+    start = time.perf_counter()
+    for step_actions in actions:
+        _, _, done, _ = env.step(step_actions)
+        if done:
+            env.reset()
+    return n_steps / (time.perf_counter() - start)
+
+
+def run_vector(n_envs, n_steps, seed=0):
+    """Samples per second from a VectorSnakeEnv"""
+    rng = np.random.default_rng(seed)
+    actions = [random_actions(rng, (n_envs, 2)) for _ in range(n_steps)]
+    env = VectorSnakeEnv(n_envs, n_players=2, seed=seed)
+    env.reset()
+    start = time.perf_counter()
+    for step_actions in actions:
+        env.step(step_actions)
+    return n_envs * n_steps / (time.perf_counter() - start)
+
+
+def run(n_envs=N_ENVS, n_steps=200):
+    """Time a single environment and vector environments of each size
+
+    Returns
+    -------
+    list(dict)
+        One result per environment configuration
+    """
+    results = [{'env': 'single', 'envs': 1,
+                'samples_per_s': run_single(n_steps * 10)}]
+    for n in n_envs:
+        results.append({'env': 'vector', 'envs': n,
+                        'samples_per_s': run_vector(n, n_steps)})
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--envs', type=int, nargs='+', default=N_ENVS)
+    parser.add_argument('--steps', type=int, default=200)
+    args = parser.parse_args()
+    for result in run(args.envs, args.steps):
+        print(
+            f"{result['env']:>6} x{result['envs']:<5} "
+            f"{result['samples_per_s']:12.0f} samples/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Measure the cost of respawning food as the board grows"""
+import argparse
+import random
+import timeit
+
+from snakegame.model import Game, Snake
+from snakegame.model.util import Point
+
+BOARD_SIZES = [12, 50, 100, 250, 500, 1000]
+
+
+def make_game(size, seed=0):
+    """A square game with a snake running along the top row and one food"""
+    game = Game(dimensions=(size, size), rng=random.Random(seed))
+    length = max(2, (size - 2) // 2)
+    game.add_snake(
+        Snake(name='snake', start_points=[[x, 1] for x in range(1, length)])
+    )
+    game.add_food(Point(size // 2, size // 2))
+    return game
+
+
+def respawn(game):
+    """Eat the first food item and place a new one, as Game.update does"""
+    game.remove_food(game.food[0])
+    game.add_food(game.grid.random_unoccupied(game.rng))
+
+
+def legacy_respawn(game):
+    """The original approach of building lists of squares for each respawn"""
+    occupied = [p for snake in game.snakes for p in snake.points] + game.food
+    unoccupied = [
+        Point(x, y) for x in range(1, game.dimension_max[0])
+        for y in range(1, game.dimension_max[1])
+        if Point(x, y) not in occupied
+    ]
+    game.remove_food(game.food[0])
+    game.add_food(game.rng.choice(unoccupied))
+
+
+def run(sizes=BOARD_SIZES, number=10000, legacy=False):
+    """Time respawns for each board size
+
+    Returns
+    -------
+    list(dict)
+        One result per board size, times in microseconds per respawn
+    """
+    results = []
+    for size in sizes:
+        game = make_game(size)
+        per_call = timeit.timeit(lambda: respawn(game), number=number)
+        result = {'size': size, 'respawn_us': per_call / number * 1e6}
+        if legacy:
+            n_legacy = 3
+            per_call = timeit.timeit(
+                lambda: legacy_respawn(game), number=n_legacy
+            )
+            result['legacy_respawn_us'] = per_call / n_legacy * 1e6
+        results.append(result)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=BOARD_SIZES)
+    parser.add_argument('--number', type=int, default=10000)
+    parser.add_argument(
+        '--legacy', action='store_true',
+        help='Also time the original list based respawn (slow on big boards)'
+    )
+    args = parser.parse_args()
+    for result in run(args.sizes, args.number, args.legacy):
+        line = f"{result['size']:>5}x{result['size']:<5} " \
+               f"respawn: {result['respawn_us']:8.2f} us"
+        if 'legacy_respawn_us' in result:
+            line += f"  legacy: {result['legacy_respawn_us']:12.2f} us"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Micro-benchmarks for Point against the original dataclass implementation"""
+import argparse
+import timeit
+from dataclasses import dataclass
+
+from snakegame.model.util import Point
+
+
+@dataclass
+class LegacyPoint:
+    """The original Point class, kept here for comparison"""
+    x: int
+    y: int
+
+    def __add__(self, other):
+        return LegacyPoint(self.x + other.x, self.y + other.y)
+
+    def __sub__(self, other):
+        return LegacyPoint(self.x - other.x, self.y - other.y)
+
+    def __iter__(self):
+        yield self.x
+        yield self.y
+
+    def __eq__(self, other):
+        return self.x == other.x and self.y == other.y
+
+    def __hash__(self):
+        return hash(tuple([self.x, self.y]))
+
+
+def cases(cls):
+    """Statements to time for a point class, as (name, callable) pairs"""
+    a, b = cls(3, 4), cls(0, 1)
+    members = {cls(x, y) for x in range(50) for y in range(50)}
+    return [
+        ('construct', lambda: cls(3, 4)),
+        ('hash', lambda: hash(a)),
+        ('add', lambda: a + b),
+        ('equal', lambda: a == b),
+        ('unpack', lambda: tuple(a)),
+        ('set_member', lambda: a in members),
+    ]
+
+
+def run(number=200000):
+    """Time each operation for the current and legacy Point classes
+
+    Returns
+    -------
+    list(dict)
+        One result per operation, times in nanoseconds per call
+    """
+    results = []
+    for (name, new), (_, old) in zip(cases(Point), cases(LegacyPoint)):
+        results.append({
+            'operation': name,
+            'point_ns': timeit.timeit(new, number=number) / number * 1e9,
+            'legacy_ns': timeit.timeit(old, number=number) / number * 1e9,
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--number', type=int, default=200000)
+    args = parser.parse_args()
+    for result in run(args.number):
+        print(
+            f"{result['operation']:>10}: {result['point_ns']:8.1f} ns  "
+            f"legacy: {result['legacy_ns']:8.1f} ns  "
+            f"({result['legacy_ns'] / result['point_ns']:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,479 @@
+"""Benchmarks for the hot paths of the game, compared against a baseline.
+
+Each benchmark reports the best time per operation, in microseconds, from
+several repeats. Results are written as JSON, and any benchmark more than a
+threshold slower than in the baseline counts as a regression.
+
+Run with `python -m ci --benchmark`, or directly with
+`python -m ci.benchmarks.suite`.
+"""
+import argparse
+import atexit
+import json
+import multiprocessing
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from unittest import mock
+
+from snakegame import bots
+from snakegame.model import Game, Simulation, Snake
+from snakegame.model.scenario import Scenario
+from snakegame.model.util import DIRECTIONS, DOWN, LEFT, Point, RIGHT, UP
+from snakegame.shared import SharedGame, SharedGameWriter
+from snakegame.view.game_view import GameView
+
+try:
+    from snakegame.env import SnakeEnv
+    from snakegame.trajectories import TrajectoryWriter
+except ImportError:
+    # numpy isn't installed
+    SnakeEnv = None
+
+#: Where the stored baseline lives
+BASELINE = os.path.join(os.path.dirname(__file__), 'baseline.json')
+#: Fraction slower than the baseline which counts as a regression
+THRESHOLD = 0.25
+#: Ticks timed in each measurement of the game and view
+MIN_TICKS = 100
+
+
+def per_call(fn, number):
+    """Microseconds per call of a function"""
+    start = time.perf_counter()
+    for _ in range(number):
+        fn()
+    return (time.perf_counter() - start) / number * 1e6
+
+
+def calibrate():
+    """Microseconds for a fixed amount of plain Python work, used to allow
+    for the speed of the machine when comparing with the baseline"""
+    def work():
+        total = 0
+        for i in range(1000):
+            total += i * i
+        return {total: total}
+    return lambda: per_call(work, 200)
+
+
+def make_game(size, n_snakes=1, length=3, seed=0):
+    """A square board with snakes on alternate rows, all heading right"""
+    if 2 * n_snakes + 1 >= size or length + 2 >= size:
+        raise ValueError(f"{n_snakes} snakes of length {length} don't fit "
+                         f"on a board of size {size}")
+    game = Game(dimensions=(size, size), rng=random.Random(seed))
+    for i in range(n_snakes):
+        y = 2 * i + 1
+        game.add_snake(Snake(
+            name=f'snake{i}',
+            start_points=[[x, y] for x in range(1, length + 1)]
+        ))
+    game.add_food(Point(size - 2, 2))
+    return game
+
+
+def time_update(size, n_snakes, length):
+    """Microseconds per Game.update, over games run for as many ticks as the
+    snakes can go before reaching the wall (up to 20)"""
+    ticks = min(20, size - length - 2)
+    games = -(-MIN_TICKS // ticks)
+
+    def measure():
+        total = 0.0
+        for _ in range(games):
+            game = make_game(size, n_snakes, length)
+            start = time.perf_counter()
+            for _ in range(ticks):
+                game.update()
+            total += time.perf_counter() - start
+        return total / (games * ticks) * 1e6
+    return measure
+
+
+def time_respawn(size):
+    """Microseconds to pick a new food square from unoccupied_squares and
+    move the food there"""
+    game = make_game(size)
+
+    def respawn():
+        game.remove_food(game.food[0])
+        game.add_food(game.rng.choice(game.unoccupied_squares))
+    return lambda: per_call(respawn, 2000)
+
+
+def time_spawn(size, n_snakes, spawn):
+    """Microseconds to set up a game, placing the snakes and 10 food items"""
+    scenario = Scenario((size, size), n_snakes, snake_length=5, spawn=spawn,
+                        food=10)
+    return lambda: per_call(lambda: scenario.make_game(random.Random(0)), 5)
+
+
+def time_trial(size, n_snakes):
+    """Microseconds to try a tick of a game and undo it, as a search would"""
+    game = make_game(size, n_snakes, length=5)
+
+    def trial():
+        with game.trial():
+            game.update()
+    return lambda: per_call(trial, 1000)
+
+
+def time_move(length):
+    """Microseconds per Snake.move of a snake with no game"""
+    snake = Snake('snake', [[x, 1] for x in range(length)])
+    snake.facing = RIGHT
+    return lambda: per_call(snake.move, 10000)
+
+
+def time_intersect(length):
+    """Microseconds per Snake.intersect with 100 points"""
+    snake = Snake('snake', [[x, 1] for x in range(length)])
+    points = [Point(x, x % 3) for x in range(100)]
+    return lambda: per_call(lambda: snake.intersect(points), 2000)
+
+
+def time_point(operation):
+    """Microseconds per Point operation"""
+    a, b = Point(3, 4), Point(0, 1)
+    operations = {
+        'add': lambda: a + b,
+        'sub': lambda: a - b,
+        'hash': lambda: hash(a),
+    }
+    return lambda: per_call(operations[operation], 100000)
+
+
+def time_import(module):
+    """Microseconds to import a module, along with everything it imports,
+    in a fresh interpreter, as reported by python -X importtime"""
+    command = [sys.executable, '-X', 'importtime', '-c', f'import {module}']
+
+    def measure():
+        report = subprocess.run(
+            command, capture_output=True, text=True, check=True
+        ).stderr
+        for line in report.splitlines():
+            _, cumulative, name = line.split('|')
+            if name.strip() == module:
+                return float(cumulative)
+        raise ValueError(f"{module} wasn't imported")
+    return measure
+
+
+def time_startup(args):
+    """Microseconds to start snake_game with some arguments and for it to
+    finish, interpreter startup included"""
+    command = [sys.executable, '-m', 'snakegame.main', *args]
+
+    def measure():
+        start = time.perf_counter()
+        subprocess.run(command, capture_output=True, check=True)
+        return (time.perf_counter() - start) * 1e6
+    return measure
+
+
+class FakeWindow:
+    """Stands in for a curses window or pad, doing as little as possible"""
+
+    def __init__(self, rows=100, columns=200):
+        self.rows, self.columns = rows, columns
+
+    def getmaxyx(self):
+        return self.rows, self.columns
+
+    def addstr(self, y, x, text, attr=0):
+        pass
+
+    def erase(self):
+        pass
+
+    def noutrefresh(self, *args):
+        pass
+
+
+def time_draw(size, incremental, terminal=(100, 200)):
+    """Microseconds per GameView.draw_game, either redrawing the view or
+    just what changed in a tick, on a terminal with some number of rows
+    and columns. The view follows the first snake."""
+    ticks = min(20, size - 5)
+    games = -(-MIN_TICKS // ticks)
+
+    def measure():
+        # Colours, pads and screen updates need a real terminal
+        with mock.patch('curses.color_pair', lambda n: n << 8), \
+                mock.patch('curses.newpad', FakeWindow), \
+                mock.patch('curses.doupdate', lambda: None):
+            return draw()
+
+    def draw():
+        total = 0.0
+        for _ in range(games):
+            game = make_game(size, n_snakes=2, length=3)
+            view = GameView(game, follow=game.snakes[0])
+            window = FakeWindow(*terminal)
+            view.draw_game(window)
+            for _ in range(ticks):
+                game.update()
+                if not incremental:
+                    view._grid = None
+                start = time.perf_counter()
+                view.draw_game(window)
+                total += time.perf_counter() - start
+        return total / (games * ticks) * 1e6
+    return measure
+
+
+def play(simulation, stop):
+    """Play a game over and over as fast as possible until told to stop"""
+    start = simulation.game.snapshot()
+    while not stop.is_set():
+        if simulation.step():
+            simulation.game.restore(start)
+
+
+def time_shared_read(size, n_snakes):
+    """Microseconds per SharedGame.read of the snakes' heads and the food,
+    while another process plays the game as fast as it can"""
+    scenario = Scenario((size, size), n_snakes, snake_length=5, food=10)
+    context = multiprocessing.get_context('fork')
+
+    def snapshot(game):
+        return game.ticks, [snake.head for snake in game.snakes], game.food
+
+    def measure():
+        game = scenario.make_game(random.Random(0))
+        simulation = Simulation(
+            game, controllers={snake: bots.greedy for snake in game.snakes}
+        )
+        stop = context.Event()
+        with SharedGameWriter(game) as writer, \
+                SharedGame(writer.name) as shared:
+            player = context.Process(target=play, args=(simulation, stop))
+            player.start()
+            try:
+                return per_call(lambda: shared.read(snapshot), 2000)
+            finally:
+                stop.set()
+                player.join()
+    return measure
+
+
+def time_trajectory(record):
+    """Microseconds per SnakeEnv.step on the classic board, along with
+    writing its observation to a trajectory if record is True. The snake
+    goes round in circles, from a new episode whenever one finishes."""
+    circle = [DIRECTIONS.index(d) for d in (DOWN, RIGHT, UP, LEFT)]
+    env = SnakeEnv(max_ticks=MIN_TICKS)
+    obs = env.reset(seed=0)
+    # One writer is kept for every measurement, as the first records
+    # written to a new shard are slow while its pages are first touched
+    directory = tempfile.mkdtemp()
+    atexit.register(shutil.rmtree, directory, ignore_errors=True)
+    writer = TrajectoryWriter(directory, obs.shape[1:])
+
+    def measure():
+        obs = env.reset()
+        start = time.perf_counter()
+        for tick in range(MIN_TICKS):
+            action = circle[tick % 4]
+            obs, rewards, done, _ = env.step(action)
+            if record:
+                writer.append(obs[0], action, rewards[0], done)
+            if done:
+                obs = env.reset()
+        return (time.perf_counter() - start) / MIN_TICKS * 1e6
+    return measure
+
+
+def benchmarks():
+    """Every benchmark, as a dict of names to functions which set it up and
+    return a function timing it, in microseconds per operation"""
+    cases = {}
+    for size, n_snakes, length in [
+        (12, 1, 3), (100, 1, 3), (1000, 1, 3), (100, 1, 80),
+        (100, 10, 5), (120, 50, 5),
+    ]:
+        cases[f'update[size={size},snakes={n_snakes},length={length}]'] = (
+            lambda a=(size, n_snakes, length): time_update(*a)
+        )
+    for size in [12, 100, 1000]:
+        cases[f'respawn[size={size}]'] = lambda s=size: time_respawn(s)
+    for size, n_snakes in [(12, 2), (100, 10)]:
+        cases[f'trial[size={size},snakes={n_snakes}]'] = (
+            lambda a=(size, n_snakes): time_trial(*a)
+        )
+    for spawn in ['random', 'lanes']:
+        cases[f'spawn[size=500,snakes=500,{spawn}]'] = (
+            lambda s=spawn: time_spawn(500, 500, s)
+        )
+    for length in [3, 100]:
+        cases[f'snake_move[length={length}]'] = (
+            lambda n=length: time_move(n)
+        )
+        cases[f'snake_intersect[length={length}]'] = (
+            lambda n=length: time_intersect(n)
+        )
+    for operation in ['add', 'sub', 'hash']:
+        cases[f'point_{operation}'] = lambda o=operation: time_point(o)
+    for size in [12, 50]:
+        cases[f'draw_full[size={size}]'] = (
+            lambda s=size: time_draw(s, False)
+        )
+        cases[f'draw_incremental[size={size}]'] = (
+            lambda s=size: time_draw(s, True)
+        )
+    # A board much bigger than the terminal, which only the view is drawn of
+    cases['draw_full[size=1000,terminal=80x24]'] = (
+        lambda: time_draw(1000, False, terminal=(24, 80))
+    )
+    cases['draw_incremental[size=1000,terminal=80x24]'] = (
+        lambda: time_draw(1000, True, terminal=(24, 80))
+    )
+    for module in ['snakegame.model', 'snakegame.main']:
+        cases[f'import[{module}]'] = lambda m=module: time_import(m)
+    cases['startup[headless,ticks=1]'] = (
+        lambda: time_startup(['--headless', '--ticks', '1', '--seed', '0'])
+    )
+    cases['shared_read[size=100,snakes=10]'] = (
+        lambda: time_shared_read(100, 10)
+    )
+    if SnakeEnv is not None:
+        for record in [False, True]:
+            cases[f'env_step[record={record}]'] = (
+                lambda r=record: time_trajectory(r)
+            )
+    return cases
+
+
+def run(select=None, repeat=5):
+    """Run the benchmarks
+
+    Parameters
+    ----------
+    select: str, optional
+        Only run benchmarks whose names contain this
+    repeat: int
+        Number of times each is measured, keeping the best. The benchmarks
+        are measured in turn, once each per round, so that a passing slow
+        patch on the machine doesn't spoil every measurement of one of them.
+
+    Returns
+    -------
+    dict
+        Microseconds per operation keyed by benchmark name under 'results',
+        along with details of the machine
+    """
+    measures = {'calibration': calibrate()}
+    for name, benchmark in benchmarks().items():
+        if select is None or select in name:
+            measures[name] = benchmark()
+    best = dict.fromkeys(measures, float('inf'))
+    for _ in range(repeat):
+        for name, measure in measures.items():
+            best[name] = min(best[name], measure())
+    return {
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'calibration': best.pop('calibration'),
+        'results': best,
+    }
+
+
+def compare(results, baseline, threshold=THRESHOLD):
+    """Find benchmarks which got slower than the baseline
+
+    Parameters
+    ----------
+    results, baseline: dict
+        Output of run
+    threshold: float
+        Fraction slower than the baseline which counts as a regression
+
+    Returns
+    -------
+    list(tuple(str, float, float))
+        The name, baseline and current time of each regression, with the
+        baseline time scaled to the speed of this machine
+    """
+    scale = _scale(results, baseline)
+    regressions = []
+    for name, current in results['results'].items():
+        before = baseline['results'].get(name)
+        if before is not None and current > before * scale * (1 + threshold):
+            regressions.append((name, before * scale, current))
+    return regressions
+
+
+def _scale(results, baseline):
+    """How much slower this machine is than the baseline's"""
+    if 'calibration' in results and 'calibration' in baseline:
+        return results['calibration'] / baseline['calibration']
+    return 1.0
+
+
+def main(argv=None):
+    """Run the suite, returning 1 if anything regressed"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        '--output', type=str, default=None, metavar='FILE',
+        help='Write the results to FILE as JSON'
+    )
+    parser.add_argument(
+        '--baseline', type=str, default=BASELINE, metavar='FILE',
+        help='Results to compare against'
+    )
+    parser.add_argument(
+        '--threshold', type=float, default=THRESHOLD,
+        help='Fraction slower than the baseline which fails, default 0.25'
+    )
+    parser.add_argument(
+        '--save-baseline', action='store_true',
+        help='Replace the baseline with these results'
+    )
+    parser.add_argument(
+        '--select', type=str, default=None,
+        help='Only run benchmarks whose names contain this'
+    )
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    results = run(args.select, args.repeat)
+    baseline = None
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    scale = _scale(results, baseline) if baseline else 1.0
+    for name, us in results['results'].items():
+        line = f'{name:>40}: {us:10.3f} us'
+        before = baseline and baseline['results'].get(name)
+        if before:
+            before *= scale
+            line += f'  ({(us - before) / before:+.0%} on baseline)'
+        print(line)
+    if args.output is not None:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+            f.write('\n')
+        return 0
+
+    if baseline is None:
+        print(f'No baseline found at {args.baseline}')
+        return 0
+    regressions = compare(results, baseline, args.threshold)
+    for name, before, current in regressions:
+        print(f'Regression in {name}: {before:.3f} us -> {current:.3f} us',
+              file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,9 +6,14 @@ setup(
     packages=find_packages(),
     python_requires='>=3.8',
     install_requires=['flake8'],
+    extras_require={
+        'numpy': ['numpy'],
+    },
     entry_points={
         "console_scripts": [
-            "snake_game = snakegame.main:cli"
+            "snake_game = snakegame.main:cli",
+            "snake_tournament = snakegame.tournament:cli",
+            "snake_server = snakegame.server:cli"
         ]
     }
 )
\ No newline at end of file
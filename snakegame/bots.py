@@ -0,0 +1,342 @@
+"""Computer controlled snakes.
+
+Each bot is a controller as used by snakegame.model.Simulation: a callable
+taking the game and the snake it steers and returning a direction, or None
+to carry straight on. They're module level functions or classes, so they can
+be entered into tournaments. One instance of a class based bot can steer any
+number of snakes, keeping separate state for each.
+
+- greedy: heads for the nearest food, avoiding immediate death
+- PathFinder: follows an A* path to the nearest food, which is kept between
+  ticks and repaired only where another snake moves across it
+- HamiltonianCycle: follows a cycle through every square of the board,
+  which can't fail in a single player game, taking shortcuts towards food
+  while the snake is short enough to do so safely
+"""
+import heapq
+import weakref
+from functools import lru_cache
+
+from snakegame.model.util import DIRECTIONS, Point
+
+
+def _passable(game, pos):
+    """Whether moving onto a square next tick is safe, ignoring where other
+    heads are about to move. Tails can be moved onto, as they'll have moved
+    out of the way (or, for other snakes, be stolen) unless growing."""
+    grid = game.grid
+    if not grid.in_bounds(pos):
+        return False
+    owners = grid.owners.get(grid.index(pos))
+    if not owners:
+        return True
+    if len(owners) > 1:
+        return False
+    (owner, count), = owners.items()
+    return count == 1 and pos == owner.tail and not owner.grow
+
+
+def _moves(game, snake):
+    """Directions the snake can safely move in, straight on first"""
+    head = snake.head
+    return [
+        direction for direction in
+        sorted(DIRECTIONS, key=lambda d: d != snake.facing)
+        if direction != snake.blocked_direction
+        and _passable(game, head + direction)
+    ]
+
+
+def _distance(a, b):
+    return abs(a[0] - b[0]) + abs(a[1] - b[1])
+
+
+def _nearest_food(game, pos):
+    if not game.food:
+        return None
+    return min(game.food, key=lambda food: _distance(pos, food))
+
+
+def greedy(game, snake):
+    """Move towards the nearest food, if that can be done safely"""
+    moves = _moves(game, snake)
+    if not moves:
+        return None
+    food = _nearest_food(game, snake.head)
+    if food is None:
+        return moves[0]
+    return min(moves, key=lambda d: _distance(snake.head + d, food))
+
+
+def a_star(game, start, goal, avoid=()):
+    """The shortest path between two squares through passable squares
+
+    Parameters
+    ----------
+    game: Game
+        The game being played
+    start: Point
+        Where the path starts, which needn't be passable
+    goal: Point
+        Where the path should end
+    avoid: Container(int)
+        Flat indices of extra squares to treat as impassable
+
+    Returns
+    -------
+    list(int) or None
+        Flat indices of the squares along the path after the start, or None
+        if the goal can't be reached
+    """
+    grid = game.grid
+    width = grid.width
+    owners = grid.owners
+    x_max, y_max = grid.dimension_max
+    start_idx, goal_idx = grid.index(start), grid.index(goal)
+    gx, gy = goal
+    steps = (-width, 1, width, -1)
+
+    came_from = {start_idx: None}
+    cost = {start_idx: 0}
+    # Ties are broken in favour of squares further along, which on an open
+    # board takes the search straight to the goal instead of filling in the
+    # rectangle between the two
+    frontier = [(_distance(start, goal), 0, start_idx)]
+    while frontier:
+        _, g, idx = heapq.heappop(frontier)
+        g = -g
+        if idx == goal_idx:
+            path = []
+            while idx != start_idx:
+                path.append(idx)
+                idx = came_from[idx]
+            path.reverse()
+            return path
+        if g > cost[idx]:
+            continue
+        g += 1
+        for step in steps:
+            nxt = idx + step
+            y, x = divmod(nxt, width)
+            if not (0 < x < x_max and 0 < y < y_max):
+                continue
+            if nxt in owners or nxt in avoid:
+                continue
+            if g < cost.get(nxt, g + 1):
+                cost[nxt] = g
+                came_from[nxt] = idx
+                heapq.heappush(
+                    frontier, (g + abs(x - gx) + abs(y - gy), -g, nxt)
+                )
+    return None
+
+
+class PathFinder:
+    """Follows the shortest path to the nearest food.
+
+    The path is kept from tick to tick. The only squares that become
+    occupied in a tick are the squares snakes' heads move onto, so rather
+    than searching again each tick, the path is only checked against the
+    other snakes' heads, and re-planned from just before any square one has
+    moved onto. A new search is only needed when the food is eaten, or now
+    and then while the path detours round something which may have since
+    moved out of the way.
+    """
+
+    def __init__(self, recheck_interval=8):
+        """
+        Parameters
+        ----------
+        recheck_interval: int
+            How many ticks a path which isn't as short as possible is
+            followed before searching for a shorter one
+        """
+        self.recheck_interval = recheck_interval
+        # Per snake: the food being headed for, the flat indices of the
+        # squares on the way there, next square last, and the tick of the
+        # last full search
+        self._plans = weakref.WeakKeyDictionary()
+
+    def __getstate__(self):
+        # Plans are specific to a game, so aren't sent to other processes
+        return {'recheck_interval': self.recheck_interval}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def __call__(self, game, snake):
+        grid = game.grid
+        plan = self._plans.get(snake)
+        if plan is not None:
+            plan = self._check(game, snake, *plan)
+        if plan is None:
+            goal = _nearest_food(game, snake.head)
+            path = None
+            if goal is not None:
+                path = a_star(game, snake.head, goal)
+            if not path:
+                self._plans.pop(snake, None)
+                return greedy(game, snake)
+            path.reverse()
+            plan = (goal, path, game.ticks)
+        goal, path, _ = plan
+        nxt = grid.point(path.pop())
+        if path:
+            self._plans[snake] = plan
+        else:
+            self._plans.pop(snake, None)
+        return nxt - snake.head
+
+    def _check(self, game, snake, goal, path, planned):
+        """Repair a stored plan, returning None if a new one is needed"""
+        grid = game.grid
+        if goal not in game.food or _distance(
+            grid.point(path[-1]), snake.head
+        ) != 1:
+            # The food's gone, or we've been steered off the path
+            return None
+        if (
+            len(path) > _distance(snake.head, goal)
+            and game.ticks - planned >= self.recheck_interval
+        ):
+            return None
+        on_path = set(path)
+        blocked = [
+            grid.index(other.head) for other in game.snakes
+            if other is not snake and grid.index(other.head) in on_path
+        ]
+        if not blocked:
+            return goal, path, planned
+        # Keep the path up to the first blocked square (the path is stored
+        # backwards, so that's the highest index) and search from there
+        first = max(path.index(idx) for idx in blocked)
+        kept = path[first + 1:]
+        start = grid.point(kept[0]) if kept else snake.head
+        rest = a_star(game, start, goal, avoid=set(kept))
+        if rest is None:
+            return None
+        rest.reverse()
+        return goal, rest + kept, planned
+
+
+@lru_cache(maxsize=16)
+def hamiltonian_cycle(dimensions):
+    """A cycle visiting every in-bounds square of a board, each square
+    adjacent to the next and the last to the first.
+
+    If both sides of the playing area are odd no such cycle exists, and the
+    bottom left square is left out.
+
+    Parameters
+    ----------
+    dimensions: tuple(int, int)
+        The game dimensions
+
+    Returns
+    -------
+    list(Point)
+    """
+    cols, rows = dimensions[0] - 1, dimensions[1] - 1
+    if cols < 2 or rows < 2:
+        raise ValueError(f"No cycle fits on a board of size {dimensions}")
+    transpose = rows % 2 and not cols % 2
+    if transpose:
+        cols, rows = rows, cols
+
+    # Zig-zag along the rows using all but the first column, and come back
+    # up the first column
+    cells = []
+    zigzag_rows = rows if rows % 2 == 0 else rows - 2
+    for r in range(zigzag_rows):
+        columns = range(1, cols) if r % 2 == 0 else range(cols - 1, 0, -1)
+        cells.extend((c, r) for c in columns)
+    if rows % 2:
+        # Both sides odd: cover the last two rows a column at a time
+        for i, c in enumerate(range(cols - 1, 0, -1)):
+            pair = (rows - 2, rows - 1) if i % 2 == 0 else (rows - 1, rows - 2)
+            cells.extend((c, r) for r in pair)
+        first_column = range(rows - 2, -1, -1)
+    else:
+        first_column = range(rows - 1, -1, -1)
+    cells.extend((0, r) for r in first_column)
+
+    if transpose:
+        cells = [(r, c) for c, r in cells]
+    return [Point(x + 1, y + 1) for x, y in cells]
+
+
+class HamiltonianCycle:
+    """Follows a Hamiltonian cycle of the board, which in a single player
+    game guarantees the snake never dies, taking shortcuts to food while the
+    snake is short.
+
+    Squares are numbered by their position along the cycle. The body of a
+    snake following the cycle lies between its tail and head, so a shortcut
+    is safe if it doesn't skip ahead past the tail; keeping a margin before
+    the tail leaves room to grow.
+    """
+
+    def __init__(self, max_shortcut_fraction=0.5, margin=4):
+        """
+        Parameters
+        ----------
+        max_shortcut_fraction: float
+            Shortcuts are only taken while the snake covers less than this
+            fraction of the cycle
+        margin: int
+            Squares kept free between the head and the tail after a shortcut
+        """
+        self.max_shortcut_fraction = max_shortcut_fraction
+        self.margin = margin
+
+    def __call__(self, game, snake):
+        cycle, order = _cycle_order(tuple(game.dimension_max))
+        n = len(cycle)
+        head = order.get(snake.head)
+        if head is None:
+            # Not on the cycle, e.g. we started somewhere else
+            return greedy(game, snake)
+
+        def ahead(pos):
+            return (order[pos] - head) % n if pos in order else None
+
+        # The square after a detour off the cycle is two places along
+        following = cycle[(int(head) + 1 + (head % 1 > 0)) % n] - snake.head
+        moves = _moves(game, snake)
+        if not moves:
+            return None
+        best, best_distance = None, 0
+        food = _nearest_food(game, snake.head)
+        tail = ahead(snake.tail)
+        if (
+            food in order and tail is not None
+            and len(snake.points) < self.max_shortcut_fraction * n
+        ):
+            food_distance = ahead(food)
+            for direction in moves:
+                distance = ahead(snake.head + direction)
+                if distance is None or distance > food_distance:
+                    continue
+                if distance < tail - self.margin and distance > best_distance:
+                    best, best_distance = direction, distance
+        if best is not None:
+            return best
+        if following in moves:
+            return following
+        # Someone else is in the way
+        return greedy(game, snake)
+
+
+@lru_cache(maxsize=16)
+def _cycle_order(dimensions):
+    """The cycle for a board, and the position of each square along it"""
+    cycle = hamiltonian_cycle(dimensions)
+    order = {point: i for i, point in enumerate(cycle)}
+    corner = Point(1, dimensions[1] - 1)
+    if corner not in order:
+        # The square left out of the cycle can be visited as a detour
+        # between the square to its right and the one diagonally up from it,
+        # so give it a position halfway between the first and the square
+        # in between those
+        order[corner] = order[corner + Point(1, 0)] + 0.5
+    return cycle, order
@@ -0,0 +1,263 @@
+"""Reinforcement learning environments, in the style of OpenAI Gym.
+
+SnakeEnv plays a single Game, and VectorSnakeEnv plays many games in lockstep
+on the BatchGame engine, resetting each one as soon as it finishes.
+
+Actions are direction codes, i.e. positions in util.DIRECTIONS, or
+NO_ACTION to carry straight on. Observations are boards covering the game
+area and its border, with one image per snake made of the channels:
+
+- HEAD: the snake's own head
+- BODY: all of the snake's own squares, head included
+- OTHERS: squares occupied by any other snake
+- FOOD: food items
+
+Observations are written in place into a buffer owned by the environment,
+and the arrays returned are views of it, so they are overwritten by the next
+call to step or reset. Copy them to keep them.
+
+Requires numpy, which can be installed with `pip install .[numpy]`.
+"""
+import numpy as np
+
+from snakegame.model import Simulation
+from snakegame.model.batch import BatchGame, NO_ACTION
+from snakegame.model.layouts import classic_game
+from snakegame.model.rng import GameRandom
+from snakegame.model.util import DIRECTIONS
+
+#: Observation channels
+HEAD, BODY, OTHERS, FOOD = range(4)
+N_CHANNELS = 4
+
+
+def _classic(n_players):
+    def make_game(rng):
+        return classic_game(n_players=n_players, rng=rng)
+    return make_game
+
+
+class SnakeEnv:
+    """A single game, stepped one tick at a time"""
+
+    def __init__(self, make_game=None, n_players=1, max_ticks=None):
+        """
+        Parameters
+        ----------
+        make_game: callable, optional
+            Takes a random.Random and returns a new Game. By default the
+            classic game for n_players.
+        n_players: int
+            Number of players in the default game
+        max_ticks: int, optional
+            Episodes are cut off after this many ticks
+        """
+        self.make_game = make_game or _classic(n_players)
+        self.max_ticks = max_ticks
+        self.game = None
+        self.snakes = []
+        self._obs = None
+
+    def reset(self, seed=None):
+        """Start a new episode
+
+        Parameters
+        ----------
+        seed: int, optional
+            Seeds food placement
+
+        Returns
+        -------
+        numpy.ndarray
+            Observations of shape (n_snakes, N_CHANNELS, height, width)
+        """
+        self.game = self.make_game(GameRandom(seed))
+        self.simulation = Simulation(self.game)
+        #: Every snake the episode started with, in order
+        self.snakes = list(self.game.snakes)
+        self._scores = np.zeros(len(self.snakes), dtype=np.int64)
+        width, height = (d + 1 for d in self.game.dimension_max)
+        shape = (len(self.snakes), N_CHANNELS, height, width)
+        if self._obs is None or self._obs.shape != shape:
+            self._obs = np.zeros(shape, dtype=np.uint8)
+            self._others = np.zeros(shape[2:], dtype=np.uint8)
+        return self._observe()
+
+    def _observe(self):
+        obs = self._obs
+        obs.fill(0)
+        alive = set(self.game.snakes)
+        for i, snake in enumerate(self.snakes):
+            if snake not in alive:
+                continue
+            xs, ys = zip(*snake.points)
+            obs[i, BODY, ys, xs] = 1
+            obs[i, HEAD, snake.head.y, snake.head.x] = 1
+        # Everyone's body, less our own
+        np.sum(obs[:, BODY], axis=0, out=self._others)
+        np.subtract(self._others, obs[:, BODY], out=obs[:, OTHERS])
+        np.minimum(obs[:, OTHERS], 1, out=obs[:, OTHERS])
+        if self.game.food:
+            xs, ys = zip(*self.game.food)
+            obs[:, FOOD, ys, xs] = 1
+        return obs
+
+    def step(self, actions):
+        """Advance the game by one tick
+
+        Parameters
+        ----------
+        actions: int or sequence(int)
+            A direction code for each snake, or NO_ACTION
+
+        Returns
+        -------
+        observation: numpy.ndarray
+            As returned by reset
+        rewards: numpy.ndarray
+            Food eaten by each snake this tick
+        done: bool
+            Whether the episode has finished
+        info: dict
+            'alive', whether each snake is still in the game, 'scores', the
+            total food eaten by each snake, 'ticks' and 'truncated', whether
+            the episode was cut off by max_ticks
+        """
+        actions = np.atleast_1d(actions)
+        self.simulation.step({
+            snake: DIRECTIONS[action]
+            for snake, action in zip(self.snakes, actions)
+            if action != NO_ACTION
+        })
+        scores = np.array(
+            [self.game.score[snake] for snake in self.snakes], dtype=np.int64
+        )
+        rewards = (scores - self._scores).astype(np.float32)
+        self._scores = scores
+        finished = self.simulation.finished
+        truncated = (
+            not finished and self.max_ticks is not None
+            and self.game.ticks >= self.max_ticks
+        )
+        alive = set(self.game.snakes)
+        info = {
+            'alive': np.array([snake in alive for snake in self.snakes]),
+            'scores': scores,
+            'ticks': self.game.ticks,
+            'truncated': truncated,
+        }
+        return self._observe(), rewards, finished or truncated, info
+
+
+class VectorSnakeEnv:
+    """Many copies of a game stepped together. Finished games are reset
+    straight away, so every step returns a full batch of observations."""
+
+    def __init__(self, n_envs, make_game=None, n_players=1, max_ticks=None,
+                 seed=None):
+        """
+        Parameters
+        ----------
+        n_envs: int
+            Number of games
+        make_game: callable, optional
+            Takes a random.Random and returns the Game every episode starts
+            from. By default the classic game for n_players.
+        n_players: int
+            Number of players in the default game
+        max_ticks: int, optional
+            Episodes are cut off after this many ticks
+        seed: int, optional
+            Seeds food placement
+        """
+        make_game = make_game or _classic(n_players)
+        self.batch = BatchGame.repeat(
+            make_game(GameRandom(seed)), n_envs, rng=seed
+        )
+        self.n_envs = n_envs
+        self.max_ticks = max_ticks
+        batch = self.batch
+        self._shape = (batch.n_games, batch.n_snakes, batch.height,
+                       batch.width)
+        self._obs = np.zeros(
+            (batch.n_games, batch.n_snakes, N_CHANNELS, batch.height,
+             batch.width), dtype=np.uint8
+        )
+        self._others = np.zeros(self._shape, dtype=np.int16)
+
+    def reset(self, seed=None):
+        """Start a new episode in every game
+
+        Parameters
+        ----------
+        seed: int, optional
+            Reseeds food placement
+
+        Returns
+        -------
+        numpy.ndarray
+            Observations of shape
+            (n_envs, n_snakes, N_CHANNELS, height, width)
+        """
+        if seed is not None:
+            self.batch.rng = np.random.default_rng(seed)
+        self.batch.reset()
+        return self._observe()
+
+    def _observe(self):
+        batch, obs = self.batch, self._obs
+        shape = self._shape
+        counts = batch.snake_counts.reshape(shape)
+        np.greater(counts, 0, out=obs[:, :, BODY])
+        # Everything on each square, less food and our own segments
+        np.subtract(
+            batch.counts.reshape(shape[:1] + (1,) + shape[2:]), counts,
+            out=self._others
+        )
+        self._others -= batch.food.reshape(shape[:1] + (1,) + shape[2:])
+        np.greater(self._others, 0, out=obs[:, :, OTHERS])
+        obs[:, :, FOOD] = batch.food.reshape(shape[:1] + (1,) + shape[2:])
+        obs[:, :, HEAD] = 0
+        games, snakes = np.nonzero(batch.alive)
+        heads = batch.heads(games, snakes)
+        obs[games, snakes, HEAD, heads // batch.width, heads % batch.width] = 1
+        return obs
+
+    def step(self, actions):
+        """Advance every game by one tick, resetting any that finish
+
+        Parameters
+        ----------
+        actions: array_like
+            Direction codes of shape (n_envs, n_snakes), or NO_ACTION
+
+        Returns
+        -------
+        observations: numpy.ndarray
+            As returned by reset. For games which just finished, these are
+            the first observations of the next episode.
+        rewards: numpy.ndarray
+            Food eaten by each snake this tick, shape (n_envs, n_snakes)
+        dones: numpy.ndarray
+            Whether each game's episode finished this tick
+        info: dict
+            'scores' and 'ticks', the final scores and length of each episode
+            which finished, and 'truncated', whether it was cut off by
+            max_ticks
+        """
+        batch = self.batch
+        before = batch.score.copy()
+        dones = batch.step(actions).copy()
+        rewards = (batch.score - before).astype(np.float32)
+        truncated = np.zeros_like(dones)
+        if self.max_ticks is not None:
+            truncated = ~dones & (batch.ticks >= self.max_ticks)
+            dones |= truncated
+        info = {
+            'scores': batch.score.copy(),
+            'ticks': batch.ticks.copy(),
+            'truncated': truncated,
+        }
+        if dones.any():
+            batch.reset(dones)
+        return self._observe(), rewards, dones, info
@@ -1,28 +1,122 @@
 import asyncio
+import codecs
 import contextlib
 import termios
 import sys
+import time
+from collections import deque
+
+
+#: Names for the escape sequences sent by arrow keys, in both normal and
+#: application cursor mode
+ESCAPE_SEQUENCES = {
+    '\x1b[A': 'KEY_UP', '\x1b[B': 'KEY_DOWN',
+    '\x1b[C': 'KEY_RIGHT', '\x1b[D': 'KEY_LEFT',
+    '\x1bOA': 'KEY_UP', '\x1bOB': 'KEY_DOWN',
+    '\x1bOC': 'KEY_RIGHT', '\x1bOD': 'KEY_LEFT',
+}
+#: Most direction changes waiting for each snake; further key presses are
+#: dropped rather than leaving the snake turning long after the keys stopped
+MAX_QUEUED = 3
+
+
+def split_keys(text):
+    """Split decoded input into key presses.
+
+    Escape sequences become a single key, named as in ESCAPE_SEQUENCES if
+    they're known, and any other character is a key on its own.
+
+    Parameters
+    ----------
+    text: str
+        Input read from the terminal
+
+    Returns
+    -------
+    keys: list(str)
+        The keys pressed
+    rest: str
+        An incomplete escape sequence at the end of the input, which should
+        be put in front of the next input read
+    """
+    keys = []
+    i, end = 0, len(text)
+    while i < end:
+        if text[i] != '\x1b':
+            keys.append(text[i])
+            i += 1
+            continue
+        if i + 1 == end:
+            return keys, text[i:]
+        if text[i + 1] == '[':
+            # Control sequence: parameters, then a final character
+            j = i + 2
+            while j < end and text[j] in '0123456789;':
+                j += 1
+        elif text[i + 1] == 'O':
+            j = i + 2
+        else:
+            keys.append(text[i])
+            i += 1
+            continue
+        if j >= end:
+            return keys, text[i:]
+        sequence = text[i:j + 1]
+        keys.append(ESCAPE_SEQUENCES.get(sequence, sequence))
+        i = j + 1
+    return keys, ''
 
 
 class KeyReader:
-    """Reads input from stdin and sets a new orientation for the relevant
-    Snake object"""
+    """Reads input from stdin and queues up new orientations for the
+    relevant Snake objects.
+
+    A KeyReader is also a controller, as used by model.Simulation, for the
+    snakes it has key bindings for. Each tick it turns each snake at most
+    once, so quickly pressing two keys (e.g. up then left while moving
+    right) makes two turns over successive ticks instead of the second
+    being rejected as a reversal.
+    """
 
-    def __init__(self, snake_keys, game_view, exit_key, pause_key):
+    def __init__(self, snake_keys, game_view, exit_key, pause_key,
+                 recorder=None, timer=None, on_latency=None, pan_keys=None,
+                 follow_key=None):
         """
         Parameters
         ----------
         snake_keys: dict(str, tuple(Snake, tuple))
             Mapping between snakes and their individual key bindings. Key
             bindings are a dictionary of strings and direction tuples.
+        recorder: replay.Recorder, optional
+            Records each key pressed
+        timer: profiling.FrameTimer, optional
+            Records the time spent handling input
+        on_latency: callable, optional
+            Called with a snake and the number of seconds between a key
+            being read and the snake turning because of it
+        pan_keys: dict(str, tuple), optional
+            Keys which pan the game view, and their directions
+        follow_key: str, optional
+            Key which sets the game view following its snake again
         """
         self.snake_keys = snake_keys
         self.game_view = game_view
         self.exit_key = exit_key
         self.pause_key = pause_key
+        self.recorder = recorder
+        self.timer = timer
+        self.on_latency = on_latency
+        self.pan_keys = pan_keys or {}
+        self.follow_key = follow_key
+        #: Directions waiting to be applied to each snake, with the time the
+        #: key was read
+        self.queued = {}
+        # Input left over from the last read, still to be decoded or split
+        self._decoder = codecs.getincrementaldecoder('utf8')(errors='replace')
+        self._rest = ''
 
     async def get_keys(self, loop):
-        """Get each keypress from stdin and set new orientations
+        """Read keypresses from stdin and queue new orientations
 
         Parameters
         ----------
@@ -36,19 +130,97 @@ class KeyReader:
             await loop.connect_read_pipe(
                 lambda: asyncio.StreamReaderProtocol(read), sys.stdin
             )
-        # Wait for input
+        # Wait for input, then take everything that's arrived at once
         while not read.at_eof():
-            ch = await read.read(1)
-            if not ch:
+            data = await read.read(4096)
+            if not data:
                 break
-            ch = ch.decode('utf8')
-            snake, dir = self.snake_keys.get(ch, (None, None))
-            if snake is not None:
-                snake.set_direction(dir)
-            if ch == self.exit_key:
-                self.game_view.game.quit()
-            if ch == self.pause_key:
-                self.game_view.toggle_pause_state()
+            self.feed(data)
+
+    def feed(self, data):
+        """Handle a chunk of raw input, which may end part way through a
+        UTF-8 character or escape sequence
+
+        Parameters
+        ----------
+        data: bytes
+            Bytes read from the terminal
+        """
+        start = time.perf_counter()
+        keys, self._rest = split_keys(self._rest + self._decoder.decode(data))
+        for key in keys:
+            self.handle_key(key, start)
+        if self.timer is not None:
+            self.timer.add('input', time.perf_counter() - start)
+
+    def handle_key(self, ch, when=None):
+        """Act on a single key press
+
+        Parameters
+        ----------
+        ch: str
+            The key pressed
+        when: float, optional
+            The time.perf_counter() time the key was read
+        """
+        if self.recorder is not None:
+            self.recorder.record_key(ch)
+        snake, dir = self.snake_keys.get(ch, (None, None))
+        if snake is not None:
+            self.queue(snake, dir, when)
+        if ch == self.exit_key:
+            self.game_view.game.quit()
+        if ch == self.pause_key:
+            self.game_view.toggle_pause_state()
+        if ch in self.pan_keys:
+            self.game_view.pan(self.pan_keys[ch])
+        if ch == self.follow_key:
+            self.game_view.follow()
+
+    def queue(self, snake, direction, when=None):
+        """Queue a direction change for a snake's next turn
+
+        Parameters
+        ----------
+        snake: Snake
+            The snake to turn
+        direction: Point
+            One of the LEFT, RIGHT, UP, DOWN points in util
+        when: float, optional
+            The time.perf_counter() time the key was read
+        """
+        queue = self.queued.setdefault(snake, deque())
+        last = queue[-1][0] if queue else snake.facing
+        if direction == last or len(queue) >= MAX_QUEUED:
+            return
+        if when is None:
+            when = time.perf_counter()
+        queue.append((direction, when))
+
+    def __call__(self, game, snake):
+        """Take the next queued turn for a snake, skipping any it can't make
+
+        Parameters
+        ----------
+        game: Game
+            The game being played
+        snake: Snake
+            The snake to steer
+
+        Returns
+        -------
+        Point or None
+            The new direction, or None to carry straight on
+        """
+        queue = self.queued.get(snake)
+        while queue:
+            direction, when = queue.popleft()
+            if direction in (snake.facing, snake.blocked_direction):
+                continue
+            if self.on_latency is not None:
+                self.on_latency(snake, time.perf_counter() - when)
+            return direction
+        return None
 
 
 @contextlib.contextmanager
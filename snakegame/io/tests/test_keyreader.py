@@ -0,0 +1,87 @@
+import unittest
+from unittest import mock
+
+from snakegame.io.keyreader import KeyReader, MAX_QUEUED, split_keys
+from snakegame.model import Game, Simulation, Snake
+from snakegame.model.util import (
+    DOWN, FOLLOW, PAN_KEYS, Point, RIGHT, UP, key_groups
+)
+
+
+class TestSplitKeys(unittest.TestCase):
+
+    def test_arrows_and_characters(self):
+        keys, rest = split_keys('w\x1b[Aé\x1bOD\x1b[5~q')
+        self.assertEqual(
+            keys, ['w', 'KEY_UP', 'é', 'KEY_LEFT', '\x1b[5~', 'q']
+        )
+        self.assertEqual(rest, '')
+
+    def test_incomplete_sequence(self):
+        for text in ['a\x1b', 'a\x1b[', 'a\x1b[1;', 'a\x1bO']:
+            self.assertEqual(split_keys(text), (['a'], text[1:]))
+
+
+class TestKeyReader(unittest.TestCase):
+
+    def setUp(self):
+        self.game = Game()
+        self.snake = Snake('snake', [Point(i, 5) for i in range(2, 5)])
+        self.game.add_snake(self.snake)
+        bindings = {
+            key: (self.snake, direction)
+            for key, direction in key_groups['Player 1'].items()
+        }
+        self.latencies = []
+        self.view = mock.Mock(game=self.game)
+        self.reader = KeyReader(
+            bindings, self.view, exit_key='q', pause_key=' ',
+            on_latency=lambda snake, seconds: self.latencies.append(snake),
+            pan_keys=PAN_KEYS, follow_key=FOLLOW
+        )
+        self.sim = Simulation(self.game, {self.snake: self.reader})
+
+    def test_double_tap_turns_over_two_ticks(self):
+        # Moving right, up then left quickly would be rejected as a reversal
+        # if both were applied straight away
+        self.reader.feed(b'wa')
+        self.sim.step()
+        self.assertEqual(self.snake.head, Point(4, 4))
+        self.sim.step()
+        self.assertEqual(self.snake.head, Point(3, 4))
+        self.assertEqual(self.latencies, [self.snake, self.snake])
+
+    def test_sequences_split_across_reads(self):
+        self.reader.feed(b'\x1b[')
+        self.assertNotIn(self.snake, self.reader.queued)
+        self.reader.feed(b'B\xc3')
+        self.reader.feed(b'\xa9')
+        self.sim.step()
+        self.assertEqual(self.snake.facing, DOWN)
+
+    def test_redundant_and_blocked_turns(self):
+        # Carrying on, reversing and repeats don't use up a tick
+        self.reader.feed(b'ddaaaw')
+        self.assertEqual(len(self.reader.queued[self.snake]), 2)
+        self.sim.step()
+        self.assertEqual(self.snake.facing, UP)
+        self.assertEqual(self.latencies, [self.snake])
+
+    def test_queue_is_bounded(self):
+        self.reader.feed(b'wdsdwdsd')
+        self.assertEqual(len(self.reader.queued[self.snake]), MAX_QUEUED)
+        for expected in [UP, RIGHT, DOWN, None]:
+            self.assertEqual(self.reader(self.game, self.snake), expected)
+            if expected is not None:
+                self.snake.facing = expected
+
+    def test_exit_and_pause(self):
+        self.reader.feed(b' q')
+        self.view.toggle_pause_state.assert_called_once()
+        self.assertEqual(self.game.snakes, [])
+
+    def test_pan_and_follow(self):
+        self.reader.feed(b'Dsf')
+        self.view.pan.assert_called_once_with(RIGHT)
+        self.view.follow.assert_called_once()
+        self.assertEqual(self.reader.queued[self.snake][0][0], DOWN)
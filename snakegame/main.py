@@ -1,104 +1,438 @@
+"""The snake_game command.
+
+Only what a headless game needs is imported up front. Curses, the terminal
+input handling, the view and the server are imported when a game is played
+in the terminal, so `snake_game --headless` starts quickly and runs where
+there's no terminal at all.
+"""
 import argparse
-import asyncio
-import curses
+import json
 import logging
 
-from snakegame.io import KeyReader
-from snakegame.model import Game
-from snakegame.model import Snake
-from snakegame.model.util import Point, EXIT, PAUSE, key_groups
+from snakegame import bots
+from snakegame.model import Simulation
+from snakegame.model.layouts import classic_scenario
+from snakegame.model.rng import GameRandom
+from snakegame.model.scenario import SPAWNS, Scenario
+from snakegame.model.util import EXIT, FOLLOW, PAN_KEYS, PAUSE, key_groups
+from snakegame.replay import Recorder
+
+#: Named game speeds, in ticks per second
+SPEEDS = {'fast': 4, 'normal': 2, 'slow': 1}
+#: Bots which can play as player 1, by name
+AUTOPILOTS = {
+    'greedy': lambda: bots.greedy,
+    'path': bots.PathFinder,
+    'hamiltonian': bots.HamiltonianCycle,
+}
+#: Colours the snakes cycle through, after the first two players' colours
+SNAKE_COLOURS = ('BLUE', 'YELLOW', 'GREEN', 'MAGENTA', 'CYAN', 'RED', 'WHITE')
+
+
+def game_speed(value):
+    """Parse a game speed: one of the names in SPEEDS, or a positive number
+    of ticks per second"""
+    if value in SPEEDS:
+        return SPEEDS[value]
+    try:
+        rate = float(value)
+    except ValueError:
+        rate = 0
+    if not rate > 0:
+        raise argparse.ArgumentTypeError(
+            f"expected one of {', '.join(SPEEDS)} or a positive number, "
+            f"not {value!r}"
+        )
+    return rate
+
+
+def board_size(value):
+    """Parse board dimensions written as WIDTHxHEIGHT"""
+    try:
+        width, height = (int(v) for v in value.lower().split('x'))
+    except ValueError:
+        width = height = 0
+    if width < 3 or height < 3:
+        raise argparse.ArgumentTypeError(
+            f"expected a size like 40x20, at least 3x3, not {value!r}"
+        )
+    return width, height
+
+
+def address(value):
+    """Parse a server address written as HOST:PORT"""
+    host, _, port = value.rpartition(':')
+    if not host or not port.isdigit():
+        raise argparse.ArgumentTypeError(
+            f"expected an address like localhost:7777, not {value!r}"
+        )
+    return host, int(port)
+
+
+def make_scenario(two_player=False, path=None, board=None, snakes=None,
+                  snake_length=None, spawn=None, food=None, max_ticks=None):
+    """The scenario to play, from a file or the classic game, with any of
+    its settings overridden
+
+    Parameters
+    ----------
+    two_player: bool
+        Whether the classic game has 2 players, if no file is given
+    path: str, optional
+        A scenario saved as JSON
+    board, snakes, snake_length, spawn, food, max_ticks: optional
+        Override the scenario's dimensions, number of snakes and so on
 
-from snakegame.view.game_view import GameView
+    Returns
+    -------
+    Scenario
+    """
+    if path is not None:
+        scenario = Scenario.load(path)
+    else:
+        scenario = classic_scenario(n_players=2 if two_player else 1)
+    if board is not None:
+        scenario.dimensions = tuple(board)
+    if snakes is not None:
+        scenario.snakes = snakes
+    if snake_length is not None:
+        scenario.snake_length = snake_length
+    if spawn is not None:
+        scenario.spawn = spawn
+    if food is not None:
+        scenario.food = food
+    if max_ticks is not None:
+        scenario.max_ticks = max_ticks
+    return scenario
 
 
-def main(stdscr, speed, two_player):
+def main(stdscr, speed, two_player, seed=None, record=None, profile=None,
+         fps=None, autopilot=None, scenario=None, bot='greedy'):
     """Run the game
 
     Parameters
     ----------
     stdscr: curses.Window
         The window returned by curses.initscr()
-    speed: str
-        The speed to run the game at.
+    speed: str or float
+        The speed to run the game at, a name from SPEEDS or ticks per second
     two_player: bool
         1 or 2 player mode
+    seed: int, optional
+        Seed for food placement
+    record: str, optional
+        Path to save a replay of the game to
+    profile: str, optional
+        Path to write frame timing histograms to. Timings are also shown
+        below the scores while playing.
+    fps: float, optional
+        Frames drawn per second, by default one per tick
+    autopilot: str, optional
+        The name of a bot in AUTOPILOTS to steer player 1
+    scenario: Scenario, optional
+        The game to set up, by default the classic game
+    bot: str
+        The name of a bot in AUTOPILOTS to steer the snakes beyond the
+        players'
     """
+    import asyncio
+    import curses
+
+    from snakegame.io import KeyReader
+    from snakegame.profiling import FrameTimer
+    from snakegame.view.game_view import GameView
+
     # Get the active event loop
     loop = asyncio.get_event_loop()
 
+    # Initialise game with some defaults
+    tick_rate = SPEEDS.get(speed, speed)
+    rng = GameRandom(seed)
+    seed = rng.root_seed
+    if scenario is None:
+        scenario = classic_scenario(n_players=2 if two_player else 1)
+    game = scenario.make_game(rng=rng)
+    players = game.snakes[:2 if two_player else 1]
+
     # Change echoing settings and add custom colours for the player characters
     curses.noecho()
-    curses.init_pair(1, curses.COLOR_BLUE, curses.COLOR_BLACK)
-    if two_player:
-        curses.init_pair(2, curses.COLOR_YELLOW, curses.COLOR_BLACK)
-    else:
-        curses.init_pair(2, curses.COLOR_BLUE, curses.COLOR_BLACK)
+    colours = list(SNAKE_COLOURS)
+    if len(game.snakes) == 1:
+        # Tails take the next snake's colour, so a lone snake's matches
+        colours[1] = colours[0]
+    n_colours = max(min(len(game.snakes), curses.COLOR_PAIRS - 1), 2)
+    for i in range(n_colours):
+        colour = getattr(curses, f'COLOR_{colours[i % len(colours)]}')
+        curses.init_pair(i + 1, colour, curses.COLOR_BLACK)
 
-    # Initialise game with some defaults
-    tick_rate = {'fast': 4, 'normal': 2, 'slow': 1}
-    game = Game(dimensions=(12, 12), tick_rate=tick_rate[speed])
-    snake1 = Snake(name='snake1', start_points=[[3, 3], [3, 4], [3, 5]])
-    game.add_snake(snake1)
-    if two_player:
-        snake2 = Snake(name='snake2', start_points=[[7, 8], [7, 7], [7, 6]])
-        game.add_snake(snake2)
-    game.add_food(Point(5, 6))
-    view = GameView(game=game)
+    timer = None
+    if profile is not None:
+        timer = FrameTimer(tick_rate)
+    view = GameView(
+        game=game, tick_rate=tick_rate, timer=timer, render_rate=fps,
+        n_colours=n_colours, follow=players[0]
+    )
+    recorder = None
+    if record is not None:
+        recorder = Recorder(record, game, tick_rate=view.tick_rate, seed=seed)
     # Set up the key mappings
     key_bindings = {}
-    for mapping, snake in zip(key_groups.values(), game.snakes):
+    for mapping, snake in zip(key_groups.values(), players):
         for key, direction in mapping.items():
             key_bindings[key] = (snake, direction)
     keyreader = KeyReader(
-        snake_keys=key_bindings, game_view=view, exit_key=EXIT, pause_key=PAUSE
+        snake_keys=key_bindings, game_view=view, exit_key=EXIT,
+        pause_key=PAUSE, recorder=recorder, timer=timer,
+        on_latency=timer.latency if timer is not None else None,
+        pan_keys=PAN_KEYS, follow_key=FOLLOW
     )
+    # The key reader steers the players, making at most one turn per tick,
+    # and bots steer everyone else
+    controllers = {snake: keyreader for snake in players}
+    if autopilot is not None:
+        controllers[players[0]] = AUTOPILOTS[autopilot]()
+    others = AUTOPILOTS[bot]()
+    for snake in game.snakes[len(players):]:
+        controllers[snake] = others
+    simulation = Simulation(game, controllers=controllers)
+
+    def step():
+        finished = simulation.step()
+        return finished or (
+            scenario.max_ticks is not None
+            and game.ticks >= scenario.max_ticks
+        )
 
     # Schedule a task which reads input from stdin and a task which updates
     # and draws the game state
     input_loop = loop.create_task(keyreader.get_keys(loop))
-    draw_loop = loop.create_task(view.update_and_draw(stdscr))
+    draw_loop = loop.create_task(
+        view.update_and_draw(stdscr, step=step)
+    )
 
     # Cancel the input handling task when the game is done
     draw_loop.add_done_callback(lambda future: input_loop.cancel())
 
     # Start the actual game loop
     loop.run_until_complete(draw_loop)
+    if recorder is not None:
+        recorder.close()
+    if timer is not None:
+        with open(profile, 'w') as f:
+            f.write(timer.report())
 
     # Return terminal settings to normal
     curses.echo()
     curses.endwin()
 
     # Print the final scores
-    endstr = f'Game Over! Player 1 scored: {game.score[snake1]}'
-    if two_player:
-        endstr += f', Player 2 scored: {game.score[snake2]}'
+    endstr = 'Game Over! ' + ', '.join(
+        f'Player {i} scored: {game.score[snake]}'
+        for i, snake in enumerate(players, 1)
+    )
+    bot_scores = [
+        score for snake, score in game.score.items() if snake not in players
+    ]
+    if bot_scores:
+        endstr += f', the best bot scored: {max(bot_scores)}'
     print(endstr)
 
 
-def cli():
+def headless(ticks=None, seed=None, scenario=None, bot='greedy',
+             autopilot=None, record=None):
+    """Play a game with a bot steering every snake, as fast as possible and
+    without drawing it
+
+    Parameters
+    ----------
+    ticks: int, optional
+        Stop after this many ticks, if the game hasn't finished
+    seed: int, optional
+        Seed for food placement
+    scenario: Scenario, optional
+        The game to set up, by default the classic game
+    bot: str
+        The name of a bot in AUTOPILOTS to steer the snakes
+    autopilot: str, optional
+        The name of a bot in AUTOPILOTS to steer the first snake instead
+    record: str, optional
+        Path to save a replay of the game to
+
+    Returns
+    -------
+    dict
+        The seed, the number of ticks played, and each snake's score and
+        whether it's still alive, in the order the snakes were added
+    """
+    rng = GameRandom(seed)
+    if scenario is None:
+        scenario = classic_scenario(n_players=1)
+    game = scenario.make_game(rng=rng)
+    snakes = list(game.snakes)
+    controller = AUTOPILOTS[bot]()
+    controllers = {snake: controller for snake in snakes}
+    if autopilot is not None and snakes:
+        controllers[snakes[0]] = AUTOPILOTS[autopilot]()
+    simulation = Simulation(game, controllers=controllers)
+    recorder = None
+    if record is not None:
+        recorder = Recorder(record, game, seed=rng.root_seed)
+    limits = [t for t in (ticks, scenario.max_ticks) if t is not None]
+    try:
+        simulation.run(min(limits) - game.ticks if limits else None)
+    finally:
+        if recorder is not None:
+            recorder.close()
+    return {
+        'seed': rng.root_seed,
+        'ticks': game.ticks,
+        'scores': [game.score[snake] for snake in snakes],
+        'alive': [snake in game.snakes for snake in snakes],
+    }
+
+
+def cli(argv=None):
     parser = argparse.ArgumentParser()
     parser.add_argument(
         '--debug', action='store_true',
         help='Write debugging logs to "game.log"'
     )
     parser.add_argument(
-        "--game-speed", type=str, choices=['fast', 'normal', 'slow'],
-        default='normal', help='Sets the game speed'
+        "--game-speed", type=game_speed, default='normal',
+        help='Sets the game speed: fast, normal, slow or ticks per second'
+    )
+    parser.add_argument(
+        "--fps", type=float, default=None,
+        help='Frames drawn per second, by default one per tick'
     )
     parser.add_argument(
         "--2-player", action='store_true', help='Play a 2-player version',
         dest='two_player'
     )
-    args = parser.parse_args()
+    parser.add_argument(
+        "--seed", type=int, default=None, help='Seed for food placement'
+    )
+    parser.add_argument(
+        "--record", type=str, default=None, metavar='FILE',
+        help='Save a replay of the game'
+    )
+    parser.add_argument(
+        "--replay", type=str, default=None, metavar='FILE',
+        help='Watch a saved replay instead of playing'
+    )
+    parser.add_argument(
+        "--connect", type=address, default=None, metavar='HOST:PORT',
+        help='Watch a game served with snake_server'
+    )
+    parser.add_argument(
+        "--player", type=int, default=None, metavar='N',
+        help='With --connect, steer snake N (counting from 1)'
+    )
+    parser.add_argument(
+        "--autopilot", choices=AUTOPILOTS, default=None,
+        help='Let a bot play as player 1'
+    )
+    parser.add_argument(
+        "--scenario", type=str, default=None, metavar='FILE',
+        help='Play a game set up as described in a JSON file'
+    )
+    parser.add_argument(
+        "--board", type=board_size, default=None, metavar='WxH',
+        help='Board dimensions, e.g. 40x20'
+    )
+    parser.add_argument(
+        "--snakes", type=int, default=None,
+        help='Number of snakes, the players\' and then bots'
+    )
+    parser.add_argument(
+        "--snake-length", type=int, default=None,
+        help='Starting length of the snakes'
+    )
+    parser.add_argument(
+        "--spawn", choices=SPAWNS, default=None,
+        help='How the snakes\' starting positions are chosen'
+    )
+    parser.add_argument(
+        "--food", type=int, default=None,
+        help='Number of food items on the board at once'
+    )
+    parser.add_argument(
+        "--max-ticks", type=int, default=None,
+        help='End the game after this many ticks'
+    )
+    parser.add_argument(
+        "--bot", choices=AUTOPILOTS, default='greedy',
+        help='The bot steering snakes beyond the players\''
+    )
+    parser.add_argument(
+        "--headless", action='store_true',
+        help='Let bots play without drawing the game, printing the result '
+             'as JSON'
+    )
+    parser.add_argument(
+        "--ticks", type=int, default=None,
+        help='With --headless, stop after this many ticks'
+    )
+    parser.add_argument(
+        "--profile", type=str, default=None, metavar='FILE',
+        help='Show frame timings and write histograms of them to FILE on exit'
+    )
+    parser.add_argument(
+        "--cprofile", type=str, default=None, metavar='FILE',
+        help='Run under cProfile and dump the stats to FILE on exit'
+    )
+    args = parser.parse_args(argv)
+    if args.headless and (args.replay is not None or args.connect is not None):
+        parser.error("--headless can't be used with --replay or --connect")
+    if args.player is not None and args.player < 1:
+        parser.error("--player counts snakes from 1")
+    try:
+        scenario = make_scenario(
+            args.two_player, args.scenario, board=args.board,
+            snakes=args.snakes, snake_length=args.snake_length,
+            spawn=args.spawn, food=args.food, max_ticks=args.max_ticks
+        )
+    except (OSError, ValueError, TypeError) as e:
+        parser.error(f"invalid scenario: {e}")
     if args.debug:
         logging.basicConfig(
             filename='game.log', filemode='w', level=logging.DEBUG
         )
-    else:
+    elif not args.headless:
         logging.basicConfig(
             filename='game.log', filemode='w', level=logging.WARNING
         )
-    curses.wrapper(main, speed=args.game_speed, two_player=args.two_player)
+    profiler = None
+    if args.cprofile is not None:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+    try:
+        if args.headless:
+            print(json.dumps(headless(
+                ticks=args.ticks, seed=args.seed, scenario=scenario,
+                bot=args.bot, autopilot=args.autopilot, record=args.record
+            )))
+            return
+        import curses
+        if args.replay is not None:
+            from snakegame.replay import watch
+            curses.wrapper(watch, args.replay)
+        elif args.connect is not None:
+            from snakegame import server
+            player = args.player - 1 if args.player is not None else None
+            curses.wrapper(server.watch, *args.connect, player=player)
+        else:
+            curses.wrapper(
+                main, speed=args.game_speed, two_player=args.two_player,
+                seed=args.seed, record=args.record, profile=args.profile,
+                fps=args.fps, autopilot=args.autopilot, scenario=scenario,
+                bot=args.bot
+            )
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(args.cprofile)
 
 
 if __name__ == "__main__":
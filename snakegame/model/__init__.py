@@ -3,3 +3,4 @@
 from .game import Game
 from .snake import Snake
 from .util import key_groups, Point
+from .simulation import Simulation
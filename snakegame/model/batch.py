@@ -0,0 +1,292 @@
+"""A vectorised engine which steps many independent games in lockstep.
+
+Requires numpy, which can be installed with `pip install .[numpy]`.
+"""
+import numpy as np
+
+from snakegame.model.util import DIRECTIONS, Point
+
+#: Action meaning 'carry on in the current direction'
+NO_ACTION = -1
+
+
+class BatchGame:
+    """Holds the state of many games as numpy arrays and advances all of them
+    with a single call to step.
+
+    The rules are exactly those of Game.update, with the games stored as:
+
+    - flat square indices (y * width + x) covering the area from (0, 0) to
+      the game dimensions inclusive, as in OccupancyGrid
+    - a ring buffer per snake holding the squares of its body from tail to
+      head, with the position of the head and the length of the snake
+    - occupancy counts per game and per snake, and a food map per game
+
+    Snakes are indexed in the order they were added to the template games,
+    and directions use the integer codes given by their position in
+    util.DIRECTIONS.
+    """
+
+    def __init__(self, games, rng=None, max_length=None):
+        """
+        Parameters
+        ----------
+        games: list(Game)
+            The initial state of each game in the batch. All of them must
+            have the same dimensions and the same number of snakes.
+        rng: numpy.random.Generator or int, optional
+            The source of randomness used to place food, or a seed for one
+        max_length: int, optional
+            The longest a snake can grow, by default the number of squares
+        """
+        dimensions = {tuple(game.dimension_max) for game in games}
+        n_snakes = {len(game.snakes) for game in games}
+        if len(dimensions) != 1 or len(n_snakes) != 1:
+            raise ValueError(
+                "All games in a batch need the same dimensions and number of "
+                "snakes"
+            )
+        self.dimension_max = dimensions.pop()
+        self.n_games = len(games)
+        self.n_snakes = n_snakes.pop()
+        self.width = self.dimension_max[0] + 1
+        self.height = self.dimension_max[1] + 1
+        self.n_cells = self.width * self.height
+        self.max_length = max_length or self.n_cells
+        self.rng = np.random.default_rng(rng)
+
+        #: Change in flat square index for a step in each direction
+        self.deltas = np.array(
+            [d.y * self.width + d.x for d in DIRECTIONS], dtype=np.int64
+        )
+        xs, ys = np.meshgrid(
+            np.arange(self.width), np.arange(self.height), indexing='xy'
+        )
+        #: Whether each flat square is inside the game boundaries
+        self.in_bounds = (
+            (xs > 0) & (xs < self.dimension_max[0])
+            & (ys > 0) & (ys < self.dimension_max[1])
+        ).ravel()
+
+        shape = (self.n_games, self.n_snakes)
+        self.counts = np.zeros((self.n_games, self.n_cells), dtype=np.int16)
+        self.snake_counts = np.zeros(shape + (self.n_cells,), dtype=np.int16)
+        self.food = np.zeros((self.n_games, self.n_cells), dtype=bool)
+        self.body = np.zeros(shape + (self.max_length,), dtype=np.int64)
+        self.head_ptr = np.zeros(shape, dtype=np.int64)
+        self.length = np.zeros(shape, dtype=np.int64)
+        self.facing = np.zeros(shape, dtype=np.int64)
+        self.grow = np.zeros(shape, dtype=bool)
+        self.alive = np.zeros(shape, dtype=bool)
+        self.score = np.zeros(shape, dtype=np.int64)
+        self.ticks = np.zeros(self.n_games, dtype=np.int64)
+
+        for i, game in enumerate(games):
+            self.load_game(i, game)
+        self._initial = {name: getattr(self, name).copy() for name in (
+            'counts', 'snake_counts', 'food', 'body', 'head_ptr', 'length',
+            'facing', 'grow', 'alive', 'score', 'ticks'
+        )}
+
+    @classmethod
+    def repeat(cls, game, n_games, rng=None, max_length=None):
+        """Create a batch of identical copies of a game"""
+        return cls([game] * n_games, rng=rng, max_length=max_length)
+
+    def cell(self, point):
+        """The flat square index of a point"""
+        return point[1] * self.width + point[0]
+
+    def point(self, cell):
+        """The point corresponding to a flat square index"""
+        return Point(int(cell) % self.width, int(cell) // self.width)
+
+    def load_game(self, i, game):
+        """Copy the state of a Game into one slot of the batch
+
+        Parameters
+        ----------
+        i: int
+            The index of the game in the batch
+        game: Game
+            The game to copy
+        """
+        self.counts[i] = 0
+        self.snake_counts[i] = 0
+        self.food[i] = False
+        self.alive[i] = False
+        self.length[i] = 0
+        for s, snake in enumerate(game.snakes):
+            cells = [self.cell(p) for p in snake.points]
+            if len(cells) > self.max_length:
+                raise ValueError(f"Snake {snake.name} is too long")
+            self.body[i, s, :len(cells)] = cells
+            self.head_ptr[i, s] = len(cells) - 1
+            self.length[i, s] = len(cells)
+            self.facing[i, s] = DIRECTIONS.index(snake.facing)
+            self.grow[i, s] = snake.grow
+            self.alive[i, s] = True
+            self.score[i, s] = game.score[snake]
+            np.add.at(self.snake_counts[i, s], cells, 1)
+        for food in game.food:
+            self.food[i, self.cell(food)] = True
+        self.counts[i] = self.snake_counts[i].sum(axis=0) + self.food[i]
+        self.ticks[i] = game.ticks
+
+    def reset(self, games=None):
+        """Return games to their initial state
+
+        Parameters
+        ----------
+        games: array_like, optional
+            Indices or a boolean mask of the games to reset, by default all
+        """
+        if games is None:
+            games = slice(None)
+        for name, initial in self._initial.items():
+            getattr(self, name)[games] = initial[games]
+
+    @property
+    def done(self):
+        """Whether each game has finished, i.e. has no snakes left"""
+        return ~self.alive.any(axis=1)
+
+    def heads(self, games, s):
+        """Flat square indices of the heads of snake s in some games"""
+        return self.body[games, s, self.head_ptr[games, s]]
+
+    def tails(self, games, s):
+        """Flat square indices of the tails of snake s in some games"""
+        ptr = (self.head_ptr[games, s] - self.length[games, s] + 1)
+        return self.body[games, s, ptr % self.max_length]
+
+    def snake_points(self, i, s):
+        """The points of one snake from tail to head, as in Snake.points"""
+        ptrs = np.arange(
+            self.head_ptr[i, s] - self.length[i, s] + 1,
+            self.head_ptr[i, s] + 1
+        ) % self.max_length
+        return [self.point(cell) for cell in self.body[i, s, ptrs]]
+
+    def food_points(self, i):
+        """The positions of the food in one game"""
+        return [self.point(cell) for cell in np.flatnonzero(self.food[i])]
+
+    def _lose_tails(self, games, snakes):
+        """Remove the tail from each of the given (game, snake) pairs, which
+        must not contain repeats"""
+        tails = self.tails(games, snakes)
+        self.snake_counts[games, snakes, tails] -= 1
+        np.add.at(self.counts, (games, tails), -1)
+        self.length[games, snakes] -= 1
+
+    def _spawn_food(self, games):
+        """Place a food item on a random free square in each of the given
+        games, which must not contain repeats"""
+        free = (self.counts[games] == 0) & self.in_bounds
+        n_free = free.sum(axis=1)
+        has_space = n_free > 0
+        games = games[has_space]
+        free, n_free = free[has_space], n_free[has_space]
+        rank = (self.rng.random(len(games)) * n_free).astype(np.int64)
+        cells = np.argmax(free.cumsum(axis=1) > rank[:, None], axis=1)
+        self.food[games, cells] = True
+        self.counts[games, cells] += 1
+
+    def step(self, actions=None):
+        """Advance every unfinished game by one tick
+
+        Parameters
+        ----------
+        actions: array_like, optional
+            Direction codes of shape (n_games, n_snakes), with NO_ACTION for
+            snakes which should carry straight on
+
+        Returns
+        -------
+        numpy.ndarray
+            Whether each game has finished
+        """
+        alive = self.alive.copy()
+        self.ticks[alive.any(axis=1)] += 1
+        games, snakes = np.nonzero(alive)
+
+        # Change direction, ignoring attempts to turn back on yourself
+        if actions is not None:
+            acts = np.asarray(actions)[games, snakes]
+            turning = acts != NO_ACTION
+            g, s, a = games[turning], snakes[turning], acts[turning]
+            heads = self.body[g, s, self.head_ptr[g, s]]
+            necks = self.body[
+                g, s, (self.head_ptr[g, s] - 1) % self.max_length
+            ]
+            allowed = heads + self.deltas[a] != necks
+            self.facing[g[allowed], s[allowed]] = a[allowed]
+
+        # Move the snakes
+        heads = self.heads(games, snakes) + self.deltas[
+            self.facing[games, snakes]
+        ]
+        self.head_ptr[games, snakes] = (
+            self.head_ptr[games, snakes] + 1
+        ) % self.max_length
+        self.body[games, snakes, self.head_ptr[games, snakes]] = heads
+        self.length[games, snakes] += 1
+        self.snake_counts[games, snakes, heads] += 1
+        np.add.at(self.counts, (games, heads), 1)
+        shrinking = ~self.grow[games, snakes]
+        self._lose_tails(games[shrinking], snakes[shrinking])
+        self.grow[games, snakes] = False
+
+        # Resolve each snake in turn, in the same order as Game.update
+        to_remove = np.zeros_like(alive)
+        for s in range(self.n_snakes):
+            games = np.flatnonzero(alive[:, s])
+            if not games.size:
+                continue
+            heads = self.heads(games, s)
+
+            # Check for collisions with a food tile
+            eating = self.food[games, heads]
+            if eating.any():
+                g, h = games[eating], heads[eating]
+                self.food[g, h] = False
+                self.counts[g, h] -= 1
+                self.score[g, s] += 1
+                self.grow[g, s] = True
+                self._spawn_food(g)
+
+            # Check for collisions with a boundary or yourself
+            to_remove[games, s] |= (
+                ~self.in_bounds[heads]
+                | (self.length[games, s] == 1)
+                | (self.snake_counts[games, s, heads] > 1)
+            )
+
+            # Check for collisions with the other snakes
+            for o in range(self.n_snakes):
+                if o == s:
+                    continue
+                present = alive[games, o]
+                g, h = games[present], heads[present]
+                tails = self.tails(g, o)
+                on_tail = h == tails
+                blocks = self.snake_counts[g, o, h] - (
+                    on_tail & (self.length[g, o] > 1)
+                ) > 0
+                to_remove[g[blocks], s] = True
+                stealing = ~blocks & on_tail
+                if stealing.any():
+                    g = g[stealing]
+                    self.grow[g, s] = True
+                    self._lose_tails(g, np.full(len(g), o))
+
+        # Check everyone's still alive
+        to_remove |= alive & (self.length < 2)
+
+        games, snakes = np.nonzero(to_remove)
+        np.subtract.at(self.counts, games, self.snake_counts[games, snakes])
+        self.snake_counts[games, snakes] = 0
+        self.length[games, snakes] = 0
+        self.alive[games, snakes] = False
+        return self.done
@@ -1,38 +1,192 @@
 import random
+from collections import Counter
+from contextlib import contextmanager
+from typing import NamedTuple
 
-from snakegame.model.util import Point
+from snakegame.model.grid import (
+    OccupancyGrid, OccupiedSquares, UnoccupiedSquares
+)
+from snakegame.model.rng import GameRandom
+
+# Reasons for a snake being removed from the game
+BOUNDARY = 'boundary'
+SELF_COLLISION = 'self collision'
+SNAKE_COLLISION = 'snake collision'
+TOO_SHORT = 'too short'
+
+# Kinds of change published to a game's subscribers, as (kind, snake, value)
+# tuples:
+# - HEAD_ADVANCED: a snake moved, value is its new head
+# - TAIL_RETRACTED: a snake that didn't grow left the square in value
+# - TAIL_STOLEN: another snake's head took the tail in value
+# - FOOD_EATEN: a snake ate the food at value, its head
+# - FOOD_SPAWNED: food was placed on value, with no snake
+# - SCORE_CHANGED: value is the snake's new score
+# - SNAKE_REMOVED: the snake left the game, value is the reason
+# - RESET: the snakes or food were replaced wholesale, or a state restored,
+#   so anything kept up to date by the changes should start again
+# - QUIT: the game was quit
+(HEAD_ADVANCED, TAIL_RETRACTED, TAIL_STOLEN, FOOD_EATEN, FOOD_SPAWNED,
+ SCORE_CHANGED, SNAKE_REMOVED, RESET, QUIT) = range(9)
+
+
+class GameState(NamedTuple):
+    """An immutable copy of everything that changes as a game is played,
+    made by Game.snapshot"""
+    ticks: int
+    #: Each snake in the game, with the state returned by its snapshot
+    snakes: tuple
+    food: tuple
+    #: (snake, score) pairs
+    score: tuple
+    #: (snake, (tick, reason)) pairs
+    deaths: tuple
+    rng_state: tuple
+    #: The free squares, in the order food placement samples them from
+    free_cells: tuple
 
 
 class Game:
     """Represents the game area and objects within"""
 
-    def __init__(self, dimensions=(10, 10), tick_rate=1):
+    def __init__(self, dimensions=(10, 10), rng=None):
+        """
+        Parameters
+        ----------
+        dimensions: tuple(int, int)
+            The maximum x and y coordinates of the game area
+        rng: random.Random or int, optional
+            The source of randomness used to place food, or a seed for a
+            GameRandom. By default a GameRandom with a seed from the
+            operating system, which can be read from rng.root_seed.
+        """
         self.score = {}
-        self.snakes = []
-        self.food = []
         self.dimension_max = dimensions
-        # TODO: Move out of this class
-        self.tick_rate = tick_rate
+        #: Live count of the items on each square, kept up to date by the
+        #: snakes as they move and by the food handling below
+        self.grid = OccupancyGrid(dimensions)
+        self._snakes = []
+        self._food = []
+        # How many food items are on each square, for constant time lookups
+        self._food_squares = Counter()
+        #: The game's own source of randomness, shared with nothing else
+        self.rng = rng if isinstance(rng, random.Random) else GameRandom(rng)
+        #: Number of updates made so far
+        self.ticks = 0
+        #: Snakes removed during play, with the tick and reason for removal
+        self.deaths = {}
+        # Callbacks for the changes made by each tick, and while there are
+        # any, the events collected since they were last called
+        self._subscribers = []
+        self._events = None
+        # While there are checkpoints, a list of (function, args) calls which
+        # undo each change made since the first of them, in order, and the
+        # positions in that list, the grid's free cell log and the events of
+        # each checkpoint
+        self._undo_log = None
+        self._checkpoints = []
+
+    @property
+    def snakes(self):
+        """The snakes currently in the game"""
+        return self._snakes
+
+    @snakes.setter
+    def snakes(self, snakes):
+        for snake in self._snakes:
+            snake.grid = None
+        self._snakes = list(snakes)
+        self._rebuild_grid()
+
+    @property
+    def food(self):
+        """Positions of the food items currently in the game"""
+        return self._food
+
+    @food.setter
+    def food(self, food):
+        self._food = list(food)
+        self._food_squares = Counter(self._food)
+        self._rebuild_grid()
+
+    def _rebuild_grid(self):
+        """Recount the occupancy grid from scratch, used when the snakes or
+        food are replaced wholesale"""
+        self.grid = OccupancyGrid(self.dimension_max)
+        for snake in self._snakes:
+            snake.grid = self.grid
+            for point in snake.points:
+                self.grid.add(point, snake)
+        for food_pos in self._food:
+            self.grid.add(food_pos)
+        self._reset()
+
+    def subscribe(self, callback):
+        """Call a function with the changes made by every tick.
+
+        After each update the callback is passed the game and a list of
+        (kind, snake, value) events, like (HEAD_ADVANCED, snake, head), in
+        the order they happened. Food spawned between ticks is included
+        with the next tick. The list is reused, so should be copied to keep
+        it. Events are only collected while something is subscribed, and
+        changes made after a checkpoint are held back until every
+        checkpoint is rolled back or committed, so rolled back changes are
+        never seen.
+
+        Parameters
+        ----------
+        callback: callable
+            Called with the game and the list of events
+        """
+        self._subscribers.append(callback)
+        if self._events is None:
+            self._events = []
+
+    def unsubscribe(self, callback):
+        """Stop calling a function added with subscribe"""
+        self._subscribers.remove(callback)
+        if not self._subscribers:
+            self._events = None
+
+    def publish(self, events=None):
+        """Pass events to the subscribers, then forget them
+
+        Parameters
+        ----------
+        events: list, optional
+            The events to pass on, by default those collected by the game
+            since they were last published, e.g. for copies of a game which
+            learn of changes without playing it
+        """
+        if events is None:
+            events = self._events
+        if events is None:
+            return
+        for callback in self._subscribers:
+            callback(self, events)
+        events.clear()
+
+    def _reset(self):
+        """Tell the subscribers everything may have changed"""
+        if self._events is not None:
+            self._events.clear()
+            self._events.append((RESET, None, None))
+            if not self._checkpoints:
+                self.publish()
+
+    def has_food(self, pos):
+        """Check if there's food on a square"""
+        return self._food_squares[pos] > 0
 
     @property
     def occupied_squares(self):
         """Squares occupied by an item in the game"""
-        occupied = []
-        for snake in self.snakes:
-            occupied.extend(snake.points)
-        for food_pos in self.food:
-            occupied.append(food_pos)
-        return occupied
+        return OccupiedSquares(self.grid)
 
     @property
     def unoccupied_squares(self):
         """Squares unoccupied by an item in the game"""
-        unoccupied = [
-            Point(x, y) for x in range(1, self.dimension_max[0])
-            for y in range(1, self.dimension_max[1])
-            if Point(x, y) not in self.occupied_squares
-        ]
-        return unoccupied
+        return UnoccupiedSquares(self.grid)
 
     def add_snake(self, snake):
         """Add a player/snake character to the game
@@ -47,67 +201,348 @@ class Game:
         ValueError
             If the snake would have to be placed on occupied tiles
         """
-        intersections = snake.intersect(self.occupied_squares)
+        intersections = [
+            point for point in snake.points if self.grid.is_occupied(point)
+        ]
         if intersections:
             raise ValueError(
                 f"Snake cannot be added, item already occupying squares: "
                 f"{', '.join([str(p) for p in intersections])}"
             )
-        self.snakes.append(snake)
+        if self._undo_log is not None:
+            self._undo_log.append(
+                (self._undo_add_snake, (snake, self.score.get(snake)))
+            )
+        self._snakes.append(snake)
         self.score[snake] = 0
+        snake.grid = self.grid
+        for point in snake.points:
+            self.grid.add(point, snake)
+
+    def remove_snake(self, snake):
+        """Take a snake out of the game, freeing the squares it occupied"""
+        index = self._snakes.index(snake)
+        del self._snakes[index]
+        for point in snake.points:
+            self.grid.remove(point, snake)
+        snake.grid = None
+        if self._undo_log is not None:
+            self._undo_log.append((self._restore_snake, (snake, index)))
+
+    def _restore_snake(self, snake, index):
+        """Undo remove_snake, putting the snake back in its place in order"""
+        self._snakes.insert(index, snake)
+        snake.grid = self.grid
+        for point in snake.points:
+            self.grid.add(point, snake)
+
+    def _undo_add_snake(self, snake, score):
+        self.remove_snake(snake)
+        if score is None:
+            del self.score[snake]
+        else:
+            self.score[snake] = score
 
     def add_food(self, position):
         """Add a food item to the game"""
-        self.food.append(position)
+        self._food.append(position)
+        self._food_squares[position] += 1
+        self.grid.add(position)
+        if self._undo_log is not None:
+            self._undo_log.append((self.remove_food, (position,)))
+
+    def remove_food(self, position):
+        """Remove a food item from the game"""
+        index = self._food.index(position)
+        del self._food[index]
+        self._food_squares[position] -= 1
+        self.grid.remove(position)
+        if self._undo_log is not None:
+            self._undo_log.append((self._restore_food, (position, index)))
+
+    def _restore_food(self, position, index):
+        """Undo remove_food, putting the item back in its place in the list"""
+        self._food.insert(index, position)
+        self._food_squares[position] += 1
+        self.grid.add(position)
+
+    def spawn_food(self):
+        """Add a food item on a random unoccupied square, if there is one
+
+        Returns
+        -------
+        Point or None
+            Where the food was placed
+        """
+        if self._undo_log is not None:
+            self._undo_log.append((self.rng.setstate, (self.rng.getstate(),)))
+        position = self.grid.random_unoccupied(self.rng)
+        if position is not None:
+            self.add_food(position)
+            if self._events is not None:
+                self._events.append((FOOD_SPAWNED, None, position))
+        return position
 
     def update(self):
         """Step the game forward, moving player characters and checking for
         collisions"""
+        log = self._undo_log
+        events = self._events
+        if log is not None:
+            log.append((setattr, (self, 'ticks', self.ticks)))
+        self.ticks += 1
 
         # Move the snakes
         for snake in self.snakes:
+            if log is not None:
+                log.append((snake.undo_move, (
+                    None if snake.grow else snake.tail, snake.grow
+                )))
+            if events is None:
+                snake.move()
+                continue
+            tail = None if snake.grow else snake.tail
             snake.move()
+            events.append((HEAD_ADVANCED, snake, snake.head))
+            if tail is not None:
+                events.append((TAIL_RETRACTED, snake, tail))
 
-        # Snakes which should be removed this turn
-        to_remove = set()
+        # Snakes which should be removed this turn, and the first reason
+        to_remove = {}
+        order = {snake: i for i, snake in enumerate(self.snakes)}
 
         for snake in self.snakes:
             # Check for collisions with a food tile
-            if snake.head in self.food:
-                self.food.remove(snake.head)
+            if self._food_squares[snake.head] > 0:
+                if log is not None:
+                    log.append((self.score.__setitem__,
+                                (snake, self.score[snake])))
+                    log.append((setattr, (snake, 'grow', snake.grow)))
+                self.remove_food(snake.head)
                 self.score[snake] += 1
                 snake.grow_next_turn()
-                self.add_food(random.choice(self.unoccupied_squares))
+                if events is not None:
+                    events.append((FOOD_EATEN, snake, snake.head))
+                    events.append(
+                        (SCORE_CHANGED, snake, self.score[snake])
+                    )
+                self.spawn_food()
 
             # Check for collisions with a boundary
             if not self.in_bounds(snake.head):
-                to_remove.add(snake)
+                to_remove.setdefault(snake, BOUNDARY)
 
             # Check for collisions with yourself
-            if snake.head in snake.body + [snake.tail]:
-                to_remove.add(snake)
-
-            # Check for collisions with the other player
-            for othersnake in self.snakes[:]:
-                if snake == othersnake:
-                    continue
-                if snake.head in othersnake.body + [othersnake.head]:
-                    to_remove.add(snake)
+            if snake.collided_with_self():
+                to_remove.setdefault(snake, SELF_COLLISION)
+
+            # Check for collisions with the other snakes. Only those with a
+            # segment on our head's square can be hit, and they're checked
+            # in the order they were added to the game
+            others = [
+                othersnake for othersnake in self.grid.owners_at(snake.head)
+                if othersnake is not snake
+            ]
+            if len(others) > 1:
+                others.sort(key=order.__getitem__)
+            for othersnake in others:
+                if othersnake.blocks(snake.head):
+                    to_remove.setdefault(snake, SNAKE_COLLISION)
                 elif snake.head == othersnake.tail:
+                    if log is not None:
+                        log.append((setattr, (snake, 'grow', snake.grow)))
+                        log.append((othersnake.restore_tail, (snake.head,)))
                     snake.grow_next_turn()
+                    if events is not None:
+                        events.append(
+                            (TAIL_STOLEN, othersnake, othersnake.tail)
+                        )
                     othersnake.lose_tail()
 
-            # Check everyone's still alive
-            for snake in self.snakes:
-                if len(snake.points) < 2:
-                    to_remove.add()
+        # Check everyone's still alive
+        for snake in self.snakes:
+            if len(snake.points) < 2:
+                to_remove.setdefault(snake, TOO_SHORT)
+
+        for snake, reason in to_remove.items():
+            self.remove_snake(snake)
+            if log is not None:
+                log.append((self.deaths.pop, (snake,)))
+            self.deaths[snake] = (self.ticks, reason)
+            if events is not None:
+                events.append((SNAKE_REMOVED, snake, reason))
+
+        if events is not None and not self._checkpoints:
+            self.publish()
+
+    def checkpoint(self):
+        """Mark the current state, so that later changes to the game can be
+        undone with rollback.
+
+        Changes are recorded in an undo log as they're made, so rolling back
+        costs time in proportion to the changes since the checkpoint rather
+        than to the size of the game. Checkpoints can be nested, e.g. once
+        per level of a search tree. Changes made by the game's subscribers
+        aren't undone, and nor is replacing its snakes or food wholesale.
+
+        Returns
+        -------
+        int
+            Identifies the checkpoint, to pass to rollback or commit
+        """
+        free_cells = self.grid.free_cells
+        if self._undo_log is None:
+            self._undo_log = []
+            free_cells.log = []
+        checkpoint = len(self._undo_log)
+        self._checkpoints.append((
+            checkpoint, len(free_cells.log),
+            0 if self._events is None else len(self._events)
+        ))
+        # Directions are set from outside the game, so aren't in the log
+        self._undo_log.append((self._restore_facing, (
+            [(snake, snake.facing) for snake in self._snakes],
+        )))
+        return checkpoint
+
+    def _restore_facing(self, facings):
+        for snake, facing in facings:
+            snake.facing = facing
+
+    def rollback(self, checkpoint):
+        """Undo every change made since a checkpoint, along with any later
+        checkpoints
+
+        Parameters
+        ----------
+        checkpoint: int
+            As returned by checkpoint
+        """
+        free_position, events_position = self._pop_checkpoint(checkpoint)
+        log, free_cells = self._undo_log, self.grid.free_cells
+        # Stop recording while the changes are undone
+        self._undo_log = None
+        while len(log) > checkpoint:
+            function, args = log.pop()
+            function(*args)
+        # Undoing shuffles the free squares, so reverse everything done to
+        # them since the checkpoint, undoing included, to leave them in the
+        # same order as before and food placement the same
+        free_log = free_cells.log
+        while len(free_log) > free_position:
+            free_cells.undo(free_log.pop())
+        if self._events is not None:
+            del self._events[events_position:]
+        if self._checkpoints:
+            self._undo_log = log
+        else:
+            free_cells.log = None
+
+    def commit(self, checkpoint):
+        """Keep the changes made since a checkpoint, forgetting it and any
+        later checkpoints. Earlier checkpoints can still be rolled back.
+
+        Parameters
+        ----------
+        checkpoint: int
+            As returned by checkpoint
+        """
+        self._pop_checkpoint(checkpoint)
+        if not self._checkpoints:
+            self._undo_log = None
+            self.grid.free_cells.log = None
+
+    def _pop_checkpoint(self, checkpoint):
+        """Forget a checkpoint and those after it, returning its positions
+        in the free cell log and the events"""
+        positions = {
+            position: others for position, *others in self._checkpoints
+        }
+        if checkpoint not in positions:
+            raise ValueError(f"No checkpoint {checkpoint!r} to return to")
+        while self._checkpoints.pop()[0] != checkpoint:
+            pass
+        return positions[checkpoint]
+
+    @contextmanager
+    def trial(self):
+        """Context manager which undoes every change made inside it, e.g.
 
-        if to_remove:
-            for snake in to_remove:
-                self.snakes.remove(snake)
+            with game.trial():
+                snake.set_direction(UP)
+                game.update()
+                value = evaluate(game)
+        """
+        checkpoint = self.checkpoint()
+        try:
+            yield self
+        finally:
+            self.rollback(checkpoint)
+
+    def snapshot(self):
+        """An immutable copy of the game's state, which restore can return
+        to at any time. This copies the snakes, food and the free squares,
+        so for many copies of a big board, checkpoint and rollback are
+        cheaper.
+
+        Returns
+        -------
+        GameState
+        """
+        return GameState(
+            ticks=self.ticks,
+            snakes=tuple(
+                (snake, snake.snapshot()) for snake in self._snakes
+            ),
+            food=tuple(self._food),
+            score=tuple(self.score.items()),
+            deaths=tuple(self.deaths.items()),
+            rng_state=self.rng.getstate(),
+            free_cells=tuple(self.grid.free_cells),
+        )
+
+    def restore(self, state):
+        """Return to a state saved by snapshot, discarding any checkpoints
+
+        Parameters
+        ----------
+        state: GameState
+            As returned by snapshot
+        """
+        self._undo_log = None
+        self._checkpoints = []
+        grid = self.grid
+        for snake in self._snakes:
+            for point in snake.points:
+                grid.remove(point, snake)
+            snake.grid = None
+        for position in self._food:
+            grid.remove(position)
+        self._snakes = []
+        for snake, snake_state in state.snakes:
+            snake.restore(snake_state)
+            snake.grid = grid
+            for point in snake.points:
+                grid.add(point, snake)
+            self._snakes.append(snake)
+        self._food = list(state.food)
+        self._food_squares = Counter(self._food)
+        for position in self._food:
+            grid.add(position)
+        self.ticks = state.ticks
+        self.score = dict(state.score)
+        self.deaths = dict(state.deaths)
+        self.rng.setstate(state.rng_state)
+        grid.free_cells.log = None
+        grid.free_cells.replace(state.free_cells)
+        self._reset()
 
     def quit(self):
         """A kind of roundabout way to quit the game!"""
+        if self._events is not None:
+            self._events.append((QUIT, None, None))
+            if not self._checkpoints:
+                self.publish()
         self.snakes = []
 
     def in_bounds(self, pos):
@@ -0,0 +1,338 @@
+"""Incrementally maintained occupancy information for the game board"""
+from snakegame.model.util import Point
+
+
+class FreeCells:
+    """An indexable set of flat square indices.
+
+    Items are kept densely packed in a list alongside a map from each item to
+    its slot, so adding, removing (by swapping the last item into the hole)
+    and uniform random sampling are all constant time.
+    """
+
+    def __init__(self, size, items=()):
+        """
+        Parameters
+        ----------
+        size: int
+            Items must lie in range(size)
+        items: Iterable(int)
+            The initial contents of the set, without repeats
+        """
+        self.items = list(items)
+        self.slots = [-1] * size
+        for slot, item in enumerate(self.items):
+            self.slots[item] = slot
+        #: List collecting an (item, slot) entry for each change, which undo
+        #: can reverse exactly, restoring the order sampling depends on.
+        #: Slot -1 marks an addition. None disables it.
+        self.log = None
+
+    def __len__(self):
+        return len(self.items)
+
+    def __contains__(self, item):
+        return self.slots[item] >= 0
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __getitem__(self, slot):
+        return self.items[slot]
+
+    def add(self, item):
+        """Add an item to the set if it isn't already present"""
+        if self.slots[item] < 0:
+            self.slots[item] = len(self.items)
+            self.items.append(item)
+            if self.log is not None:
+                self.log.append((item, -1))
+
+    def discard(self, item):
+        """Remove an item from the set if it is present"""
+        slot = self.slots[item]
+        if slot < 0:
+            return
+        last = self.items.pop()
+        if last != item:
+            self.items[slot] = last
+            self.slots[last] = slot
+        self.slots[item] = -1
+        if self.log is not None:
+            self.log.append((item, slot))
+
+    def undo(self, entry):
+        """Reverse a change recorded in the log, which must be the latest
+        change not yet undone
+
+        Parameters
+        ----------
+        entry: tuple(int, int)
+            An (item, slot) entry from the log
+        """
+        item, slot = entry
+        if slot < 0:
+            self.items.pop()
+            self.slots[item] = -1
+            return
+        if slot < len(self.items):
+            # Move the item which filled the hole back to the end
+            moved = self.items[slot]
+            self.items[slot] = item
+            self.slots[moved] = len(self.items)
+            self.items.append(moved)
+        else:
+            self.items.append(item)
+        self.slots[item] = slot
+
+    def replace(self, items):
+        """Replace the contents, in the given order
+
+        Parameters
+        ----------
+        items: Iterable(int)
+            The new contents of the set, without repeats
+        """
+        for item in self.items:
+            self.slots[item] = -1
+        self.items = list(items)
+        for slot, item in enumerate(self.items):
+            self.slots[item] = slot
+
+    def sample(self, rng):
+        """Pick an item uniformly at random
+
+        Parameters
+        ----------
+        rng: random.Random
+            The source of randomness
+
+        Returns
+        -------
+        int or None
+            None if the set is empty
+        """
+        if not self.items:
+            return None
+        return self.items[rng.randrange(len(self.items))]
+
+
+class OccupancyGrid:
+    """Counts how many game items (snake segments or food) sit on each square.
+
+    The grid is stored as a flat list covering every square from (0, 0) to
+    the game dimensions inclusive, so a snake head that has just stepped into
+    a wall can still be tracked until it is removed. Only squares strictly
+    inside the boundary are considered when asking for unoccupied squares,
+    and those are kept in a FreeCells set for constant time sampling.
+    """
+
+    def __init__(self, dimensions):
+        """
+        Parameters
+        ----------
+        dimensions: tuple(int, int)
+            The maximum x and y coordinates of the game area
+        """
+        self.dimension_max = tuple(dimensions)
+        self.width = self.dimension_max[0] + 1
+        self.height = self.dimension_max[1] + 1
+        self.counts = [0] * (self.width * self.height)
+        #: Flat indices of the in-bounds squares that nothing occupies
+        self.free_cells = FreeCells(
+            len(self.counts),
+            (
+                y * self.width + x
+                for y in range(1, self.dimension_max[1])
+                for x in range(1, self.dimension_max[0])
+            )
+        )
+        #: The snakes on each square, keyed by flat index, with how many of
+        #: each snake's segments are there
+        self.owners = {}
+
+    @property
+    def free(self):
+        """Number of in-bounds squares that nothing occupies"""
+        return len(self.free_cells)
+
+    def index(self, pos):
+        """The flat index of a point, or None if the grid doesn't cover it
+
+        Parameters
+        ----------
+        pos: Point
+            A point on the game grid
+        """
+        x, y = pos
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return y * self.width + x
+        return None
+
+    def point(self, index):
+        """The point corresponding to a flat index"""
+        return Point(index % self.width, index // self.width)
+
+    def in_bounds(self, pos):
+        """Check if a point lies strictly inside the game boundaries"""
+        x, y = pos
+        return 0 < x < self.dimension_max[0] and 0 < y < self.dimension_max[1]
+
+    def add(self, pos, owner=None):
+        """Record an item arriving on a square
+
+        Parameters
+        ----------
+        pos: Point
+            The square the item now occupies
+        owner: Snake, optional
+            The snake the item is a segment of
+        """
+        idx = self.index(pos)
+        if idx is None:
+            return
+        if self.counts[idx] == 0:
+            self.free_cells.discard(idx)
+        self.counts[idx] += 1
+        if owner is not None:
+            owners = self.owners.get(idx)
+            if owners is None:
+                self.owners[idx] = {owner: 1}
+            else:
+                owners[owner] = owners.get(owner, 0) + 1
+
+    def remove(self, pos, owner=None):
+        """Record an item leaving a square
+
+        Parameters
+        ----------
+        pos: Point
+            The square the item no longer occupies
+        owner: Snake, optional
+            The snake the item is a segment of
+        """
+        idx = self.index(pos)
+        if idx is None:
+            return
+        self.counts[idx] -= 1
+        if owner is not None:
+            owners = self.owners[idx]
+            if owners[owner] == 1:
+                del owners[owner]
+                if not owners:
+                    del self.owners[idx]
+            else:
+                owners[owner] -= 1
+        if self.counts[idx] == 0 and self.in_bounds(pos):
+            self.free_cells.add(idx)
+
+    def count(self, pos):
+        """Number of items occupying a square"""
+        idx = self.index(pos)
+        if idx is None:
+            return 0
+        return self.counts[idx]
+
+    def owners_at(self, pos):
+        """The snakes with a segment on a square, in no particular order"""
+        idx = self.index(pos)
+        if idx is None or idx not in self.owners:
+            return []
+        return list(self.owners[idx])
+
+    def occupants(self, pos):
+        """The snakes on a square along with the role of the segment there:
+        'head', 'tail' or 'body'. A snake whose head has run into its own
+        body or tail is listed once for each.
+
+        Parameters
+        ----------
+        pos: Point
+            A point on the game grid
+
+        Returns
+        -------
+        list(tuple(Snake, str))
+        """
+        occupants = []
+        idx = self.index(pos)
+        for snake, count in self.owners.get(idx, {}).items():
+            if pos == snake.head:
+                occupants.append((snake, 'head'))
+                count -= 1
+            if count and pos == snake.tail:
+                occupants.append((snake, 'tail'))
+                count -= 1
+            occupants.extend((snake, 'body') for _ in range(count))
+        return occupants
+
+    def is_occupied(self, pos):
+        """Check if anything occupies a square"""
+        return self.count(pos) > 0
+
+    def occupied(self):
+        """Iterate over every occupied square"""
+        for idx, count in enumerate(self.counts):
+            if count:
+                yield self.point(idx)
+
+    def unoccupied(self):
+        """Iterate over every unoccupied in-bounds square, in no particular
+        order"""
+        for idx in self.free_cells:
+            yield self.point(idx)
+
+    def random_unoccupied(self, rng):
+        """Pick an unoccupied in-bounds square uniformly at random
+
+        Parameters
+        ----------
+        rng: random.Random
+            The source of randomness
+
+        Returns
+        -------
+        Point or None
+            None if every square is occupied
+        """
+        idx = self.free_cells.sample(rng)
+        if idx is None:
+            return None
+        return self.point(idx)
+
+
+class OccupiedSquares:
+    """A read-only view of the squares occupied by items in the game"""
+
+    def __init__(self, grid):
+        self.grid = grid
+
+    def __contains__(self, pos):
+        return self.grid.is_occupied(pos)
+
+    def __iter__(self):
+        return self.grid.occupied()
+
+    def __len__(self):
+        return sum(1 for count in self.grid.counts if count)
+
+
+class UnoccupiedSquares:
+    """A read-only view of the in-bounds squares with nothing on them"""
+
+    def __init__(self, grid):
+        self.grid = grid
+
+    def __contains__(self, pos):
+        return self.grid.in_bounds(pos) and not self.grid.is_occupied(pos)
+
+    def __iter__(self):
+        return self.grid.unoccupied()
+
+    def __len__(self):
+        return self.grid.free
+
+    def __getitem__(self, i):
+        """Index into the free squares, which lets random.choice pick one in
+        constant time"""
+        return self.grid.point(self.grid.free_cells[i])
@@ -0,0 +1,49 @@
+"""Standard starting positions for new games"""
+from snakegame.model.scenario import Scenario
+from snakegame.model.util import Point
+
+#: Size of the classic game area
+CLASSIC_DIMENSIONS = (12, 12)
+#: Where each player's snake starts in the classic game, tail to head
+CLASSIC_START_POINTS = [
+    [[3, 3], [3, 4], [3, 5]],
+    [[7, 8], [7, 7], [7, 6]],
+]
+#: Where the first food item is placed in the classic game
+CLASSIC_FOOD = Point(5, 6)
+
+
+def classic_scenario(n_players=1):
+    """The 12x12 game played by snake_game, for one or two players
+
+    Parameters
+    ----------
+    n_players: int
+        The number of snakes, named snake1, snake2
+
+    Returns
+    -------
+    Scenario
+    """
+    if not 1 <= n_players <= len(CLASSIC_START_POINTS):
+        raise ValueError(
+            f"The classic game is for 1 to {len(CLASSIC_START_POINTS)} players"
+        )
+    return Scenario(
+        dimensions=CLASSIC_DIMENSIONS,
+        snakes=CLASSIC_START_POINTS[:n_players],
+        food=[CLASSIC_FOOD],
+    )
+
+
+def classic_game(n_players=1, rng=None):
+    """A new game of the classic scenario
+
+    Parameters
+    ----------
+    n_players: int
+        The number of snakes, named snake1, snake2
+    rng: random.Random or int, optional
+        The source of randomness used to place food
+    """
+    return classic_scenario(n_players).make_game(rng)
@@ -0,0 +1,78 @@
+"""Random number generation for games, reproducible from a seed.
+
+A GameRandom is a random.Random which remembers its seed, so any game can be
+replayed, and which can be split into child streams named by keys. Each
+child's stream depends only on the root seed and the keys leading to it, not
+on how much of any other stream has been used, so a batch of games seeded
+with rng.split(n) places food the same way however the games are shared
+out between threads or worker processes.
+
+Streams are seeded from strings like '1234:0:5', hashed by random.Random with
+SHA-512, so they're the same on every platform and Python version.
+"""
+import random
+
+
+class GameRandom(random.Random):
+    """A seedable, serialisable and splittable source of randomness"""
+
+    def __init__(self, seed=None, path=()):
+        """
+        Parameters
+        ----------
+        seed: int, optional
+            The root seed. By default one is drawn from the operating
+            system, and kept in root_seed so the game can be reproduced.
+        path: tuple
+            Keys of the child streams leading from the root to this one
+        """
+        if seed is None:
+            seed = random.SystemRandom().getrandbits(64)
+        #: The seed of the root stream this one was split from
+        self.root_seed = seed
+        #: Keys leading from the root stream to this one
+        self.path = tuple(path)
+        super().__init__(':'.join(str(key) for key in (seed,) + self.path))
+
+    def child(self, key):
+        """An independent stream identified by a key
+
+        Parameters
+        ----------
+        key: int or str
+            Names the stream, e.g. the index of a game in a batch
+
+        Returns
+        -------
+        GameRandom
+        """
+        return GameRandom(self.root_seed, self.path + (key,))
+
+    def split(self, n):
+        """Independent streams for n games, the children keyed 0 to n-1"""
+        return [self.child(i) for i in range(n)]
+
+    def to_dict(self):
+        """The seed, path and current position in the stream, as a
+        JSON-compatible dict"""
+        version, internal, gauss = self.getstate()
+        return {
+            'seed': self.root_seed,
+            'path': list(self.path),
+            'state': [version, list(internal), gauss],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Recreate a stream saved with to_dict, at the same position"""
+        rng = cls(data['seed'], data['path'])
+        version, internal, gauss = data['state']
+        rng.setstate((version, tuple(internal), gauss))
+        return rng
+
+    def __reduce__(self):
+        return self.__class__, (self.root_seed, self.path), self.getstate()
+
+    def __repr__(self):
+        path = ''.join(f'[{key!r}]' for key in self.path)
+        return f'GameRandom({self.root_seed}){path}'
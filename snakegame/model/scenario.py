@@ -0,0 +1,263 @@
+"""Game setups described by data, so boards, players and food can be chosen
+from a file or the command line rather than being fixed in code.
+
+A scenario is stored as a JSON object, e.g.
+
+    {
+        "dimensions": [500, 500],
+        "snakes": 200,
+        "snake_length": 4,
+        "spawn": "random",
+        "food": 50,
+        "max_ticks": 10000
+    }
+
+"snakes" is either a number of snakes to place with the spawn strategy, or a
+list of start points for each snake, tail to head. "food" is likewise either
+a number of items, placed at random, or a list of positions. Every food item
+eaten is replaced, so the number on the board stays the same.
+"""
+import json
+
+from snakegame.model.game import Game
+from snakegame.model.snake import Snake
+from snakegame.model.util import DIRECTIONS, Point
+
+#: Ways of choosing where snakes start
+#:
+#: - random: straight snakes at random positions, facing random directions
+#: - lanes: snakes facing up in every other column, in bands of
+#:   snake_length plus clearance rows
+SPAWNS = ('random', 'lanes')
+
+
+def place_snakes(game, n_snakes, length=3, spawn='random', clearance=2,
+                 names=None, max_attempts=100):
+    """Add straight snakes to a game on squares nothing else occupies.
+
+    Each candidate position is checked against the game's occupancy grid,
+    so placing a snake costs time in proportion to its length however many
+    snakes are already on the board.
+
+    Parameters
+    ----------
+    game: Game
+        The game to add the snakes to. Random positions come from game.rng.
+    n_snakes: int
+        How many snakes to add
+    length: int
+        The length of each snake
+    spawn: str
+        One of SPAWNS
+    clearance: int
+        Free, in-bounds squares required in front of each snake's head
+    names: Iterable(str), optional
+        Names for the snakes, by default snake1, snake2... numbered on from
+        the snakes already in the game
+    max_attempts: int
+        Random positions tried per snake, on average, before giving up
+
+    Returns
+    -------
+    list(Snake)
+        The snakes added
+
+    Raises
+    ------
+    ValueError
+        If there isn't room for all the snakes
+    """
+    if length < 2:
+        raise ValueError("Snakes must be at least 2 squares long")
+    if spawn not in SPAWNS:
+        raise ValueError(f"Unknown spawn {spawn!r}, expected one of {SPAWNS}")
+    if names is None:
+        first = len(game.snakes) + 1
+        names = (f'snake{i}' for i in range(first, first + n_snakes))
+    names = iter(names)
+    if spawn == 'random':
+        positions = _random_positions(game, length, clearance, max_attempts)
+    else:
+        positions = _lane_positions(game, length, clearance)
+
+    snakes = []
+    for _ in range(n_snakes):
+        start_points = next(positions, None)
+        if start_points is None:
+            raise ValueError(
+                f"Only found room for {len(snakes)} of {n_snakes} snakes of "
+                f"length {length} on a board of size {game.dimension_max}"
+            )
+        snake = Snake(name=next(names), start_points=start_points)
+        game.add_snake(snake)
+        snakes.append(snake)
+    return snakes
+
+
+def _is_clear(grid, points, reserved):
+    return all(
+        grid.in_bounds(p) and not grid.is_occupied(p) and p not in reserved
+        for p in points
+    )
+
+
+def _random_positions(game, length, clearance, max_attempts):
+    """Straight snakes with their heads on random free squares, as long as
+    free squares can be found in max_attempts tries per snake"""
+    grid, rng = game.grid, game.rng
+    # Squares in front of the snakes already placed
+    reserved = set()
+    budget = max_attempts
+    while budget > 0:
+        budget -= 1
+        head = grid.random_unoccupied(rng)
+        if head is None:
+            return
+        dx, dy = rng.choice(DIRECTIONS)
+        points = [
+            Point(head.x - dx * i, head.y - dy * i)
+            for i in range(length - 1, -1, -1)
+        ]
+        ahead = [
+            Point(head.x + dx * i, head.y + dy * i)
+            for i in range(1, clearance + 1)
+        ]
+        if _is_clear(grid, points + ahead, reserved):
+            budget += max_attempts
+            reserved.update(ahead)
+            yield points
+
+
+def _lane_positions(game, length, clearance):
+    """Snakes facing up in every other column, in bands from the top of the
+    board down, skipping any which would overlap something"""
+    grid = game.grid
+    x_max, y_max = game.dimension_max
+    band = length + clearance
+    for top in range(1, y_max - band + 1, band):
+        for x in range(1, x_max, 2):
+            # Tail at the bottom of the band, clear squares above the head
+            points = [Point(x, top + band - 1 - i) for i in range(length)]
+            ahead = [Point(x, top + i) for i in range(clearance)]
+            if _is_clear(grid, points + ahead, ()):
+                yield points
+
+
+class Scenario:
+    """A description of the board, players, food and limits of a game"""
+
+    def __init__(self, dimensions=(12, 12), snakes=1, snake_length=3,
+                 spawn='random', food=1, max_ticks=None):
+        """
+        Parameters
+        ----------
+        dimensions: tuple(int, int)
+            The maximum x and y coordinates of the game area
+        snakes: int or list(list(tuple(int, int)))
+            Either the number of snakes to place with the spawn strategy,
+            or the start points of each snake, tail to head
+        snake_length: int
+            The length of snakes placed by the spawn strategy
+        spawn: str
+            One of SPAWNS
+        food: int or list(tuple(int, int))
+            Either a number of food items placed at random, or their
+            positions
+        max_ticks: int, optional
+            The game is stopped after this many ticks
+        """
+        self.dimensions = tuple(dimensions)
+        self.snakes = snakes
+        self.snake_length = snake_length
+        self.spawn = spawn
+        self.food = food
+        self.max_ticks = max_ticks
+        if spawn not in SPAWNS:
+            raise ValueError(
+                f"Unknown spawn {spawn!r}, expected one of {SPAWNS}"
+            )
+
+    @property
+    def n_snakes(self):
+        """The number of snakes the game starts with"""
+        if isinstance(self.snakes, int):
+            return self.snakes
+        return len(self.snakes)
+
+    @classmethod
+    def from_dict(cls, data):
+        """Make a scenario from a dict of its constructor's arguments, as
+        loaded from JSON
+
+        Raises
+        ------
+        ValueError
+            If there are unknown keys
+        """
+        unknown = set(data).difference(cls().to_dict())
+        if unknown:
+            raise ValueError(
+                f"Unknown scenario settings: {', '.join(sorted(unknown))}"
+            )
+        return cls(**data)
+
+    @classmethod
+    def load(cls, path):
+        """Read a scenario from a JSON file"""
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+    def to_dict(self):
+        """The scenario as a JSON-compatible dict"""
+        return {
+            'dimensions': list(self.dimensions),
+            'snakes': self.snakes,
+            'snake_length': self.snake_length,
+            'spawn': self.spawn,
+            'food': self.food,
+            'max_ticks': self.max_ticks,
+        }
+
+    def save(self, path):
+        """Write the scenario to a JSON file"""
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    def make_game(self, rng=None):
+        """Set up a new game as described
+
+        Parameters
+        ----------
+        rng: random.Random or int, optional
+            The source of randomness used to place snakes and food
+
+        Returns
+        -------
+        Game
+
+        Raises
+        ------
+        ValueError
+            If the snakes or food don't fit on the board
+        """
+        game = Game(dimensions=self.dimensions, rng=rng)
+        if isinstance(self.snakes, int):
+            place_snakes(
+                game, self.snakes, length=self.snake_length, spawn=self.spawn
+            )
+        else:
+            for i, start_points in enumerate(self.snakes, 1):
+                game.add_snake(
+                    Snake(name=f'snake{i}', start_points=start_points)
+                )
+        if isinstance(self.food, int):
+            for _ in range(self.food):
+                if game.spawn_food() is None:
+                    raise ValueError(
+                        f"No room for {self.food} food items on a board of "
+                        f"size {self.dimensions}"
+                    )
+        else:
+            for position in self.food:
+                game.add_food(Point(*position))
+        return game
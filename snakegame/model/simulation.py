@@ -0,0 +1,116 @@
+"""Headless stepping of a game, without any rendering, input or event loop"""
+
+
+class Simulation:
+    """Advances a Game as fast as the CPU allows.
+
+    Directions can come from controllers, which are called every tick, or be
+    injected directly for each tick. A controller is any callable taking the
+    game and the snake it steers and returning a direction (one of the
+    LEFT, RIGHT, UP, DOWN points in util) or None to carry straight on.
+    """
+
+    def __init__(self, game, controllers=None):
+        """
+        Parameters
+        ----------
+        game: Game
+            The game to advance
+        controllers: dict(Snake or str, callable), optional
+            Controllers for some or all of the snakes, keyed by the snake or
+            its name
+        """
+        self.game = game
+        self.controllers = {}
+        for key, controller in (controllers or {}).items():
+            self.controllers[self.find_snake(key)] = controller
+
+    @property
+    def finished(self):
+        """Whether the game has ended, i.e. there are no snakes left"""
+        return not self.game.snakes
+
+    def find_snake(self, key):
+        """Look up a snake in the game
+
+        Parameters
+        ----------
+        key: Snake or str
+            The snake itself or its name
+
+        Raises
+        ------
+        KeyError
+            If no snake in the game matches
+        """
+        for snake in self.game.snakes:
+            if snake is key or snake.name == key:
+                return snake
+        raise KeyError(f"No snake {key!r} in the game")
+
+    def apply_inputs(self, inputs):
+        """Set snake directions ahead of the next update
+
+        Parameters
+        ----------
+        inputs: dict(Snake or str, Point)
+            New directions keyed by the snake or its name. Snakes which have
+            already left the game are ignored.
+        """
+        for key, direction in inputs.items():
+            if direction is None:
+                continue
+            try:
+                snake = self.find_snake(key)
+            except KeyError:
+                continue
+            snake.set_direction(direction)
+
+    def step(self, inputs=None):
+        """Advance the game by one tick
+
+        Parameters
+        ----------
+        inputs: dict(Snake or str, Point), optional
+            Directions to apply this tick, which take precedence over any
+            controllers
+
+        Returns
+        -------
+        bool
+            True if the game has finished
+        """
+        for snake in self.game.snakes:
+            controller = self.controllers.get(snake)
+            if controller is not None:
+                direction = controller(self.game, snake)
+                if direction is not None:
+                    snake.set_direction(direction)
+        if inputs:
+            self.apply_inputs(inputs)
+        self.game.update()
+        return self.finished
+
+    def run(self, ticks=None, inputs=None):
+        """Advance the game until it finishes or a number of ticks have run
+
+        Parameters
+        ----------
+        ticks: int, optional
+            The maximum number of ticks to run, by default run until the game
+            finishes
+        inputs: Iterable(dict(Snake or str, Point)), optional
+            Directions to apply on successive ticks. Once exhausted, the
+            snakes are left to their controllers.
+
+        Returns
+        -------
+        int
+            The number of ticks that were run
+        """
+        inputs = iter(inputs) if inputs is not None else iter(())
+        count = 0
+        while not self.finished and (ticks is None or count < ticks):
+            self.step(next(inputs, None))
+            count += 1
+        return count
@@ -1,4 +1,7 @@
 import logging
+from collections import Counter, deque
+from collections.abc import Sequence
+from itertools import islice
 
 from snakegame.model.util import Point, pairwise
 
@@ -36,8 +39,16 @@ class Snake:
             if diff != 1:
                 raise ValueError('Broken Snake')
 
+        # Grid points the snake occupies, from tail to head, and how many
+        # segments sit on each of them
+        self._segments = deque(Point(x, y) for x, y in start_points)
+        self._counts = Counter(self._segments)
+
         #: Grid points the snake currently occupies
-        self.points = [Point(x, y) for x, y in start_points]
+        self.points = SnakePoints(self)
+
+        #: Grid points between the head and tail
+        self.body = SnakeBody(self)
 
         #: Direction of travel
         self.facing = self.points[1] - self.points[0]
@@ -45,21 +56,20 @@ class Snake:
         #: Should the snake grow to occupy more space
         self.grow = False
 
-    @property
-    def head(self):
-        return self.points[-1]
+        #: Occupancy grid of the game this snake belongs to, if any
+        self.grid = None
 
     @property
-    def body(self):
-        return self.points[1:-1]
+    def head(self):
+        return self._segments[-1]
 
     @property
     def tail(self):
-        return self.points[0]
+        return self._segments[0]
 
     @property
     def blocked_direction(self):
-        return self.points[-2] - self.head
+        return self._segments[-2] - self.head
 
     def grow_next_turn(self):
         """Set the grow flag to true"""
@@ -68,9 +78,12 @@ class Snake:
     def move(self):
         """Move this snake forward a step in the direction it's facing"""
         next_point = self.head + self.facing
-        self.points.append(next_point)
+        self._segments.append(next_point)
+        self._counts[next_point] += 1
+        if self.grid is not None:
+            self.grid.add(next_point, self)
         if not self.grow:
-            self.points.remove(self.tail)
+            self.lose_tail()
         self.grow = False
 
     def set_direction(self, direction):
@@ -87,7 +100,81 @@ class Snake:
 
     def lose_tail(self):
         """Remove this snake's tail!"""
-        self.points.remove(self.tail)
+        tail = self._segments.popleft()
+        self._counts[tail] -= 1
+        if not self._counts[tail]:
+            del self._counts[tail]
+        if self.grid is not None:
+            self.grid.remove(tail, self)
+
+    def undo_move(self, tail, grow):
+        """Reverse a call to move, e.g. when rolling a game back
+
+        Parameters
+        ----------
+        tail: Point or None
+            The tail lost by the move, or None if the snake grew
+        grow: bool
+            The grow flag before the move
+        """
+        head = self._segments.pop()
+        self._counts[head] -= 1
+        if not self._counts[head]:
+            del self._counts[head]
+        if self.grid is not None:
+            self.grid.remove(head, self)
+        if tail is not None:
+            self.restore_tail(tail)
+        self.grow = grow
+
+    def restore_tail(self, tail):
+        """Put back a tail lost with lose_tail"""
+        self._segments.appendleft(tail)
+        self._counts[tail] += 1
+        if self.grid is not None:
+            self.grid.add(tail, self)
+
+    def snapshot(self):
+        """The snake's position and direction, as an immutable tuple of its
+        points from tail to head, its facing and its grow flag"""
+        return tuple(self._segments), self.facing, self.grow
+
+    def restore(self, state):
+        """Return to a position saved with snapshot
+
+        Parameters
+        ----------
+        state: tuple
+            As returned by snapshot
+        """
+        points, self.facing, self.grow = state
+        if self.grid is not None:
+            for point in self._segments:
+                self.grid.remove(point, self)
+        self._segments = deque(points)
+        self._counts = Counter(points)
+        if self.grid is not None:
+            for point in points:
+                self.grid.add(point, self)
+
+    def occupies(self, point):
+        """Check if any part of this snake lies on a point"""
+        return point in self._counts
+
+    def collided_with_self(self):
+        """Check if the head has run into the rest of the snake, i.e. the
+        head lies on the body or tail"""
+        if len(self._segments) == 1:
+            return True
+        return self._counts[self.head] > 1
+
+    def blocks(self, point):
+        """Check if a point lies on the head or body of this snake. The tail
+        is excluded as it can be bitten off by other snakes."""
+        count = self._counts.get(point, 0)
+        if len(self._segments) > 1 and point == self.tail:
+            count -= 1
+        return count > 0
 
     def intersect(self, points):
         """Check if this snake lies on any of the specified points
@@ -97,5 +184,68 @@ class Snake:
         points: list(Points)
             A list of points to compare against
         """
-        intersecting = set(points).intersection(set(self.points))
+        intersecting = {point for point in points if point in self._counts}
         return intersecting
+
+
+class SnakePoints(Sequence):
+    """A read-only, non-copying view of a snake's points from tail to head"""
+
+    def __init__(self, snake):
+        self._snake = snake
+
+    def __len__(self):
+        return len(self._snake._segments)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return list(self)[i]
+        return self._snake._segments[i]
+
+    def __iter__(self):
+        return iter(self._snake._segments)
+
+    def __reversed__(self):
+        return reversed(self._snake._segments)
+
+    def __contains__(self, point):
+        return point in self._snake._counts
+
+    def __eq__(self, other):
+        if not isinstance(other, Sequence) or isinstance(other, str):
+            return NotImplemented
+        return len(self) == len(other) and all(
+            a == b for a, b in zip(self, other)
+        )
+
+    def __repr__(self):
+        return repr(list(self))
+
+
+class SnakeBody(SnakePoints):
+    """A read-only, non-copying view of a snake's points, excluding the head
+    and tail"""
+
+    def __len__(self):
+        return max(len(self._snake._segments) - 2, 0)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return list(self)[i]
+        if not -len(self) <= i < len(self):
+            raise IndexError('Snake body index out of range')
+        return self._snake._segments[i + 1 if i >= 0 else i - 1]
+
+    def __iter__(self):
+        return islice(self._snake._segments, 1, len(self) + 1)
+
+    def __reversed__(self):
+        return islice(reversed(self._snake._segments), 1, len(self) + 1)
+
+    def __contains__(self, point):
+        snake = self._snake
+        if len(snake._segments) < 3:
+            return False
+        count = snake._counts.get(point, 0)
+        count -= (point == snake.head) + (point == snake.tail)
+        return count > 0
@@ -0,0 +1,92 @@
+import random
+import unittest
+
+from snakegame.model import Game, Snake
+from snakegame.model.util import DIRECTIONS, Point
+
+try:
+    import numpy as np
+    from snakegame.model.batch import BatchGame, NO_ACTION
+except ImportError:
+    np = None
+
+
+def make_game(seed=0):
+    """A small, crowded three player game so that snakes meet often"""
+    game = Game(dimensions=(10, 10), rng=random.Random(seed))
+    game.add_snake(Snake('a', [[2, 2], [2, 3], [2, 4]]))
+    game.add_snake(Snake('b', [[7, 7], [7, 6], [7, 5]]))
+    game.add_snake(Snake('c', [[4, 8], [5, 8], [6, 8]]))
+    for food in [Point(5, 5), Point(3, 6), Point(8, 2)]:
+        game.add_food(food)
+    return game
+
+
+@unittest.skipIf(np is None, 'numpy is not installed')
+class TestBatchGame(unittest.TestCase):
+
+    def test_load(self):
+        game = make_game()
+        batch = BatchGame.repeat(game, 3)
+        for s, snake in enumerate(game.snakes):
+            self.assertEqual(batch.snake_points(2, s), list(snake.points))
+        self.assertEqual(set(batch.food_points(1)), set(game.food))
+        self.assertEqual(batch.counts[0].sum(), 12)
+
+    def test_matches_scalar_engine(self):
+        """Play random moves in both engines and check they agree"""
+        n_games, n_ticks = 64, 80
+        rng = np.random.default_rng(0)
+        batch = BatchGame([make_game(i) for i in range(n_games)], rng=1)
+        # Take independent copies for the scalar engine to play with
+        games = [make_game(i) for i in range(n_games)]
+        snakes = [list(game.snakes) for game in games]
+        steals = 0
+
+        for _ in range(n_ticks):
+            actions = rng.integers(NO_ACTION, 4, size=(n_games, 3))
+            for i, game in enumerate(games):
+                if not game.snakes:
+                    continue
+                lengths = [len(snake.points) for snake in snakes[i]]
+                for s, snake in enumerate(snakes[i]):
+                    if snake in game.snakes and actions[i, s] != NO_ACTION:
+                        snake.set_direction(DIRECTIONS[actions[i, s]])
+                game.update()
+                steals += sum(
+                    len(snake.points) < length
+                    for snake, length in zip(snakes[i], lengths)
+                    if snake in game.snakes
+                )
+            done = batch.step(actions)
+
+            for i, game in enumerate(games):
+                self.assertEqual(done[i], not game.snakes)
+                self.assertEqual(batch.ticks[i], game.ticks)
+                for s, snake in enumerate(snakes[i]):
+                    alive = snake in game.snakes
+                    self.assertEqual(batch.alive[i, s], alive)
+                    self.assertEqual(batch.score[i, s], game.score[snake])
+                    if alive:
+                        self.assertEqual(
+                            batch.snake_points(i, s), list(snake.points)
+                        )
+                        self.assertEqual(batch.grow[i, s], snake.grow)
+                # Food respawns are random, so copy the batch's choices over
+                self.assertEqual(len(batch.food_points(i)), len(game.food))
+                game.food = batch.food_points(i)
+                np.testing.assert_array_equal(
+                    batch.counts[i], game.grid.counts
+                )
+
+        self.assertGreater(steals, 0)
+        self.assertGreater(batch.score.sum(), 0)
+
+    def test_reset(self):
+        batch = BatchGame.repeat(make_game(), 4, rng=0)
+        for _ in range(20):
+            batch.step()
+        self.assertTrue(batch.done.all())
+        batch.reset([1, 2])
+        self.assertEqual(list(batch.done), [True, False, False, True])
+        self.assertEqual(batch.ticks[1], 0)
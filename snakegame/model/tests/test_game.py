@@ -1,7 +1,14 @@
+import random
 import unittest
 from unittest import mock
 from snakegame.model import Game, Snake
-from snakegame.model.util import Point, DOWN, RIGHT, UP
+from snakegame.model.game import (
+    BOUNDARY, FOOD_EATEN, FOOD_SPAWNED, HEAD_ADVANCED, RESET, SCORE_CHANGED,
+    SNAKE_COLLISION, SNAKE_REMOVED, TAIL_RETRACTED, TAIL_STOLEN
+)
+from snakegame.model.grid import OccupancyGrid
+from snakegame.model.scenario import Scenario
+from snakegame.model.util import DIRECTIONS, Point, DOWN, RIGHT, UP
 
 
 class TestGame(unittest.TestCase):
@@ -85,3 +92,164 @@ class TestGame(unittest.TestCase):
         # Check p1 gained one
         self.assertEqual(len(self.game.snakes[0].points), 4)
         self.assertEqual(len(self.game.snakes[1].points), 2)
+
+    def test_death_reasons(self):
+        self.snake2 = Snake(
+            name='testsnake2',
+            start_points=[Point(6, 6), Point(6, 5), Point(6, 4)]
+        )
+        self.game.add_snake(self.snake2)
+        for i in range(6):
+            self.game.update()
+        self.assertEqual(self.game.deaths, {
+            self.snake: (2, SNAKE_COLLISION), self.snake2: (4, BOUNDARY)
+        })
+
+
+class TestCheckpoints(unittest.TestCase):
+
+    def setUp(self):
+        self.game = Scenario(
+            dimensions=(10, 10), snakes=4, snake_length=3, food=6
+        ).make_game(random.Random(3))
+
+    def play(self, ticks, seed):
+        rng = random.Random(seed)
+        for _ in range(ticks):
+            for snake in self.game.snakes:
+                snake.set_direction(rng.choice(DIRECTIONS))
+            self.game.update()
+
+    def assertGridMatches(self):
+        expected = OccupancyGrid(self.game.dimension_max)
+        for snake in self.game.snakes:
+            for point in snake.points:
+                expected.add(point, snake)
+        for food in self.game.food:
+            expected.add(food)
+        self.assertEqual(self.game.grid.counts, expected.counts)
+        self.assertEqual(self.game.grid.owners, expected.owners)
+        self.assertEqual(
+            sorted(self.game.grid.free_cells), sorted(expected.free_cells)
+        )
+
+    def test_rollback(self):
+        for seed in range(20):
+            before = self.game.snapshot()
+            checkpoint = self.game.checkpoint()
+            self.play(8, seed)
+            self.assertNotEqual(self.game.snapshot(), before)
+            self.game.rollback(checkpoint)
+            self.assertEqual(self.game.snapshot(), before)
+            self.assertGridMatches()
+
+    def test_nested(self):
+        outer = self.game.checkpoint()
+        self.play(2, 0)
+        middle = self.game.snapshot()
+        inner = self.game.checkpoint()
+        self.play(3, 1)
+        self.game.rollback(inner)
+        self.assertEqual(self.game.snapshot(), middle)
+        inner = self.game.checkpoint()
+        self.play(3, 2)
+        self.game.commit(inner)
+        after = self.game.snapshot()
+        self.assertNotEqual(after, middle)
+        self.game.rollback(outer)
+        self.assertGridMatches()
+        with self.assertRaisesRegex(ValueError, 'No checkpoint'):
+            self.game.rollback(outer)
+
+    def test_trial_is_deterministic(self):
+        # Food spawns the same way each time the same moves are tried
+        results = []
+        for _ in range(2):
+            with self.game.trial():
+                self.play(10, 5)
+                results.append(self.game.snapshot())
+        self.assertEqual(results[0], results[1])
+        self.assertEqual(self.game.ticks, 0)
+
+    def test_snapshot_restore(self):
+        start = self.game.snapshot()
+        self.play(10, 4)
+        later = self.game.snapshot()
+        self.game.restore(start)
+        self.assertEqual(self.game.snapshot(), start)
+        self.assertGridMatches()
+        self.play(10, 4)
+        self.assertEqual(self.game.snapshot(), later)
+
+
+class TestEvents(unittest.TestCase):
+
+    def setUp(self):
+        self.game = Game(rng=1)
+        self.snake = Snake(
+            name='testsnake',
+            start_points=[Point(i, 3) for i in range(2, 5)]
+        )
+        self.game.add_snake(self.snake)
+        self.game.food = [Point(4, 5)]
+        self.ticks = []
+        self.game.subscribe(self.changed)
+
+    def changed(self, game, events):
+        self.ticks.append(list(events))
+
+    def test_move_and_eat(self):
+        self.snake.set_direction(DOWN)
+        self.game.update()
+        self.game.update()
+        food = self.game.food[0]
+        self.assertEqual(self.ticks, [
+            [(HEAD_ADVANCED, self.snake, Point(4, 4)),
+             (TAIL_RETRACTED, self.snake, Point(2, 3))],
+            [(HEAD_ADVANCED, self.snake, Point(4, 5)),
+             (TAIL_RETRACTED, self.snake, Point(3, 3)),
+             (FOOD_EATEN, self.snake, Point(4, 5)),
+             (SCORE_CHANGED, self.snake, 1),
+             (FOOD_SPAWNED, None, food)],
+        ])
+        # Growing leaves the tail where it is
+        self.game.update()
+        self.assertEqual(
+            self.ticks[-1], [(HEAD_ADVANCED, self.snake, Point(4, 6))]
+        )
+
+    def test_tail_stolen_and_removed(self):
+        snake2 = Snake(
+            name='testsnake2',
+            start_points=[Point(6, 5), Point(6, 4), Point(6, 3)]
+        )
+        self.game.add_snake(snake2)
+        self.game.update()
+        self.game.update()
+        self.assertIn((TAIL_STOLEN, snake2, Point(6, 3)), self.ticks[-1])
+        self.game.update()
+        self.assertEqual(
+            self.ticks[-1][-1], (SNAKE_REMOVED, snake2, BOUNDARY)
+        )
+
+    def test_rolled_back_changes_are_not_seen(self):
+        with self.game.trial():
+            self.game.update()
+        self.assertEqual(self.ticks, [])
+        checkpoint = self.game.checkpoint()
+        self.game.update()
+        self.game.commit(checkpoint)
+        self.game.update()
+        self.assertEqual(
+            [event[2] for event in self.ticks[0] if event[0] == HEAD_ADVANCED],
+            [Point(5, 3), Point(6, 3)]
+        )
+
+    def test_reset_and_unsubscribe(self):
+        state = self.game.snapshot()
+        self.game.update()
+        self.game.restore(state)
+        self.assertEqual(self.ticks[-1], [(RESET, None, None)])
+        self.game.unsubscribe(self.changed)
+        self.game.update()
+        self.assertEqual(len(self.ticks), 2)
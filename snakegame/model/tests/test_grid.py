@@ -0,0 +1,169 @@
+import random
+import unittest
+
+from snakegame.model import Game, Snake
+from snakegame.model.grid import FreeCells, OccupancyGrid
+from snakegame.model.util import Point, DOWN
+
+
+class TestFreeCells(unittest.TestCase):
+
+    def setUp(self):
+        self.cells = FreeCells(10, range(5))
+
+    def test_discard(self):
+        self.cells.discard(1)
+        self.cells.discard(1)
+        self.assertEqual(len(self.cells), 4)
+        self.assertNotIn(1, self.cells)
+        self.assertEqual(sorted(self.cells), [0, 2, 3, 4])
+        # The slot map stays consistent after swapping items around
+        for slot, item in enumerate(self.cells.items):
+            self.assertEqual(self.cells.slots[item], slot)
+
+    def test_add(self):
+        self.cells.add(7)
+        self.cells.add(7)
+        self.assertEqual(len(self.cells), 6)
+        self.assertIn(7, self.cells)
+
+    def test_undo(self):
+        self.cells.log = []
+        self.cells.discard(1)
+        self.cells.add(8)
+        self.cells.discard(4)
+        self.cells.discard(8)
+        while self.cells.log:
+            self.cells.undo(self.cells.log.pop())
+        self.assertEqual(self.cells.items, list(range(5)))
+        for slot, item in enumerate(self.cells.items):
+            self.assertEqual(self.cells.slots[item], slot)
+        self.assertNotIn(8, self.cells)
+
+    def test_sample(self):
+        samples = {self.cells.sample(random.Random(i)) for i in range(50)}
+        self.assertEqual(samples, set(range(5)))
+        self.assertEqual(
+            self.cells.sample(random.Random(3)),
+            self.cells.sample(random.Random(3))
+        )
+        self.assertIsNone(FreeCells(3).sample(random.Random(0)))
+
+
+class TestOccupancyGrid(unittest.TestCase):
+
+    def setUp(self):
+        self.grid = OccupancyGrid((5, 4))
+
+    def test_add_remove(self):
+        self.assertEqual(self.grid.free, 12)
+        self.grid.add(Point(1, 1))
+        self.grid.add(Point(1, 1))
+        self.assertEqual(self.grid.count(Point(1, 1)), 2)
+        self.assertEqual(self.grid.free, 11)
+        self.grid.remove(Point(1, 1))
+        self.assertTrue(self.grid.is_occupied(Point(1, 1)))
+        self.grid.remove(Point(1, 1))
+        self.assertFalse(self.grid.is_occupied(Point(1, 1)))
+        self.assertEqual(self.grid.free, 12)
+
+    def test_boundary_squares(self):
+        # Squares on the boundary are tracked but never count as free
+        self.grid.add(Point(0, 2))
+        self.assertTrue(self.grid.is_occupied(Point(0, 2)))
+        self.assertEqual(self.grid.free, 12)
+        # Squares beyond the boundary are ignored
+        self.grid.add(Point(-1, 2))
+        self.assertFalse(self.grid.is_occupied(Point(-1, 2)))
+
+    def test_random_unoccupied(self):
+        rng = random.Random(0)
+        free = set(self.grid.unoccupied())
+        for point in list(free)[:-1]:
+            self.grid.add(point)
+        last = free.difference(self.grid.occupied()).pop()
+        self.assertEqual(self.grid.random_unoccupied(rng), last)
+        self.grid.add(last)
+        self.assertIsNone(self.grid.random_unoccupied(rng))
+
+
+class TestGameOccupancy(unittest.TestCase):
+
+    def setUp(self):
+        # Seeded, so food never respawns where the tests expect a snake
+        self.game = Game(rng=random.Random(0))
+        self.snake = Snake(
+            name='testsnake',
+            start_points=[Point(i, 3) for i in range(2, 5)]
+        )
+        self.game.add_snake(self.snake)
+        self.game.add_food(Point(4, 5))
+
+    def assertGridConsistent(self):
+        expected = set(self.game.food)
+        for snake in self.game.snakes:
+            expected.update(snake.points)
+        self.assertEqual(set(self.game.occupied_squares), expected)
+        free = set(self.game.unoccupied_squares)
+        self.assertEqual(len(free), len(self.game.unoccupied_squares))
+        self.assertFalse(free.intersection(expected))
+        owners = {
+            point for point in expected if self.game.grid.owners_at(point)
+        }
+        self.assertEqual(owners, expected.difference(self.game.food))
+
+    def test_views(self):
+        self.assertIn(Point(3, 3), self.game.occupied_squares)
+        self.assertNotIn(Point(3, 3), self.game.unoccupied_squares)
+        self.assertIn(Point(1, 1), self.game.unoccupied_squares)
+        self.assertNotIn(Point(0, 1), self.game.unoccupied_squares)
+        self.assertEqual(len(self.game.unoccupied_squares), 81 - 4)
+        self.assertIn(
+            random.choice(self.game.unoccupied_squares),
+            self.game.unoccupied_squares
+        )
+        self.assertGridConsistent()
+
+    def test_add_snake_overlap(self):
+        with self.assertRaisesRegex(ValueError, 'already occupying'):
+            self.game.add_snake(
+                Snake(name='other', start_points=[Point(4, 5), Point(4, 6)])
+            )
+
+    def test_updates_keep_grid_in_sync(self):
+        self.snake.set_direction(DOWN)
+        for _ in range(4):
+            self.game.update()
+            self.assertGridConsistent()
+        self.assertEqual(self.game.score[self.snake], 1)
+        self.assertEqual(len(self.game.food), 1)
+
+    def test_occupants(self):
+        grid = self.game.grid
+        self.assertEqual(grid.occupants(Point(4, 3)), [(self.snake, 'head')])
+        self.assertEqual(grid.occupants(Point(3, 3)), [(self.snake, 'body')])
+        self.assertEqual(grid.occupants(Point(2, 3)), [(self.snake, 'tail')])
+        self.assertEqual(grid.occupants(Point(4, 5)), [])
+        other = Snake(name='other', start_points=[Point(6, 6), Point(6, 7)])
+        self.game.add_snake(other)
+        self.assertEqual(grid.owners_at(Point(6, 7)), [other])
+        self.game.remove_snake(other)
+        self.assertEqual(grid.owners_at(Point(6, 7)), [])
+
+    def test_seeded_food_is_reproducible(self):
+        spawned = []
+        for _ in range(2):
+            game = Game(rng=random.Random(42))
+            snake = Snake(name='testsnake', start_points=[Point(4, 3),
+                                                          Point(4, 4)])
+            game.add_snake(snake)
+            game.add_food(Point(4, 5))
+            game.update()
+            spawned.append(game.food)
+        self.assertEqual(spawned[0], spawned[1])
+
+    def test_removed_snake_frees_squares(self):
+        for _ in range(6):
+            self.game.update()
+        self.assertEqual(self.game.snakes, [])
+        self.assertEqual(list(self.game.occupied_squares), [Point(4, 5)])
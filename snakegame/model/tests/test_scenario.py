@@ -0,0 +1,88 @@
+import json
+import os
+import random
+import tempfile
+import unittest
+
+from snakegame.model import Game
+from snakegame.model.layouts import CLASSIC_FOOD, classic_scenario
+from snakegame.model.scenario import Scenario, place_snakes
+
+
+class TestPlaceSnakes(unittest.TestCase):
+
+    def assertPlaced(self, game, snakes, length):
+        squares = [point for snake in snakes for point in snake.points]
+        self.assertEqual(len(set(squares)), len(squares))
+        self.assertTrue(all(game.in_bounds(point) for point in squares))
+        self.assertTrue(all(len(snake.points) == length for snake in snakes))
+
+    def test_random(self):
+        game = Game(dimensions=(200, 200), rng=random.Random(0))
+        snakes = place_snakes(game, 300, length=5)
+        self.assertEqual(len(game.snakes), 300)
+        self.assertPlaced(game, snakes, 5)
+        # Each snake has room to move before hitting anything
+        for snake in snakes:
+            ahead = snake.head + snake.facing
+            self.assertTrue(game.in_bounds(ahead))
+            self.assertFalse(game.grid.is_occupied(ahead))
+
+    def test_lanes(self):
+        game = Game(dimensions=(12, 12), rng=random.Random(0))
+        snakes = place_snakes(game, 10, length=3, spawn='lanes')
+        self.assertPlaced(game, snakes, 3)
+        self.assertEqual(snakes[0].name, 'snake1')
+
+    def test_no_room(self):
+        game = Game(dimensions=(6, 6), rng=random.Random(0))
+        with self.assertRaisesRegex(ValueError, 'Only found room'):
+            place_snakes(game, 10, length=4, spawn='lanes')
+        with self.assertRaisesRegex(ValueError, 'Only found room'):
+            place_snakes(game, 20, length=4)
+
+    def test_reproducible(self):
+        starts = []
+        for _ in range(2):
+            game = Game(dimensions=(50, 50), rng=random.Random(7))
+            place_snakes(game, 20)
+            starts.append([list(snake.points) for snake in game.snakes])
+        self.assertEqual(starts[0], starts[1])
+
+
+class TestScenario(unittest.TestCase):
+
+    def test_classic(self):
+        game = classic_scenario(2).make_game(random.Random(0))
+        self.assertEqual(game.dimension_max, (12, 12))
+        self.assertEqual([s.name for s in game.snakes], ['snake1', 'snake2'])
+        self.assertEqual(game.food, [CLASSIC_FOOD])
+
+    def test_many_food_items_stay_on_the_board(self):
+        scenario = Scenario(dimensions=(30, 30), snakes=5, food=8)
+        game = scenario.make_game(random.Random(0))
+        self.assertEqual(len(game.food), 8)
+        for _ in range(5):
+            game.update()
+            self.assertEqual(len(game.food), 8)
+
+    def test_save_load(self):
+        scenario = Scenario(
+            dimensions=(40, 20), snakes=3, snake_length=4, spawn='lanes',
+            food=[[5, 5], [6, 6]], max_ticks=100
+        )
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'scenario.json')
+            scenario.save(path)
+            loaded = Scenario.load(path)
+        self.assertEqual(loaded.to_dict(), scenario.to_dict())
+        self.assertEqual(loaded.n_snakes, 3)
+        game = loaded.make_game(random.Random(0))
+        self.assertEqual(game.dimension_max, (40, 20))
+        self.assertEqual(len(game.snakes[0].points), 4)
+
+    def test_unknown_settings(self):
+        with self.assertRaisesRegex(ValueError, 'Unknown scenario settings'):
+            Scenario.from_dict(json.loads('{"snake": 3}'))
+        with self.assertRaisesRegex(ValueError, 'Unknown spawn'):
+            Scenario(spawn='everywhere')
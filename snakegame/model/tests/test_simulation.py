@@ -0,0 +1,54 @@
+import random
+import unittest
+
+from snakegame.model import Game, Simulation, Snake
+from snakegame.model.util import Point, DOWN, LEFT, UP
+
+
+class TestSimulation(unittest.TestCase):
+
+    def setUp(self):
+        self.game = Game(rng=random.Random(1))
+        self.snake = Snake(
+            name='testsnake',
+            start_points=[Point(i, 3) for i in range(2, 5)]
+        )
+        self.game.add_snake(self.snake)
+        self.game.add_food(Point(4, 5))
+
+    def test_step(self):
+        sim = Simulation(self.game)
+        self.assertFalse(sim.step({'testsnake': DOWN}))
+        self.assertEqual(self.snake.head, Point(4, 4))
+        self.assertEqual(self.game.ticks, 1)
+
+    def test_run_until_finished(self):
+        # Carrying straight on hits the wall after 6 ticks
+        sim = Simulation(self.game)
+        self.assertEqual(sim.run(), 6)
+        self.assertTrue(sim.finished)
+
+    def test_run_ticks(self):
+        sim = Simulation(self.game)
+        self.assertEqual(sim.run(ticks=2), 2)
+        self.assertFalse(sim.finished)
+
+    def test_injected_inputs(self):
+        sim = Simulation(self.game)
+        sim.run(ticks=3, inputs=[{self.snake: DOWN}, {}, {'testsnake': LEFT}])
+        self.assertEqual(self.snake.head, Point(3, 5))
+        self.assertEqual(self.game.score[self.snake], 1)
+
+    def test_controllers(self):
+        # Turn in a tight circle forever
+        turns = {UP: LEFT, LEFT: DOWN, DOWN: Point(1, 0), Point(1, 0): UP}
+        sim = Simulation(
+            self.game,
+            controllers={'testsnake': lambda game, snake: turns[snake.facing]}
+        )
+        self.assertEqual(sim.run(ticks=100), 100)
+        self.assertIn(self.snake, self.game.snakes)
+
+    def test_unknown_snake(self):
+        with self.assertRaises(KeyError):
+            Simulation(self.game, controllers={'nobody': None})
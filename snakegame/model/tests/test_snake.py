@@ -72,3 +72,36 @@ class TestSnake(unittest.TestCase):
                 name='testsnake',
                 start_points=[Point(3, 3), Point(4, 4), Point(4, 3)]
             )
+
+    def test_views(self):
+        # points and body are live views rather than copies
+        points, body = self.snake.points, self.snake.body
+        self.assertEqual(body, [Point(3, 3)])
+        self.snake.grow_next_turn()
+        self.snake.move()
+        self.assertEqual(points, [Point(i, 3) for i in range(2, 6)])
+        self.assertEqual(body, [Point(3, 3), Point(4, 3)])
+        self.assertEqual(body[-1], Point(4, 3))
+        self.assertEqual(points[1:3], [Point(3, 3), Point(4, 3)])
+        self.assertIn(Point(4, 3), body)
+        self.assertNotIn(Point(5, 3), body)
+        self.assertNotIn(Point(2, 3), body)
+        self.assertIn(Point(2, 3), points)
+
+    def test_collisions(self):
+        self.assertFalse(self.snake.collided_with_self())
+        self.assertTrue(self.snake.blocks(Point(4, 3)))
+        self.assertTrue(self.snake.blocks(Point(3, 3)))
+        # The tail can be bitten, so doesn't block
+        self.assertFalse(self.snake.blocks(Point(2, 3)))
+        self.assertTrue(self.snake.occupies(Point(2, 3)))
+
+        # Loop the snake round onto itself
+        snake = Snake(
+            name='testsnake',
+            start_points=[Point(2, 3), Point(3, 3), Point(4, 3), Point(4, 4),
+                          Point(3, 4)]
+        )
+        snake.set_direction(UP)
+        snake.move()
+        self.assertTrue(snake.collided_with_self())
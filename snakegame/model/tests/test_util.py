@@ -21,3 +21,13 @@ class TestPoint(unittest.TestCase):
     def test_dict(self):
         test_dict = {Point(2, 3): 4}
         self.assertEqual(test_dict[Point(2, 3)], 4)
+
+    def test_hash(self):
+        self.assertEqual(hash(Point(2, 3)), hash(Point(2, 3)))
+        self.assertIn(self.point_A + self.point_B, {Point(7, 7)})
+        self.assertIsInstance(self.point_A - self.point_B, Point)
+
+    def test_attributes(self):
+        self.assertEqual((self.point_A.x, self.point_A.y), (4, 5))
+        with self.assertRaises(AttributeError):
+            self.point_A.x = 3
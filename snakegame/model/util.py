@@ -1,31 +1,44 @@
 """Useful generic functions or constants"""
-from dataclasses import dataclass
 from itertools import tee
+from typing import NamedTuple
 
+# Build tuples directly, skipping the argument handling in Point.__new__
+_tuple_new = tuple.__new__
 
-@dataclass
-class Point:
-    """Class representing a point on the game grid"""
+#: Results of Point arithmetic, reused so that a game on a bounded grid
+#: stops allocating new points once it has visited each square
+_interned_points = {}
+#: Cap on the number of interned points, so huge boards can't use up memory
+POINT_CACHE_SIZE = 1 << 16
+
+
+def _intern_point(xy):
+    """Return the interned Point for an (x, y) tuple, creating it if needed"""
+    try:
+        return _interned_points[xy]
+    except KeyError:
+        point = _tuple_new(Point, xy)
+        if len(_interned_points) < POINT_CACHE_SIZE:
+            _interned_points[xy] = point
+        return point
+
+
+class Point(NamedTuple):
+    """Class representing a point on the game grid.
+
+    Points are plain tuples underneath, so they are compact, immutable and
+    iterable, and hash and compare equal like the (x, y) tuple they hold.
+    """
     x: int
     y: int
 
     def __add__(self, other):
         """Add points like vectors to return a new Point"""
-        return Point(self.x + other.x, self.y + other.y)
+        return _intern_point((self[0] + other[0], self[1] + other[1]))
 
     def __sub__(self, other):
         """Subtract points like vectors to return a new Point"""
-        return Point(self.x - other.x, self.y - other.y)
-
-    def __iter__(self):
-        yield self.x
-        yield self.y
-
-    def __eq__(self, other):
-        return self.x == other.x and self.y == other.y
-
-    def __hash__(self):
-        return hash(tuple([self.x, self.y]))
+        return _intern_point((self[0] - other[0], self[1] - other[1]))
 
 
 # Points which correspond to directions on the 2D grid - note that curses
@@ -34,16 +47,26 @@ LEFT = Point(-1, 0)
 RIGHT = Point(1, 0)
 UP = Point(0, -1)
 DOWN = Point(0, 1)
+# All directions in clockwise order, which gives each of them an integer code
+DIRECTIONS = (UP, RIGHT, DOWN, LEFT)
 
 
 # Key mapping to exit the game
 EXIT = 'q'
 # Key mapping to pause/unpause game
 PAUSE = ' '
+# Keys which pan the view over a game bigger than the terminal, and which
+# goes back to following player 1
+PAN_KEYS = {'W': UP, 'A': LEFT, 'S': DOWN, 'D': RIGHT}
+FOLLOW = 'f'
 
-# Groups of input keys for 2 players
+# Groups of input keys for 2 players, with arrow keys named as in
+# io.keyreader.ESCAPE_SEQUENCES
 key_groups = {
-    'Player 1': {'w': UP, 'a': LEFT, 's': DOWN, 'd': RIGHT},
+    'Player 1': {
+        'w': UP, 'a': LEFT, 's': DOWN, 'd': RIGHT,
+        'KEY_UP': UP, 'KEY_LEFT': LEFT, 'KEY_DOWN': DOWN, 'KEY_RIGHT': RIGHT
+    },
     'Player 2': {'i': UP, 'j': LEFT, 'k': DOWN, 'l': RIGHT}
 }
 
@@ -0,0 +1,141 @@
+"""Timing instrumentation for the interactive game loop.
+
+A FrameTimer is only created when profiling is asked for; the game loop and
+key reader check for one once per tick or key press, so leaving it out costs
+next to nothing.
+"""
+import time
+from bisect import bisect_left
+from collections import deque
+
+#: Parts of each tick which are timed separately
+SECTIONS = ('update', 'render', 'input')
+#: Upper edges of the histogram buckets, in milliseconds
+BUCKET_EDGES = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+
+class Histogram:
+    """Counts of durations falling into logarithmically spaced buckets"""
+
+    def __init__(self):
+        #: One count per bucket, the last catching everything over 1s
+        self.counts = [0] * (len(BUCKET_EDGES) + 1)
+        self.total = 0.0
+        self.max = 0.0
+
+    def __len__(self):
+        return sum(self.counts)
+
+    def add(self, ms):
+        """Count a duration given in milliseconds"""
+        self.counts[bisect_left(BUCKET_EDGES, ms)] += 1
+        self.total += ms
+        if ms > self.max:
+            self.max = ms
+
+    @property
+    def mean(self):
+        n = len(self)
+        return self.total / n if n else 0.0
+
+    def lines(self, width=40):
+        """Render the histogram as text, one line per non-empty bucket"""
+        n = len(self)
+        if not n:
+            return ['  (no samples)']
+        lines = []
+        biggest = max(self.counts)
+        lower = 0
+        for edge, count in zip(BUCKET_EDGES + (float('inf'),), self.counts):
+            if count:
+                bar = '#' * max(1, round(width * count / biggest))
+                lines.append(
+                    f'  {lower:>6g}-{edge:<6g}ms {count:>7} {bar}'
+                )
+            lower = edge
+        return lines
+
+
+class FrameTimer:
+    """Records how long each tick spent updating the model, drawing and
+    handling input, and how far the gap between ticks drifted from the
+    target tick rate."""
+
+    def __init__(self, tick_rate, window=120, clock=time.perf_counter):
+        """
+        Parameters
+        ----------
+        tick_rate: float
+            The intended number of ticks per second
+        window: int
+            Number of recent ticks summarised by the overlay
+        clock: callable
+            Returns the current time in seconds
+        """
+        self.tick_rate = tick_rate
+        self.clock = clock
+        names = SECTIONS + ('drift', 'latency')
+        #: Histograms of per-tick time spent in each section, the absolute
+        #: drift of each tick interval from the target, and the time from
+        #: reading a key to a snake turning
+        self.histograms = {name: Histogram() for name in names}
+        #: The most recent samples of each of those, in ms
+        self.recent = {name: deque(maxlen=window) for name in names}
+        self.ticks = 0
+        self._pending = dict.fromkeys(SECTIONS, 0.0)
+        self._last_tick = None
+
+    def add(self, section, seconds):
+        """Add time spent in one section to the current tick"""
+        self._pending[section] += seconds
+
+    def tick(self, now=None):
+        """Close the current tick, recording its timings
+
+        Parameters
+        ----------
+        now: float, optional
+            The time the tick ended, by default read from the clock
+        """
+        if now is None:
+            now = self.clock()
+        for section, seconds in self._pending.items():
+            self._record(section, 1000 * seconds)
+            self._pending[section] = 0.0
+        if self._last_tick is not None:
+            target = 1.0 / self.tick_rate
+            self._record('drift', 1000 * abs(now - self._last_tick - target))
+        self._last_tick = now
+        self.ticks += 1
+
+    def latency(self, snake, seconds):
+        """Record the time between a key being read and a snake turning,
+        suitable as the KeyReader on_latency hook"""
+        self._record('latency', 1000 * seconds)
+
+    def _record(self, name, ms):
+        self.histograms[name].add(ms)
+        self.recent[name].append(ms)
+
+    def overlay(self):
+        """Short lines summarising recent ticks, for display in game"""
+        lines = []
+        for name, samples in self.recent.items():
+            if samples:
+                mean = sum(samples) / len(samples)
+                peak = max(samples)
+            else:
+                mean = peak = 0.0
+            lines.append(f'{name:>7}: {mean:7.2f}ms avg {peak:7.2f}ms max')
+        return lines
+
+    def report(self):
+        """A text report with a histogram for each section"""
+        lines = [f'{self.ticks} ticks at {self.tick_rate:g} ticks/s']
+        for name, histogram in self.histograms.items():
+            lines.append(
+                f'{name}: mean {histogram.mean:.3f}ms, '
+                f'max {histogram.max:.3f}ms'
+            )
+            lines.extend(histogram.lines())
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,608 @@
+"""Recording games to a compact binary file and playing them back.
+
+A replay starts with a header holding the game dimensions, tick rate, RNG
+seed, starting tick and the names of the snakes, followed by a keyframe with
+the initial state. After that come records, each tagged with the number of
+ticks since the previous record, so ticks where nothing happens take no
+space:
+
+- TICK: direction changes (only for snakes whose facing changed) and food
+  spawned during an update
+- KEY: a key pressed between updates
+- QUIT: the game was quit between updates
+- KEYFRAME: the full game state, written every `keyframe_interval` ticks
+- END: the final tick
+
+Finally an index lists the offset of every keyframe, so playback can seek
+by restoring the nearest earlier keyframe and re-simulating from there.
+Integers are unsigned LEB128 varints unless stated otherwise.
+"""
+import bisect
+import struct
+from collections import deque
+
+from snakegame.model import Game, Simulation, Snake
+from snakegame.model.game import (
+    BOUNDARY, FOOD_SPAWNED, HEAD_ADVANCED, QUIT as GAME_QUIT, RESET,
+    SELF_COLLISION, SNAKE_COLLISION, TOO_SHORT
+)
+from snakegame.model.util import DIRECTIONS, Point
+
+MAGIC = b'SNKR'
+INDEX_MAGIC = b'SNKI'
+VERSION = 1
+
+# Record types
+END, TICK, KEY, QUIT, KEYFRAME = range(5)
+
+#: Reasons for removal, stored by their position in this list
+REASONS = [BOUNDARY, SELF_COLLISION, SNAKE_COLLISION, TOO_SHORT]
+UNKNOWN_REASON = 255
+
+_header = struct.Struct('<4sBd')
+_index_entry = struct.Struct('<QQ')
+_trailer = struct.Struct('<QQ4s')
+
+
+def write_varint(out, value):
+    """Append an unsigned integer to a bytearray as a LEB128 varint"""
+    while value >= 0x80:
+        out.append((value & 0x7f) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def read_varint(data, pos):
+    """Read a varint from bytes, returning the value and the next position"""
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+def write_string(out, text):
+    encoded = text.encode('utf8')
+    write_varint(out, len(encoded))
+    out.extend(encoded)
+
+
+def read_string(data, pos):
+    length, pos = read_varint(data, pos)
+    return bytes(data[pos:pos + length]).decode('utf8'), pos + length
+
+
+def encode_snake(out, snake):
+    """Write a snake's points as its tail followed by the direction of each
+    step towards the head, packed four to a byte"""
+    points = list(snake.points)
+    write_varint(out, points[0].x)
+    write_varint(out, points[0].y)
+    write_varint(out, len(points))
+    packed = bytearray((len(points) + 2) // 4)
+    for i, (a, b) in enumerate(zip(points, points[1:])):
+        packed[i // 4] |= DIRECTIONS.index(b - a) << (2 * (i % 4))
+    out.extend(packed)
+
+
+def decode_snake(data, pos):
+    """Read points written by encode_snake"""
+    x, pos = read_varint(data, pos)
+    y, pos = read_varint(data, pos)
+    length, pos = read_varint(data, pos)
+    n_bytes = (length + 2) // 4
+    packed = data[pos:pos + n_bytes]
+    points = [Point(x, y)]
+    for i in range(length - 1):
+        code = (packed[i // 4] >> (2 * (i % 4))) & 3
+        points.append(points[-1] + DIRECTIONS[code])
+    return points, pos + n_bytes
+
+
+class Recorder:
+    """Writes a replay of a game as it's played.
+
+    The recorder subscribes to the game, which passes it the changes made
+    by every update, and its quitting. Snakes must all be added to the game
+    before recording starts.
+    """
+
+    def __init__(self, file, game, tick_rate=1, seed=None,
+                 keyframe_interval=1000):
+        """
+        Parameters
+        ----------
+        file: str or binary file
+            Where to write the replay
+        game: Game
+            The game to record
+        tick_rate: float
+            The rate the game is played at, used for real time playback
+        seed: int, optional
+            The seed of the game's RNG, stored for reference
+        keyframe_interval: int
+            Number of ticks between keyframes
+        """
+        if isinstance(file, str):
+            self.file = open(file, 'wb')
+            self._owns_file = True
+        else:
+            self.file = file
+            self._owns_file = False
+        self.game = game
+        self.keyframe_interval = keyframe_interval
+        self.snakes = list(game.snakes)
+        self._indices = {snake: i for i, snake in enumerate(self.snakes)}
+        self._facing = [snake.facing for snake in self.snakes]
+        self._directions = []
+        self._food = []
+        self._last_tick = game.ticks
+        #: Ticks and offsets of every keyframe written
+        self.keyframes = []
+        self.offset = 0
+
+        out = bytearray(_header.pack(MAGIC, VERSION, tick_rate))
+        write_varint(out, game.dimension_max[0])
+        write_varint(out, game.dimension_max[1])
+        write_varint(out, 0 if seed is None else seed + 1)
+        write_varint(out, game.ticks)
+        write_varint(out, len(self.snakes))
+        for snake in self.snakes:
+            write_string(out, snake.name)
+        self._write(out)
+        self._write_keyframe()
+        game.subscribe(self.game_changed)
+
+    def _write(self, data):
+        self.file.write(data)
+        self.offset += len(data)
+
+    def _record(self, kind, tick):
+        """Start a record of some kind, tagged with the ticks since the
+        previous record"""
+        out = bytearray((kind,))
+        write_varint(out, tick - self._last_tick)
+        self._last_tick = tick
+        return out
+
+    def _write_keyframe(self):
+        game = self.game
+        self.keyframes.append((game.ticks, self.offset))
+        out = self._record(KEYFRAME, game.ticks)
+        write_varint(out, len(game.snakes))
+        for snake in game.snakes:
+            write_varint(out, self._indices[snake])
+        alive = set(game.snakes)
+        for snake in self.snakes:
+            write_varint(out, game.score.get(snake, 0))
+            if snake in game.deaths:
+                tick, reason = game.deaths[snake]
+                out.append(0)
+                write_varint(out, tick)
+                out.append(
+                    REASONS.index(reason) if reason in REASONS
+                    else UNKNOWN_REASON
+                )
+            elif snake in alive:
+                out.append(1)
+                out.append(DIRECTIONS.index(snake.facing))
+                out.append(snake.grow)
+                encode_snake(out, snake)
+            else:
+                # Quit before dying
+                out.append(2)
+        write_varint(out, len(game.food))
+        for food in game.food:
+            write_varint(out, food.x)
+            write_varint(out, food.y)
+        self._write(out)
+
+    def game_changed(self, game, events):
+        """Write out the direction changes and food spawned in a tick, as
+        the game's subscriber, or that the game was quit"""
+        for kind, snake, value in events:
+            if kind == HEAD_ADVANCED:
+                # Each snake faces the way it just moved
+                i = self._indices[snake]
+                if snake.facing != self._facing[i]:
+                    self._facing[i] = snake.facing
+                    self._directions.append(
+                        (i, DIRECTIONS.index(snake.facing))
+                    )
+            elif kind == FOOD_SPAWNED:
+                self._food.append(value)
+            elif kind == GAME_QUIT:
+                self._write(self._record(QUIT, game.ticks))
+                return
+            elif kind == RESET:
+                # Not a tick, and there's no following the game after it
+                return
+        if self._directions or self._food:
+            out = self._record(TICK, game.ticks)
+            write_varint(out, len(self._directions))
+            for i, direction in self._directions:
+                write_varint(out, i)
+                out.append(direction)
+            write_varint(out, len(self._food))
+            for food in self._food:
+                write_varint(out, food.x)
+                write_varint(out, food.y)
+            self._write(out)
+            self._directions.clear()
+            self._food.clear()
+        if game.ticks % self.keyframe_interval == 0:
+            self._write_keyframe()
+
+    def record_key(self, key):
+        """Note a key pressed between ticks"""
+        out = self._record(KEY, self.game.ticks)
+        write_string(out, key)
+        self._write(out)
+
+    def close(self):
+        """Finish the replay with the final tick and the keyframe index"""
+        self._write(self._record(END, self.game.ticks))
+        index_offset = self.offset
+        out = bytearray(struct.pack('<Q', len(self.keyframes)))
+        for tick, offset in self.keyframes:
+            out.extend(_index_entry.pack(tick, offset))
+        out.extend(_trailer.pack(index_offset, self.game.ticks, INDEX_MAGIC))
+        self._write(out)
+        self.game.unsubscribe(self.game_changed)
+        if self._owns_file:
+            self.file.close()
+        else:
+            self.file.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class _ReplayGame(Game):
+    """A game which places food where the replay says, rather than at
+    random"""
+
+    def __init__(self, dimensions):
+        super().__init__(dimensions)
+        self.pending_food = deque()
+
+    def spawn_food(self):
+        if not self.pending_food:
+            return super().spawn_food()
+        position = self.pending_food.popleft()
+        self.add_food(position)
+        return position
+
+
+class Replay:
+    """A recorded game, which can be played back tick by tick or from any
+    point using the keyframes"""
+
+    def __init__(self, source):
+        """
+        Parameters
+        ----------
+        source: str, bytes or binary file
+            A path to a replay file, the contents of one, or an open file
+        """
+        if isinstance(source, str):
+            with open(source, 'rb') as f:
+                data = f.read()
+        elif isinstance(source, (bytes, bytearray)):
+            data = bytes(source)
+        else:
+            data = source.read()
+        self.data = data
+
+        magic, version, self.tick_rate = _header.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError("Not a snake replay")
+        if version != VERSION:
+            raise ValueError(f"Unsupported replay version {version}")
+        pos = _header.size
+        width, pos = read_varint(data, pos)
+        height, pos = read_varint(data, pos)
+        self.dimensions = (width, height)
+        seed, pos = read_varint(data, pos)
+        self.seed = seed - 1 if seed else None
+        #: The tick recording started from
+        self.start_tick, pos = read_varint(data, pos)
+        n_snakes, pos = read_varint(data, pos)
+        self.names = []
+        for _ in range(n_snakes):
+            name, pos = read_string(data, pos)
+            self.names.append(name)
+        self.start = pos
+
+        index_offset, final_tick, index_magic = _trailer.unpack_from(
+            data, len(data) - _trailer.size
+        )
+        if index_magic == INDEX_MAGIC:
+            (n_keyframes,) = struct.unpack_from('<Q', data, index_offset)
+            #: Ticks and offsets of every keyframe
+            self.keyframes = [
+                _index_entry.unpack_from(
+                    data, index_offset + 8 + i * _index_entry.size
+                ) for i in range(n_keyframes)
+            ]
+            self.final_tick = final_tick
+        else:
+            # The recording was cut off, so rebuild the index by scanning
+            self.keyframes, self.final_tick = self._scan()
+
+    def records(self, pos, tick):
+        """Iterate over records from an offset
+
+        Parameters
+        ----------
+        pos: int
+            The offset of a record
+        tick: int
+            The tick of the record before it
+
+        Yields
+        ------
+        tuple(int, int, int, int, int)
+            The record type, its tick, and the offsets of the record, its
+            payload and the next record
+        """
+        data = self.data
+        while pos < len(data):
+            kind = data[pos]
+            gap, payload = read_varint(data, pos + 1)
+            tick += gap
+            end = self._skip(kind, payload)
+            yield kind, tick, pos, payload, end
+            if kind == END:
+                return
+            pos = end
+
+    def _skip(self, kind, pos):
+        """Find the end of a record's payload"""
+        data = self.data
+        if kind == TICK:
+            n, pos = read_varint(data, pos)
+            for _ in range(n):
+                _, pos = read_varint(data, pos)
+                pos += 1
+            n, pos = read_varint(data, pos)
+            for _ in range(2 * n):
+                _, pos = read_varint(data, pos)
+        elif kind == KEY:
+            _, pos = read_string(data, pos)
+        elif kind == KEYFRAME:
+            _, pos = self.decode_keyframe(pos)
+        return pos
+
+    def _scan(self):
+        """Find the keyframes and last tick of a replay with no index"""
+        keyframes, tick = [], self.start_tick
+        try:
+            for kind, tick, start, _, _ in self.records(
+                self.start, self.start_tick
+            ):
+                if kind == KEYFRAME:
+                    keyframes.append((tick, start))
+        except IndexError:
+            # Stop at the last complete record
+            pass
+        return keyframes, tick
+
+    def decode_keyframe(self, pos):
+        """Read the state stored in a keyframe
+
+        Returns
+        -------
+        dict, int
+            The state and the offset after it
+        """
+        data = self.data
+        n_alive, pos = read_varint(data, pos)
+        order = []
+        for _ in range(n_alive):
+            i, pos = read_varint(data, pos)
+            order.append(i)
+        snakes = []
+        for _ in self.names:
+            score, pos = read_varint(data, pos)
+            status = data[pos]
+            pos += 1
+            snake = {'score': score}
+            if status == 0:
+                tick, pos = read_varint(data, pos)
+                reason = data[pos]
+                pos += 1
+                snake['death'] = (
+                    tick, REASONS[reason] if reason < len(REASONS) else None
+                )
+            elif status == 1:
+                snake['facing'] = DIRECTIONS[data[pos]]
+                snake['grow'] = bool(data[pos + 1])
+                snake['points'], pos = decode_snake(data, pos + 2)
+            snakes.append(snake)
+        n_food, pos = read_varint(data, pos)
+        food = []
+        for _ in range(n_food):
+            x, pos = read_varint(data, pos)
+            y, pos = read_varint(data, pos)
+            food.append(Point(x, y))
+        return {'order': order, 'snakes': snakes, 'food': food}, pos
+
+    def player(self):
+        """A ReplayPlayer positioned at the start of the replay"""
+        return ReplayPlayer(self)
+
+
+class ReplayPlayer:
+    """Re-simulates a replay through the headless Simulation"""
+
+    def __init__(self, replay):
+        self.replay = replay
+        self.seek(replay.keyframes[0][0])
+
+    @property
+    def finished(self):
+        return (
+            self.game.ticks >= self.replay.final_tick
+            or not self.game.snakes
+        )
+
+    def _restore(self, tick, offset):
+        """Rebuild the game from the keyframe at an offset"""
+        replay = self.replay
+        gap, payload = read_varint(replay.data, offset + 1)
+        state, end = replay.decode_keyframe(payload)
+
+        game = _ReplayGame(replay.dimensions)
+        self.snakes = []
+        for name, snake_state in zip(replay.names, state['snakes']):
+            points = snake_state.get('points', [Point(0, 0), Point(0, 1)])
+            snake = Snake(name=name, start_points=points)
+            if 'facing' in snake_state:
+                snake.facing = snake_state['facing']
+                snake.grow = snake_state['grow']
+            self.snakes.append(snake)
+        for i in state['order']:
+            game.add_snake(self.snakes[i])
+        for snake, snake_state in zip(self.snakes, state['snakes']):
+            game.score[snake] = snake_state['score']
+            if 'death' in snake_state:
+                game.deaths[snake] = snake_state['death']
+        for food in state['food']:
+            game.add_food(food)
+        game.ticks = tick
+
+        self.game = game
+        self.simulation = Simulation(game)
+        self._records = replay.records(end, tick)
+        self._next = next(self._records, None)
+        #: Keys pressed during the replay, with the tick they followed
+        self.keys = []
+
+    def seek(self, tick):
+        """Move to a tick, restoring the nearest keyframe before it
+
+        Parameters
+        ----------
+        tick: int
+            The tick to move to, clipped to the length of the replay
+        """
+        tick = min(tick, self.replay.final_tick)
+        keyframes = self.replay.keyframes
+        i = bisect.bisect_right(keyframes, (tick, float('inf'))) - 1
+        self._restore(*keyframes[max(i, 0)])
+        while self.game.ticks < tick and not self.finished:
+            self.step()
+
+    def _read_records(self, target):
+        """Apply the records leading up to a tick: everything between earlier
+        ticks, then the TICK record for the target itself
+
+        Returns
+        -------
+        dict(Snake, Point)
+            Directions the snakes move in during the target tick
+        """
+        inputs = {}
+        data = self.replay.data
+        while self._next is not None:
+            kind, tick, _, pos, _ = self._next
+            if tick > target or (tick == target and kind != TICK):
+                break
+            if kind == TICK:
+                n, pos = read_varint(data, pos)
+                for _ in range(n):
+                    i, pos = read_varint(data, pos)
+                    inputs[self.snakes[i]] = DIRECTIONS[data[pos]]
+                    pos += 1
+                n, pos = read_varint(data, pos)
+                for _ in range(n):
+                    x, pos = read_varint(data, pos)
+                    y, pos = read_varint(data, pos)
+                    self.game.pending_food.append(Point(x, y))
+            elif kind == KEY:
+                self.keys.append((tick, read_string(data, pos)[0]))
+            elif kind == QUIT:
+                self.game.quit()
+            self._next = next(self._records, None)
+        return inputs
+
+    def step(self):
+        """Advance by one tick
+
+        Returns
+        -------
+        bool
+            True if the replay has finished
+        """
+        if self.finished:
+            return True
+        inputs = self._read_records(self.game.ticks + 1)
+        if not self.game.snakes:
+            return True
+        # Recorded facings were accepted when they were played, so set them
+        # directly rather than going through set_direction
+        for snake, direction in inputs.items():
+            snake.facing = direction
+        self.simulation.step()
+        if self.finished:
+            # Pick up any keys pressed or a quit after the last tick
+            self._read_records(self.game.ticks + 1)
+        return self.finished
+
+    def run(self, ticks=None):
+        """Play the replay forward at full speed
+
+        Parameters
+        ----------
+        ticks: int, optional
+            The maximum number of ticks to play, by default to the end
+
+        Returns
+        -------
+        int
+            The number of ticks played
+        """
+        count = 0
+        while not self.finished and (ticks is None or count < ticks):
+            self.step()
+            count += 1
+        return count
+
+
+def watch(stdscr, source, tick_rate=None, start=0):
+    """Play a replay back in real time in the terminal
+
+    Parameters
+    ----------
+    stdscr: curses.Window
+        The window returned by curses.initscr()
+    source: str
+        Path to the replay file
+    tick_rate: float, optional
+        Playback speed, by default the rate the game was recorded at
+    start: int
+        The tick to start playback from
+    """
+    import asyncio
+    import curses
+
+    from snakegame.view.game_view import GameView
+
+    replay = Replay(source)
+    player = replay.player()
+    player.seek(start)
+    curses.noecho()
+    curses.init_pair(1, curses.COLOR_BLUE, curses.COLOR_BLACK)
+    curses.init_pair(2, curses.COLOR_YELLOW, curses.COLOR_BLACK)
+    view = GameView(
+        player.game, tick_rate=tick_rate or replay.tick_rate,
+        follow=player.snakes[0] if player.snakes else None
+    )
+    asyncio.run(view.update_and_draw(stdscr, step=player.step))
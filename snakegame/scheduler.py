@@ -0,0 +1,123 @@
+"""A fixed timestep game loop, decoupled from rendering.
+
+Ticks are scheduled against a monotonic clock at multiples of the timestep
+from when the loop started, rather than by sleeping for a timestep after
+each one, so the time spent updating and drawing doesn't make the game run
+slow. When the loop falls behind it runs the missed ticks back to back, up
+to a limit, after which it gives up on them and carries on from the present.
+"""
+import asyncio
+import time
+
+
+class FixedStepScheduler:
+    """Calls an update function at a fixed rate and a render function at
+    its own rate"""
+
+    def __init__(self, tick_rate, render_rate=None, max_catch_up=5,
+                 clock=time.monotonic, sleep=asyncio.sleep, spin=0.002):
+        """
+        Parameters
+        ----------
+        tick_rate: float
+            Number of updates per second, any positive number
+        render_rate: float, optional
+            Number of frames drawn per second. By default a frame is drawn
+            whenever ticks have run, and with 0 nothing is drawn.
+        max_catch_up: int
+            Most ticks run back to back when the loop has fallen behind
+        clock: callable
+            Returns the current time in seconds, monotonically increasing
+        sleep: coroutine function
+            Waits for a number of seconds
+        spin: float
+            How long before each deadline to stop sleeping and instead keep
+            yielding to the event loop until it arrives
+        """
+        if tick_rate <= 0:
+            raise ValueError(f"Tick rate must be positive, not {tick_rate}")
+        self.tick_rate = tick_rate
+        self.render_rate = render_rate
+        self.max_catch_up = max_catch_up
+        self.clock = clock
+        self.sleep = sleep
+        self.spin = spin
+        #: Number of ticks run, and given up on after falling too far behind
+        self.ticks = 0
+        self.dropped = 0
+
+    async def run(self, update, render=None, paused=None):
+        """Run the loop until update says the game is over
+
+        Parameters
+        ----------
+        update: callable
+            Advances the game by one tick, returning True when it's over
+        render: callable, optional
+            Draws the current state
+        paused: callable, optional
+            Returns True while the game is paused, in which case no ticks
+            run, and the schedule restarts when it is unpaused
+        """
+        step = 1.0 / self.tick_rate
+        if not self.render_rate:
+            frame_step = None
+        else:
+            frame_step = 1.0 / self.render_rate
+        # Ticks are due at origin + index * step, which doesn't accumulate
+        # rounding errors the way repeatedly adding the step would
+        origin = next_frame = self.clock()
+        index = 0
+        while True:
+            if paused is not None and paused():
+                await self.sleep(step)
+                origin = next_frame = self.clock()
+                index = 0
+                continue
+
+            ran = 0
+            now = self.clock()
+            while now >= origin + index * step:
+                if ran == self.max_catch_up:
+                    # Too far behind: skip the ticks we've missed
+                    missed = int((now - origin) // step) + 1 - index
+                    self.dropped += missed
+                    index += missed
+                    break
+                finished = update()
+                self.ticks += 1
+                ran += 1
+                index += 1
+                if finished:
+                    if render is not None and self.render_rate != 0:
+                        render()
+                    return self.ticks
+                now = self.clock()
+
+            if render is not None and self.render_rate != 0:
+                if frame_step is None:
+                    if ran:
+                        render()
+                elif now >= next_frame:
+                    render()
+                    next_frame += frame_step
+                    if next_frame <= now:
+                        # Don't try to make up for frames we didn't draw
+                        next_frame = now + frame_step
+
+            wake = origin + index * step
+            if render is not None and frame_step is not None:
+                wake = min(wake, next_frame)
+            await self._wait_until(wake)
+
+    async def _wait_until(self, deadline):
+        """Sleep until a deadline. Event loops tend to wake up a little late,
+        so the last moments before it are spent yielding to other tasks
+        rather than sleeping. This always yields at least once, so other
+        tasks such as reading keys get to run even when we're behind."""
+        remaining = deadline - self.clock()
+        if remaining > self.spin:
+            await self.sleep(remaining - self.spin)
+        await self.sleep(0)
+        while self.clock() < deadline:
+            await self.sleep(0)
@@ -0,0 +1,642 @@
+"""Serving a game over TCP to remote players and spectators.
+
+The server runs the game on its own fixed step clock. Clients connect and
+send one byte saying what they are: SPECTATOR, or PLAYER followed by the
+index of the snake to steer as a little-endian 4 byte integer. Players then
+send raw key presses, which steer their snake with any of the keys in
+key_groups. Everyone receives the game as a stream of frames, each a
+little-endian 4 byte length followed by a payload starting with its type:
+
+- KEYFRAME: tick, dimensions, then for each snake its name, whether it's
+  alive, its score, and if alive its facing, grow flag and points as in
+  replay.encode_snake, then the food
+- DELTA: the changes made by one tick, as published by the game to its
+  subscribers. The tick and the number of events, then each event's type
+  byte followed by the index of its snake and: for HEAD_ADVANCED, a byte
+  with the direction code; for SCORE_CHANGED, the score; and for
+  SNAKE_REMOVED, a byte with the reason. FOOD_SPAWNED has the food's
+  position instead of a snake. A reset game is sent as a KEYFRAME.
+- END: the game is over
+
+Integers are varints as in the replay format. Each client has a queue of
+at most max_pending frames. A client too slow to keep up has its queue
+emptied instead of holding up the game, and is sent a keyframe once it
+has caught up, so no client can stall the tick loop.
+"""
+import argparse
+import asyncio
+import struct
+
+from snakegame.io.keyreader import KeyReader
+from snakegame.model import Game, Simulation, Snake
+from snakegame.model.game import (
+    FOOD_EATEN, FOOD_SPAWNED, HEAD_ADVANCED, QUIT, RESET, SCORE_CHANGED,
+    SNAKE_REMOVED, TAIL_RETRACTED, TAIL_STOLEN
+)
+from snakegame.model.util import DIRECTIONS, Point, key_groups
+from snakegame.replay import (
+    REASONS, UNKNOWN_REASON, decode_snake, encode_snake, read_string,
+    read_varint, write_string, write_varint
+)
+from snakegame.scheduler import FixedStepScheduler
+
+# Frame types
+KEYFRAME, DELTA, END = range(3)
+# What a client says it is when it connects
+SPECTATOR, PLAYER = b'S', b'P'
+#: Keys remote players can steer with, whichever snake they play
+REMOTE_KEYS = {
+    key: direction
+    for group in key_groups.values() for key, direction in group.items()
+}
+
+_length = struct.Struct('<I')
+_index = struct.Struct('<I')
+
+
+def frame(payload):
+    """Prefix a payload with its length, ready to send"""
+    return _length.pack(len(payload)) + payload
+
+
+async def read_frame(reader):
+    """Read the payload of the next frame from a stream
+
+    Returns
+    -------
+    bytes or None
+        None if the stream has ended
+    """
+    try:
+        header = await reader.readexactly(_length.size)
+        return await reader.readexactly(_length.unpack(header)[0])
+    except asyncio.IncompleteReadError:
+        return None
+
+
+def _write_point(out, point):
+    write_varint(out, point[0])
+    write_varint(out, point[1])
+
+
+def _read_point(data, pos):
+    x, pos = read_varint(data, pos)
+    y, pos = read_varint(data, pos)
+    return Point(x, y), pos
+
+
+def encode_keyframe(game, snakes):
+    """The full state of a game
+
+    Parameters
+    ----------
+    game: Game
+        The game being served
+    snakes: list(Snake)
+        Every snake the game started with, whose positions identify them
+    """
+    out = bytearray((KEYFRAME,))
+    write_varint(out, game.ticks)
+    _write_point(out, game.dimension_max)
+    write_varint(out, len(snakes))
+    alive = set(game.snakes)
+    for snake in snakes:
+        write_string(out, snake.name)
+        out.append(snake in alive)
+        write_varint(out, game.score.get(snake, 0))
+        if snake in alive:
+            out.append(DIRECTIONS.index(snake.facing))
+            out.append(snake.grow)
+            encode_snake(out, snake)
+    write_varint(out, len(game.food))
+    for food in game.food:
+        _write_point(out, food)
+    return bytes(out)
+
+
+class DeltaEncoder:
+    """Encodes the changes a game publishes to its subscribers, ready to
+    send as a DELTA frame after each tick"""
+
+    def __init__(self, game, snakes):
+        """
+        Parameters
+        ----------
+        game: Game
+            The game being served
+        snakes: list(Snake)
+            Every snake the game started with, whose positions identify them
+        """
+        self.game = game
+        self.snakes = snakes
+        self._indices = {snake: i for i, snake in enumerate(snakes)}
+        # The encoded events since the last frame and how many there are,
+        # and whether the game was reset, so only a keyframe will do
+        self._events = bytearray()
+        self._count = 0
+        self._reset = False
+        game.subscribe(self.game_changed)
+
+    def game_changed(self, game, events):
+        """Encode a tick's events, as the game's subscriber"""
+        out, indices = self._events, self._indices
+        for kind, snake, value in events:
+            if kind == RESET or kind == QUIT:
+                self._reset = True
+                continue
+            self._count += 1
+            out.append(kind)
+            if kind == FOOD_SPAWNED:
+                _write_point(out, value)
+                continue
+            write_varint(out, indices[snake])
+            if kind == HEAD_ADVANCED:
+                # The snake faces the way it just moved
+                out.append(DIRECTIONS.index(snake.facing))
+            elif kind == SCORE_CHANGED:
+                write_varint(out, value)
+            elif kind == SNAKE_REMOVED:
+                out.append(
+                    REASONS.index(value) if value in REASONS
+                    else UNKNOWN_REASON
+                )
+
+    def encode(self):
+        """The changes since the last call, as a DELTA payload, or a
+        KEYFRAME if the game has been reset since"""
+        if self._reset:
+            payload = encode_keyframe(self.game, self.snakes)
+        else:
+            out = bytearray((DELTA,))
+            write_varint(out, self.game.ticks)
+            write_varint(out, self._count)
+            out.extend(self._events)
+            payload = bytes(out)
+        self._events.clear()
+        self._count = 0
+        self._reset = False
+        return payload
+
+
+class GameMirror:
+    """A copy of a served game, kept up to date from its frames.
+
+    The copy is a real Game, with a Snake object for each snake that lasts
+    for the whole game, so it can be drawn with a GameView.
+    """
+
+    def __init__(self):
+        #: The copy of the game, once a keyframe has arrived
+        self.game = None
+        #: Every snake the game started with
+        self.snakes = []
+        #: Whether the game has finished
+        self.finished = False
+
+    def apply(self, payload):
+        """Bring the copy up to date with a frame
+
+        Parameters
+        ----------
+        payload: bytes
+            A frame's payload, as returned by read_frame
+
+        Returns
+        -------
+        int
+            The frame type
+        """
+        kind = payload[0]
+        if kind == KEYFRAME:
+            self._keyframe(payload)
+        elif kind == DELTA and self.game is not None:
+            self._delta(payload)
+        elif kind == END:
+            self.finished = True
+        return kind
+
+    def _keyframe(self, data):
+        tick, pos = read_varint(data, 1)
+        dimensions, pos = _read_point(data, pos)
+        if self.game is None or self.game.dimension_max != dimensions:
+            self.game = Game(dimensions=dimensions)
+        game = self.game
+        game.ticks = tick
+        n_snakes, pos = read_varint(data, pos)
+        alive = []
+        for i in range(n_snakes):
+            name, pos = read_string(data, pos)
+            is_alive = data[pos]
+            score, pos = read_varint(data, pos + 1)
+            snake = self.snakes[i] if i < len(self.snakes) else None
+            if is_alive:
+                facing = DIRECTIONS[data[pos]]
+                grow = bool(data[pos + 1])
+                points, pos = decode_snake(data, pos + 2)
+                if snake is None:
+                    snake = Snake(name=name, start_points=points)
+                snake.grid = None
+                snake.restore((tuple(points), facing, grow))
+                alive.append(snake)
+            elif snake is None:
+                # Removed before we joined; its points don't matter
+                snake = Snake(name=name, start_points=[(0, 0), (0, 1)])
+            if i == len(self.snakes):
+                self.snakes.append(snake)
+            game.score[snake] = score
+        n_food, pos = read_varint(data, pos)
+        food = []
+        for _ in range(n_food):
+            point, pos = _read_point(data, pos)
+            food.append(point)
+        game.snakes = alive
+        game.food = food
+
+    def _delta(self, data):
+        game = self.game
+        snakes = self.snakes
+        game.ticks, pos = read_varint(data, 1)
+        n_events, pos = read_varint(data, pos)
+        events = []
+        for _ in range(n_events):
+            kind = data[pos]
+            pos += 1
+            if kind == FOOD_SPAWNED:
+                value, pos = _read_point(data, pos)
+                game.add_food(value)
+                events.append((kind, None, value))
+                continue
+            index, pos = read_varint(data, pos)
+            snake = snakes[index]
+            if kind == HEAD_ADVANCED:
+                snake.facing = DIRECTIONS[data[pos]]
+                pos += 1
+                # Losing the tail is an event of its own
+                snake.grow = True
+                snake.move()
+                value = snake.head
+            elif kind == TAIL_RETRACTED or kind == TAIL_STOLEN:
+                value = snake.tail
+                snake.lose_tail()
+            elif kind == FOOD_EATEN:
+                value = snake.head
+                game.remove_food(value)
+            elif kind == SCORE_CHANGED:
+                value, pos = read_varint(data, pos)
+                game.score[snake] = value
+            elif kind == SNAKE_REMOVED:
+                reason = data[pos]
+                pos += 1
+                value = REASONS[reason] if reason < len(REASONS) else None
+                game.remove_snake(snake)
+                game.deaths[snake] = (game.ticks, value)
+            else:
+                raise ValueError(f"Unknown event type {kind}")
+            events.append((kind, snake, value))
+        # Pass the changes on, e.g. to a GameView drawing the copy
+        game.publish(events)
+
+
+class _Client:
+    """A connection to the server, and the frames waiting to be sent to it"""
+
+    def __init__(self, writer, max_pending):
+        self.writer = writer
+        self.queue = asyncio.Queue(max_pending)
+        #: Whether frames were dropped, so a keyframe is needed to catch up
+        self.needs_keyframe = False
+        #: Number of times frames were dropped
+        self.dropped = 0
+
+
+class GameServer:
+    """Plays a game on a fixed step clock, taking input from remote players
+    and streaming the game to everyone connected"""
+
+    def __init__(self, game, tick_rate=10, controllers=None, max_pending=32):
+        """
+        Parameters
+        ----------
+        game: Game
+            The game to serve, with all its snakes added
+        tick_rate: float
+            Number of game updates per second
+        controllers: dict(Snake or str, callable), optional
+            Controllers for snakes nobody is playing, e.g. bots. A player
+            connecting takes over from the controller until they leave.
+            Only one player can play each snake at a time.
+        max_pending: int
+            Most frames queued for a client before it's treated as lagging
+        """
+        self.game = game
+        self.tick_rate = tick_rate
+        self.max_pending = max_pending
+        self.simulation = Simulation(game, controllers=controllers)
+        #: Every snake the game started with, identified by position
+        self.snakes = list(game.snakes)
+        #: Connected clients
+        self.clients = set()
+        #: The KeyReader steering each snake being played remotely
+        self.players = {}
+        self._encoder = DeltaEncoder(game, self.snakes)
+        self._server = None
+
+    async def start(self, host='127.0.0.1', port=0):
+        """Start accepting connections
+
+        Returns
+        -------
+        tuple(str, int)
+            The address being listened on
+        """
+        self._server = await asyncio.start_server(self._connected, host, port)
+        return self._server.sockets[0].getsockname()[:2]
+
+    async def run(self, ticks=None):
+        """Play the game in real time until it finishes
+
+        Parameters
+        ----------
+        ticks: int, optional
+            Stop after this many ticks
+        """
+        count = 0
+
+        def update():
+            nonlocal count
+            count += 1
+            return self.tick() or (ticks is not None and count >= ticks)
+
+        await FixedStepScheduler(self.tick_rate, 0).run(update)
+        self.broadcast(bytes((END,)))
+
+    def tick(self):
+        """Advance the game by one tick and queue the changes for everyone
+
+        Returns
+        -------
+        bool
+            True if the game has finished
+        """
+        finished = self.simulation.step()
+        self.broadcast(self._encoder.encode())
+        return finished
+
+    def broadcast(self, payload):
+        """Queue a frame for every client, without waiting for any of them"""
+        data = frame(payload)
+        keyframe = None
+        for client in self.clients:
+            queue = client.queue
+            if client.needs_keyframe:
+                if not queue.empty():
+                    continue
+                # Caught up, so start again from the current state
+                if keyframe is None:
+                    keyframe = frame(encode_keyframe(self.game, self.snakes))
+                queue.put_nowait(keyframe)
+                client.needs_keyframe = False
+            elif queue.full():
+                while not queue.empty():
+                    queue.get_nowait()
+                    queue.task_done()
+                client.needs_keyframe = True
+                client.dropped += 1
+            else:
+                queue.put_nowait(data)
+
+    async def _connected(self, reader, writer):
+        client = _Client(writer, self.max_pending)
+        sender = asyncio.create_task(self._send(client))
+        snake = controller = None
+        try:
+            role = await reader.readexactly(1)
+            keys = None
+            if role == PLAYER:
+                index = _index.unpack(
+                    await reader.readexactly(_index.size)
+                )[0]
+                if (index >= len(self.snakes)
+                        or self.snakes[index] in self.players):
+                    # No such snake, or someone's already playing it
+                    return
+                snake = self.snakes[index]
+                keys = KeyReader(
+                    {key: (snake, d) for key, d in REMOTE_KEYS.items()},
+                    game_view=None, exit_key=None, pause_key=None
+                )
+                self.players[snake] = keys
+                controller = self.simulation.controllers.get(snake)
+                self.simulation.controllers[snake] = keys
+            client.queue.put_nowait(
+                frame(encode_keyframe(self.game, self.snakes))
+            )
+            self.clients.add(client)
+            while True:
+                data = await reader.read(4096)
+                if not data:
+                    break
+                if keys is not None:
+                    keys.feed(data)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self.clients.discard(client)
+            if snake is not None:
+                del self.players[snake]
+                if controller is None:
+                    self.simulation.controllers.pop(snake, None)
+                else:
+                    self.simulation.controllers[snake] = controller
+            sender.cancel()
+            writer.close()
+
+    async def _send(self, client):
+        """Send a client its frames, a batch at a time"""
+        queue, writer = client.queue, client.writer
+        try:
+            while True:
+                batch = [await queue.get()]
+                while not queue.empty():
+                    batch.append(queue.get_nowait())
+                writer.write(b''.join(batch))
+                for _ in batch:
+                    queue.task_done()
+                await writer.drain()
+        except ConnectionError:
+            pass
+
+    async def flush(self, timeout=1):
+        """Wait for queued frames to be sent to every client"""
+        await asyncio.wait_for(
+            asyncio.gather(*(c.queue.join() for c in self.clients)), timeout
+        )
+
+    async def close(self):
+        """Stop accepting connections and disconnect everyone"""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        for client in list(self.clients):
+            client.writer.close()
+
+
+async def connect(host, port, player=None):
+    """Connect to a server
+
+    Parameters
+    ----------
+    host: str
+    port: int
+    player: int, optional
+        The index of the snake to steer, by default just watch
+
+    Returns
+    -------
+    tuple(asyncio.StreamReader, asyncio.StreamWriter)
+        Frames are read from the reader with read_frame, and keys written
+        to the writer
+
+    Raises
+    ------
+    ValueError
+        If the snake's index is negative
+    """
+    if player is not None and player < 0:
+        raise ValueError(f'Snake index {player} is negative')
+    reader, writer = await asyncio.open_connection(host, port)
+    if player is None:
+        writer.write(SPECTATOR)
+    else:
+        writer.write(PLAYER + _index.pack(player))
+    await writer.drain()
+    return reader, writer
+
+
+def watch(stdscr, host, port, player=None):
+    """Watch, or play, a served game in the terminal
+
+    Parameters
+    ----------
+    stdscr: curses.Window
+        The window returned by curses.initscr()
+    host: str
+    port: int
+    player: int, optional
+        The index of the snake to steer, by default just watch
+    """
+    import curses
+    import sys
+
+    from snakegame.io.keyreader import raw_mode
+    from snakegame.model.util import EXIT, FOLLOW, PAN_KEYS
+    from snakegame.view.game_view import GameView
+
+    curses.noecho()
+    curses.init_pair(1, curses.COLOR_BLUE, curses.COLOR_BLACK)
+    curses.init_pair(2, curses.COLOR_YELLOW, curses.COLOR_BLACK)
+
+    view = None
+
+    async def forward_keys(writer, done):
+        loop = asyncio.get_running_loop()
+        with raw_mode(sys.stdin):
+            read = asyncio.StreamReader()
+            await loop.connect_read_pipe(
+                lambda: asyncio.StreamReaderProtocol(read), sys.stdin
+            )
+        while True:
+            data = await read.read(4096)
+            if not data or EXIT.encode() in data:
+                done.set()
+                return
+            if view is not None:
+                for key in data.decode(errors='ignore'):
+                    if key in PAN_KEYS:
+                        view.pan(PAN_KEYS[key])
+                    elif key == FOLLOW:
+                        view.follow()
+            if player is not None:
+                writer.write(data)
+
+    async def show():
+        nonlocal view
+        reader, writer = await connect(host, port, player)
+        mirror = GameMirror()
+        done = asyncio.Event()
+        keys = asyncio.ensure_future(forward_keys(writer, done))
+        quit = asyncio.ensure_future(done.wait())
+        while not mirror.finished:
+            next_frame = asyncio.ensure_future(read_frame(reader))
+            await asyncio.wait(
+                [next_frame, quit], return_when=asyncio.FIRST_COMPLETED
+            )
+            if done.is_set() or next_frame.result() is None:
+                next_frame.cancel()
+                break
+            mirror.apply(next_frame.result())
+            if mirror.game is None:
+                continue
+            if view is None:
+                snakes = mirror.snakes[player or 0:]
+                view = GameView(
+                    mirror.game, n_colours=2,
+                    follow=snakes[0] if snakes else None
+                )
+            view.draw_game(stdscr)
+        keys.cancel()
+        quit.cancel()
+        writer.close()
+
+    asyncio.run(show())
+
+
+def cli():
+    from snakegame import bots
+    from snakegame.model.layouts import classic_scenario
+    from snakegame.model.scenario import Scenario
+
+    parser = argparse.ArgumentParser(
+        description='Serve a game to remote players and spectators'
+    )
+    parser.add_argument('--host', type=str, default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=7777)
+    parser.add_argument(
+        '--tick-rate', type=float, default=4, help='Ticks per second'
+    )
+    parser.add_argument(
+        '--scenario', type=str, default=None, metavar='FILE',
+        help='The game to serve, by default the classic 2 player game'
+    )
+    parser.add_argument(
+        '--seed', type=int, default=None, help='Seed for food placement'
+    )
+    parser.add_argument(
+        '--bots', action='store_true',
+        help='Let the path finding bot steer snakes nobody is playing'
+    )
+    args = parser.parse_args()
+    scenario = (
+        Scenario.load(args.scenario) if args.scenario is not None
+        else classic_scenario(n_players=2)
+    )
+    game = scenario.make_game(rng=args.seed)
+    controllers = None
+    if args.bots:
+        bot = bots.PathFinder()
+        controllers = {snake: bot for snake in game.snakes}
+    server = GameServer(game, tick_rate=args.tick_rate,
+                        controllers=controllers)
+
+    async def serve():
+        host, port = await server.start(args.host, args.port)
+        print(f'Serving on {host}:{port}')
+        await server.run(ticks=scenario.max_ticks)
+        await server.flush()
+        await server.close()
+
+    asyncio.run(serve())
+
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,414 @@
+"""Publishing a game's state in shared memory, for other processes to watch.
+
+A SharedGameWriter subscribes to a game and keeps a
+multiprocessing.shared_memory block up to date with it after every tick,
+changing only what the tick changed. Any number of processes can attach a
+SharedGame to the block by name and read the game without it being
+pickled or copied.
+
+The block holds, in order:
+
+- a header of little-endian unsigned 64 bit integers: MAGIC, the sequence
+  number, the tick, the width and height of the board, the number of snakes
+  the game started with, the room for food, the number of food items and
+  the length of the snakes' names
+- the names of the snakes, as a JSON list in UTF-8, padded to 8 bytes
+- for each snake the game started with, SNAKE_FIELDS as unsigned 32 bit
+  integers, with squares given by flat index (y * width + x)
+- the flat index of each food item, as unsigned 32 bit integers
+- the number of items on each square of the board, one byte each, as
+  counted by the game's OccupancyGrid
+
+The sequence number makes a seqlock: the writer makes it odd before
+changing anything and even again once it's done, so a reader knows what it
+read is consistent if the number was even and unchanged throughout.
+SharedGame.read takes care of retrying until it is.
+"""
+import json
+import struct
+import sys
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+from snakegame.model.game import (
+    FOOD_EATEN, FOOD_SPAWNED, HEAD_ADVANCED, QUIT, RESET, SCORE_CHANGED,
+    SNAKE_REMOVED, TAIL_RETRACTED, TAIL_STOLEN
+)
+from snakegame.model.util import DIRECTIONS, Point
+
+MAGIC = struct.unpack('<Q', b'SNKSHM01')[0]
+# Positions in the header
+(_MAGIC, _SEQUENCE, _TICKS, _WIDTH, _HEIGHT, _SNAKES, _FOOD_ROOM, _FOOD,
+ _NAMES) = range(9)
+HEADER_SIZE = 9 * 8
+#: What's stored for each snake, in order
+SNAKE_FIELDS = ('alive', 'facing', 'score', 'length', 'head', 'tail')
+(_ALIVE, _FACING, _SCORE, _LENGTH, _HEAD, _TAIL) = range(len(SNAKE_FIELDS))
+# Counts above this are stored as this
+_MAX_COUNT = 255
+# Longest a reader sleeps between tries while the writer is busy, in seconds
+_MAX_BACKOFF = 1e-3
+# Blocks created by this process, or the one it was forked from, which
+# share a resource tracker
+_created = set()
+
+
+def _layout(n_snakes, names_size, food_room, width, height):
+    """Offsets of the snakes, food and board, and the size of the block"""
+    snakes = HEADER_SIZE + -(-names_size // 8) * 8
+    food = snakes + n_snakes * len(SNAKE_FIELDS) * 4
+    board = food + food_room * 4
+    return snakes, food, board, board + width * height
+
+
+def _attach(name):
+    """Open an existing block without taking charge of removing it, which
+    is left to the process that created it"""
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name, track=False)
+    block = shared_memory.SharedMemory(name)
+    if block._name not in _created:
+        # Stop this process's resource tracker unlinking the block on exit.
+        # The tracker a block was created with is left to unlink it, so
+        # as not to forget the block before the writer does.
+        resource_tracker.unregister(block._name, 'shared_memory')
+    return block
+
+
+class SharedGameWriter:
+    """Publishes a game's state to a shared memory block after each tick.
+
+    The writer subscribes to the game, so only the squares, snakes and food
+    changed by a tick are written. Snakes must all be added to the game
+    before it starts.
+    """
+
+    def __init__(self, game, name=None, food_room=None):
+        """
+        Parameters
+        ----------
+        game: Game
+            The game to publish
+        name: str, optional
+            The name of the shared memory block, by default a unique one
+        food_room: int, optional
+            Most food items the game will have at once, by default enough
+            for four times as many as it has now, or at least 64
+
+        Raises
+        ------
+        FileExistsError
+            If there's already a shared memory block with the name
+        """
+        self.game = game
+        self.snakes = list(game.snakes)
+        self._indices = {snake: i for i, snake in enumerate(self.snakes)}
+        self.food_room = food_room or max(4 * len(game.food), 64)
+        names = json.dumps([snake.name for snake in self.snakes]).encode()
+        width, height = game.grid.width, game.grid.height
+        snakes, food, board, size = _layout(
+            len(self.snakes), len(names), self.food_room, width, height
+        )
+        #: The shared memory block
+        self.block = shared_memory.SharedMemory(name, create=True, size=size)
+        #: Its name, for readers to attach to
+        self.name = self.block.name
+        _created.add(self.block._name)
+        buf = self.block.buf
+        self._header = buf[:HEADER_SIZE].cast('Q')
+        self._snakes = buf[snakes:food].cast('I')
+        self._food = buf[food:board].cast('I')
+        self._board = buf[board:size]
+        buf[HEADER_SIZE:HEADER_SIZE + len(names)] = names
+        header = self._header
+        header[_WIDTH], header[_HEIGHT] = width, height
+        header[_SNAKES] = len(self.snakes)
+        header[_FOOD_ROOM] = self.food_room
+        header[_NAMES] = len(names)
+        self._write_all()
+        header[_MAGIC] = MAGIC
+        game.subscribe(self.game_changed)
+
+    def _write_all(self):
+        """Write the whole state, e.g. after the game's been reset"""
+        header, game = self._header, self.game
+        header[_SEQUENCE] += 1
+        header[_TICKS] = game.ticks
+        alive = set(game.snakes)
+        for snake in self.snakes:
+            self._write_snake(snake, alive=snake in alive)
+        counts = game.grid.counts
+        try:
+            self._board[:] = bytes(counts)
+        except ValueError:
+            self._board[:] = bytes(min(c, _MAX_COUNT) for c in counts)
+        self._write_food()
+        header[_SEQUENCE] += 1
+
+    def _write_snake(self, snake, alive=True):
+        row = self._indices[snake] * len(SNAKE_FIELDS)
+        snakes, index = self._snakes, self.game.grid.index
+        snakes[row + _ALIVE] = alive
+        snakes[row + _SCORE] = self.game.score.get(snake, 0)
+        if alive:
+            snakes[row + _FACING] = DIRECTIONS.index(snake.facing)
+            snakes[row + _LENGTH] = len(snake.points)
+            snakes[row + _HEAD] = index(snake.head)
+            snakes[row + _TAIL] = index(snake.tail)
+
+    def _write_food(self):
+        food = self.game.food
+        if len(food) > self.food_room:
+            raise ValueError(
+                f"{len(food)} food items don't fit in the shared block, "
+                f"which has room for {self.food_room}"
+            )
+        index, shared = self.game.grid.index, self._food
+        for i, pos in enumerate(food):
+            shared[i] = index(pos)
+        self._header[_FOOD] = len(food)
+
+    def game_changed(self, game, events):
+        """Write what changed in a tick, as the game's subscriber"""
+        if any(kind == RESET or kind == QUIT for kind, _, _ in events):
+            self._write_all()
+            return
+        header, snakes, board = self._header, self._snakes, self._board
+        counts, index = game.grid.counts, game.grid.index
+        indices, width = self._indices, len(SNAKE_FIELDS)
+        food_changed = False
+        header[_SEQUENCE] += 1
+        header[_TICKS] = game.ticks
+        for kind, snake, value in events:
+            if kind == SCORE_CHANGED:
+                snakes[indices[snake] * width + _SCORE] = value
+                continue
+            if kind == SNAKE_REMOVED:
+                snakes[indices[snake] * width + _ALIVE] = 0
+                # Uncovers every square the snake was on
+                for pos in snake.points:
+                    i = index(pos)
+                    if i is not None:
+                        board[i] = min(counts[i], _MAX_COUNT)
+                continue
+            i = index(value)
+            if i is not None:
+                board[i] = min(counts[i], _MAX_COUNT)
+            if kind == FOOD_EATEN or kind == FOOD_SPAWNED:
+                food_changed = True
+            elif kind == HEAD_ADVANCED:
+                row = indices[snake] * width
+                snakes[row + _FACING] = DIRECTIONS.index(snake.facing)
+                snakes[row + _LENGTH] = len(snake.points)
+                snakes[row + _HEAD] = i
+            elif kind == TAIL_RETRACTED or kind == TAIL_STOLEN:
+                row = indices[snake] * width
+                snakes[row + _LENGTH] = len(snake.points)
+                if snake.points:
+                    snakes[row + _TAIL] = index(snake.tail)
+        if food_changed:
+            self._write_food()
+        header[_SEQUENCE] += 1
+
+    def close(self):
+        """Stop publishing and remove the block. Readers already attached
+        can still read the last state."""
+        self.game.unsubscribe(self.game_changed)
+        for view in (self._header, self._snakes, self._food, self._board):
+            view.release()
+        self.block.close()
+        self.block.unlink()
+        _created.discard(self.block._name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class SharedSnake:
+    """A snake in a SharedGame, read straight from shared memory"""
+
+    def __init__(self, shared_game, index, name):
+        self._game = shared_game
+        #: Position of the snake among those the game started with
+        self.index = index
+        self.name = name
+
+    def _field(self, field):
+        return self._game._snakes[self.index * len(SNAKE_FIELDS) + field]
+
+    @property
+    def alive(self):
+        return bool(self._field(_ALIVE))
+
+    @property
+    def head(self):
+        return self._game._point(self._field(_HEAD))
+
+    @property
+    def tail(self):
+        return self._game._point(self._field(_TAIL))
+
+    @property
+    def facing(self):
+        """Direction of travel"""
+        return DIRECTIONS[self._field(_FACING)]
+
+    @property
+    def length(self):
+        """Number of squares the snake occupies"""
+        return self._field(_LENGTH)
+
+    def __repr__(self):
+        return f'SharedSnake({self.name!r})'
+
+
+class SharedGame:
+    """A read-only view of a game published by a SharedGameWriter, possibly
+    in another process.
+
+    Its properties read shared memory directly, so they can change from
+    one moment to the next as the writer updates the game. To see a
+    consistent state, read it inside read, e.g.
+
+        ticks, scores = shared.read(lambda game: (game.ticks, game.score))
+    """
+
+    def __init__(self, name):
+        """
+        Parameters
+        ----------
+        name: str
+            The name of the writer's shared memory block
+
+        Raises
+        ------
+        FileNotFoundError
+            If there's no block with the name
+        ValueError
+            If the block doesn't hold a game
+        """
+        self.block = _attach(name)
+        buf = self.block.buf
+        self._header = header = buf[:HEADER_SIZE].cast('Q')
+        if header[_MAGIC] != MAGIC:
+            self.close()
+            raise ValueError(f"Shared memory {name!r} doesn't hold a game")
+        names_size = header[_NAMES]
+        names = json.loads(
+            bytes(buf[HEADER_SIZE:HEADER_SIZE + names_size]).decode()
+        )
+        self.width, self.height = header[_WIDTH], header[_HEIGHT]
+        snakes, food, board, size = _layout(
+            len(names), names_size, header[_FOOD_ROOM], self.width,
+            self.height
+        )
+        self._snakes = buf[snakes:food].cast('I')
+        self._food = buf[food:board].cast('I')
+        #: The number of items on each square, by flat index, zero-copy
+        self.board = buf[board:size].toreadonly()
+        #: Every snake the game started with
+        self.all_snakes = [
+            SharedSnake(self, i, name) for i, name in enumerate(names)
+        ]
+
+    def read(self, function):
+        """Call a function with this view until the writer didn't change
+        the game while it ran, and return its result
+
+        Parameters
+        ----------
+        function: callable
+            Takes the SharedGame, and should copy anything it returns out
+            of shared memory
+
+        Returns
+        -------
+        The function's result
+        """
+        header = self._header
+        backoff = 0
+        while True:
+            sequence = header[_SEQUENCE]
+            if not sequence % 2:
+                try:
+                    result = function(self)
+                except (IndexError, ValueError):
+                    # Reading a half written state can go wrong in odd ways
+                    if header[_SEQUENCE] == sequence:
+                        raise
+                else:
+                    if header[_SEQUENCE] == sequence:
+                        return result
+            # The writer is busy. Let it run, the more so the longer it
+            # takes, rather than holding the GIL or a core while it does.
+            time.sleep(backoff)
+            backoff = min(2 * backoff or 1e-5, _MAX_BACKOFF)
+
+    @property
+    def sequence(self):
+        """Changes every time the writer changes the game"""
+        return self._header[_SEQUENCE]
+
+    @property
+    def ticks(self):
+        """Number of updates made so far"""
+        return self._header[_TICKS]
+
+    @property
+    def dimension_max(self):
+        """The maximum x and y coordinates of the game area"""
+        return self.width - 1, self.height - 1
+
+    @property
+    def snakes(self):
+        """The snakes still in the game"""
+        return [snake for snake in self.all_snakes if snake.alive]
+
+    @property
+    def score(self):
+        """Each snake's score"""
+        return {snake: snake._field(_SCORE) for snake in self.all_snakes}
+
+    @property
+    def food(self):
+        """Positions of the food items"""
+        return [
+            self._point(i) for i in self._food[:self._header[_FOOD]]
+        ]
+
+    def _point(self, index):
+        return Point(index % self.width, index // self.width)
+
+    def count(self, pos):
+        """Number of items occupying a square, up to 255"""
+        x, y = pos
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return self.board[y * self.width + x]
+        return 0
+
+    def is_occupied(self, pos):
+        """Check if anything occupies a square"""
+        return self.count(pos) > 0
+
+    def in_bounds(self, pos):
+        """Check if a point lies strictly inside the game boundaries"""
+        x, y = pos
+        return 0 < x < self.width - 1 and 0 < y < self.height - 1
+
+    def close(self):
+        """Detach from the block"""
+        for view in (self._header, getattr(self, '_snakes', None),
+                     getattr(self, '_food', None),
+                     getattr(self, 'board', None)):
+            if view is not None:
+                view.release()
+        self.block.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
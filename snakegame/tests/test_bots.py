@@ -0,0 +1,101 @@
+import pickle
+import random
+import unittest
+from unittest import mock
+
+from snakegame import bots
+from snakegame.bots import HamiltonianCycle, PathFinder, greedy
+from snakegame.model import Game, Simulation, Snake
+from snakegame.model.layouts import classic_game
+from snakegame.model.util import Point, UP
+
+
+def play(bot, seed, ticks):
+    game = classic_game(rng=random.Random(seed))
+    snake = game.snakes[0]
+    Simulation(game, {snake: bot}).run(ticks)
+    return game, snake
+
+
+class TestBots(unittest.TestCase):
+
+    def test_bots_eat(self):
+        for bot in [greedy, PathFinder(), HamiltonianCycle()]:
+            game, snake = play(bot, seed=0, ticks=300)
+            self.assertGreaterEqual(game.score[snake], 5, bot)
+
+    def test_hamiltonian_never_dies(self):
+        for seed in range(3):
+            game, snake = play(HamiltonianCycle(), seed, ticks=2000)
+            self.assertIn(snake, game.snakes)
+            self.assertGreater(game.score[snake], 50)
+
+    def test_greedy_avoids_walls(self):
+        game = Game(dimensions=(6, 6))
+        snake = Snake('bot', [[2, 4], [3, 4], [4, 4], [5, 4]])
+        game.add_snake(snake)
+        game.add_food(Point(5, 1))
+        # Up towards the food, rather than straight on into the wall
+        self.assertEqual(greedy(game, snake), UP)
+        game.remove_food(Point(5, 1))
+        game.add_food(Point(1, 1))
+        self.assertEqual(greedy(game, snake), UP)
+
+    def test_pickle(self):
+        bot = PathFinder()
+        play(bot, seed=0, ticks=5)
+        self.assertIsInstance(pickle.loads(pickle.dumps(bot)), PathFinder)
+
+
+class TestPathFinder(unittest.TestCase):
+
+    def setUp(self):
+        self.game = Game(dimensions=(20, 20), rng=random.Random(0))
+        self.snake = Snake('bot', [[1, 10], [2, 10], [3, 10]])
+        self.game.add_snake(self.snake)
+        self.game.add_food(Point(15, 10))
+        self.bot = PathFinder()
+        self.sim = Simulation(self.game, {self.snake: self.bot})
+
+    def test_path_is_cached(self):
+        with mock.patch.object(bots, 'a_star', wraps=bots.a_star) as search:
+            self.sim.run(13)
+        self.assertEqual(self.game.score[self.snake], 1)
+        # One search to reach the food, one for the food that replaced it
+        self.assertEqual(search.call_count, 2)
+
+    def test_path_is_repaired(self):
+        self.sim.step()
+        # Another snake's head moves onto the path
+        other = Snake('other', [[8, 12], [8, 11]])
+        self.game.add_snake(other)
+        other.set_direction(Point(0, -1))
+        with mock.patch.object(bots, 'a_star', wraps=bots.a_star) as search:
+            self.sim.step()
+            self.assertEqual(self.snake.head, Point(5, 10))
+            self.sim.step()
+        self.assertEqual(search.call_count, 1)
+        # Searching again from the square before the blocked one
+        self.assertEqual(search.call_args.args[1], Point(7, 10))
+        self.sim.run(30)
+        self.assertIn(self.snake, self.game.snakes)
+        self.assertGreaterEqual(self.game.score[self.snake], 1)
+
+
+class TestHamiltonianCycle(unittest.TestCase):
+
+    def test_cycles(self):
+        for dimensions in [(12, 12), (13, 12), (12, 13), (13, 13), (4, 4)]:
+            cycle = bots.hamiltonian_cycle(dimensions)
+            squares = {
+                Point(x, y) for x in range(1, dimensions[0])
+                for y in range(1, dimensions[1])
+            }
+            for a, b in zip(cycle, cycle[1:] + cycle[:1]):
+                self.assertEqual(abs(a.x - b.x) + abs(a.y - b.y), 1)
+            self.assertEqual(len(set(cycle)), len(cycle))
+            missing = squares.difference(cycle)
+            if (dimensions[0] - 1) % 2 and (dimensions[1] - 1) % 2:
+                self.assertEqual(missing, {Point(1, dimensions[1] - 1)})
+            else:
+                self.assertEqual(missing, set())
@@ -0,0 +1,101 @@
+import unittest
+
+from snakegame.model.util import DOWN, RIGHT, DIRECTIONS
+
+try:
+    import numpy as np
+    from snakegame.env import (
+        BODY, FOOD, HEAD, OTHERS, SnakeEnv, VectorSnakeEnv
+    )
+    from snakegame.model.batch import NO_ACTION
+except ImportError:
+    np = None
+
+
+@unittest.skipIf(np is None, 'numpy is not installed')
+class TestSnakeEnv(unittest.TestCase):
+
+    def test_observation(self):
+        env = SnakeEnv(n_players=2)
+        obs = env.reset(seed=0)
+        self.assertEqual(obs.shape, (2, 4, 13, 13))
+        # snake1 runs down from (3, 3) to (3, 5), snake2 up from (7, 8)
+        self.assertEqual(obs[0, HEAD, 5, 3], 1)
+        self.assertEqual(obs[0, HEAD].sum(), 1)
+        self.assertEqual(obs[0, BODY].sum(), 3)
+        self.assertTrue((obs[0, OTHERS] == obs[1, BODY]).all())
+        self.assertEqual(obs[1, FOOD, 6, 5], 1)
+
+    def test_step(self):
+        env = SnakeEnv(max_ticks=50)
+        obs = env.reset(seed=0)
+        # Head from (3, 5) to the food at (5, 6)
+        for action in [DOWN, RIGHT, RIGHT]:
+            next_obs, rewards, done, info = env.step(DIRECTIONS.index(action))
+            self.assertIs(next_obs, obs)
+        self.assertEqual(rewards.tolist(), [1.0])
+        self.assertEqual(info['scores'].tolist(), [1])
+        self.assertFalse(done)
+        self.assertEqual(obs[0, FOOD].sum(), 1)
+        self.assertEqual(obs[0, FOOD, 6, 5], 0)
+
+        while not done:
+            obs, rewards, done, info = env.step(NO_ACTION)
+        # Carrying on to the right runs into the wall
+        self.assertFalse(info['truncated'])
+        self.assertEqual(info['alive'].tolist(), [False])
+        self.assertEqual(obs[0, BODY].sum(), 0)
+
+
+@unittest.skipIf(np is None, 'numpy is not installed')
+class TestVectorSnakeEnv(unittest.TestCase):
+
+    def test_observations_match_batch(self):
+        env = VectorSnakeEnv(16, n_players=2, seed=0)
+        obs = env.reset()
+        rng = np.random.default_rng(0)
+        for _ in range(30):
+            actions = rng.integers(NO_ACTION, 4, size=(16, 2))
+            next_obs, rewards, dones, info = env.step(actions)
+            self.assertIs(next_obs, obs)
+            batch = env.batch
+            for i in range(16):
+                expected = np.zeros(obs.shape[1:], dtype=obs.dtype)
+                for s in range(2):
+                    if not batch.alive[i, s]:
+                        continue
+                    points = batch.snake_points(i, s)
+                    for x, y in points:
+                        expected[s, BODY, y, x] = 1
+                        expected[1 - s, OTHERS, y, x] = 1
+                    expected[s, HEAD, points[-1].y, points[-1].x] = 1
+                for x, y in batch.food_points(i):
+                    expected[:, FOOD, y, x] = 1
+                np.testing.assert_array_equal(obs[i], expected)
+
+    def test_auto_reset(self):
+        env = VectorSnakeEnv(8, seed=0, max_ticks=20)
+        env.reset()
+        total = 0
+        for _ in range(40):
+            _, rewards, dones, info = env.step(np.full((8, 1), NO_ACTION))
+            total += rewards.sum()
+            # Carrying straight down from (3, 5) hits the wall on tick 7
+            if dones.any():
+                self.assertTrue(dones.all())
+                self.assertEqual(info['ticks'].tolist(), [7] * 8)
+                self.assertFalse(info['truncated'].any())
+                self.assertTrue((env.batch.ticks == 0).all())
+                break
+        else:
+            self.fail('Games never finished')
+
+    def test_truncation(self):
+        env = VectorSnakeEnv(4, seed=0, max_ticks=3)
+        env.reset()
+        for _ in range(2):
+            _, _, dones, _ = env.step(np.full((4, 1), NO_ACTION))
+            self.assertFalse(dones.any())
+        _, _, dones, info = env.step(np.full((4, 1), NO_ACTION))
+        self.assertTrue(dones.all())
+        self.assertTrue(info['truncated'].all())
@@ -0,0 +1,57 @@
+import io
+import json
+import subprocess
+import sys
+import unittest
+
+from snakegame.main import headless, make_scenario
+from snakegame.replay import Replay
+
+# Runs a headless game in a fresh interpreter and lists the modules loaded
+HEADLESS_IMPORTS = """
+import contextlib, io, json, sys
+from snakegame.main import cli
+with contextlib.redirect_stdout(io.StringIO()):
+    cli(['--headless', '--ticks', '20', '--seed', '1'])
+print(json.dumps(sorted(sys.modules)))
+"""
+
+
+class TestHeadless(unittest.TestCase):
+
+    def test_reproducible(self):
+        scenario = make_scenario(board=(20, 20), snakes=3, food=2)
+        first = headless(ticks=200, seed=4, scenario=scenario, bot='path')
+        self.assertEqual(
+            headless(ticks=200, seed=4, scenario=scenario, bot='path'), first
+        )
+        self.assertEqual(first['seed'], 4)
+        self.assertLessEqual(first['ticks'], 200)
+        self.assertEqual(len(first['scores']), 3)
+
+    def test_tick_limits(self):
+        self.assertEqual(headless(ticks=15, seed=1)['ticks'], 15)
+        scenario = make_scenario(max_ticks=10)
+        self.assertEqual(headless(ticks=15, scenario=scenario)['ticks'], 10)
+
+    def test_record(self):
+        file = io.BytesIO()
+        result = headless(ticks=30, seed=2, record=file)
+        replay = Replay(file.getvalue())
+        self.assertEqual(replay.seed, 2)
+        self.assertEqual(replay.final_tick, result['ticks'])
+
+    def test_doesnt_import_the_terminal(self):
+        output = subprocess.run(
+            [sys.executable, '-c', HEADLESS_IMPORTS],
+            capture_output=True, text=True, check=True
+        ).stdout
+        modules = set(json.loads(output))
+        self.assertIn('snakegame.main', modules)
+        for module in ['curses', 'termios', 'asyncio', 'snakegame.view',
+                       'snakegame.io', 'snakegame.server']:
+            self.assertNotIn(module, modules)
+        self.assertFalse(
+            [m for m in modules if m.startswith(('snakegame.view.',
+                                                 'snakegame.io.'))]
+        )
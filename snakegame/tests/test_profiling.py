@@ -0,0 +1,42 @@
+import unittest
+
+from snakegame.profiling import FrameTimer, Histogram
+
+
+class TestHistogram(unittest.TestCase):
+
+    def test_buckets(self):
+        histogram = Histogram()
+        for ms in [0.05, 0.3, 0.3, 7, 5000]:
+            histogram.add(ms)
+        self.assertEqual(len(histogram), 5)
+        self.assertEqual(histogram.counts[0], 1)
+        self.assertEqual(histogram.counts[2], 2)
+        self.assertEqual(histogram.counts[-1], 1)
+        self.assertEqual(histogram.max, 5000)
+        self.assertEqual(len(histogram.lines()), 4)
+
+
+class TestFrameTimer(unittest.TestCase):
+
+    def test_ticks(self):
+        timer = FrameTimer(tick_rate=10)
+        # Ticks at 0s, 0.1s and 0.13s, i.e. on time and then 70ms early
+        for now, update, render in [(0, 0.001, 0.002), (0.1, 0.003, 0.002),
+                                    (0.13, 0.001, 0.001)]:
+            timer.add('update', update)
+            timer.add('render', render)
+            timer.add('input', 0.0005)
+            timer.add('input', 0.0005)
+            timer.tick(now)
+        self.assertEqual(timer.ticks, 3)
+        self.assertEqual(list(timer.recent['input']), [1.0, 1.0, 1.0])
+        self.assertAlmostEqual(timer.histograms['update'].max, 3)
+        drift = list(timer.recent['drift'])
+        self.assertEqual(len(drift), 2)
+        self.assertAlmostEqual(drift[0], 0)
+        self.assertAlmostEqual(drift[1], 70)
+        timer.latency(None, 0.02)
+        self.assertEqual(list(timer.recent['latency']), [20])
+        self.assertEqual(len(timer.overlay()), 5)
+        self.assertIn('3 ticks', timer.report())
@@ -0,0 +1,100 @@
+import io
+import random
+import unittest
+
+from snakegame.model import Game, Simulation, Snake
+from snakegame.model.util import DOWN, LEFT, RIGHT, UP, Point
+from snakegame.replay import Recorder, Replay
+
+
+def seek_food(game, snake):
+    """Head towards the first food item, wandering a little"""
+    if random.random() < 0.1:
+        return random.choice([UP, DOWN, LEFT, RIGHT])
+    target = game.food[0]
+    if target.x != snake.head.x:
+        return RIGHT if target.x > snake.head.x else LEFT
+    return DOWN if target.y > snake.head.y else UP
+
+
+def state(game):
+    """A comparable summary of a game"""
+    return (
+        game.ticks,
+        [(snake.name, list(snake.points), snake.facing, snake.grow)
+         for snake in game.snakes],
+        sorted(game.food),
+        sorted((snake.name, score) for snake, score in game.score.items()),
+        sorted((snake.name, death) for snake, death in game.deaths.items()),
+    )
+
+
+class TestReplay(unittest.TestCase):
+
+    def setUp(self):
+        random.seed(0)
+        self.game = Game(dimensions=(20, 20), rng=random.Random(5))
+        self.game.add_snake(Snake('snake1', [[3, 3], [3, 4], [3, 5]]))
+        self.game.add_snake(Snake('snake2', [[15, 8], [15, 7], [15, 6]]))
+        self.game.add_food(Point(9, 7))
+        self.file = io.BytesIO()
+        self.recorder = Recorder(
+            self.file, self.game, tick_rate=4, seed=5, keyframe_interval=10
+        )
+        sim = Simulation(self.game, controllers={
+            'snake1': seek_food, 'snake2': seek_food
+        })
+        self.states = [state(self.game)]
+        while not sim.finished and self.game.ticks < 200:
+            sim.step()
+            self.states.append(state(self.game))
+        self.assertGreaterEqual(sum(self.game.score.values()), 2)
+        self.assertGreater(self.game.ticks, 30)
+
+    def test_play_through(self):
+        self.recorder.close()
+        replay = Replay(self.file.getvalue())
+        self.assertEqual(replay.dimensions, (20, 20))
+        self.assertEqual(replay.tick_rate, 4)
+        self.assertEqual(replay.seed, 5)
+        self.assertEqual(replay.names, ['snake1', 'snake2'])
+        self.assertEqual(replay.final_tick, self.game.ticks)
+        player = replay.player()
+        self.assertEqual(state(player.game), self.states[0])
+        while not player.step():
+            self.assertEqual(
+                state(player.game), self.states[player.game.ticks]
+            )
+        self.assertEqual(state(player.game), self.states[-1])
+
+    def test_seek(self):
+        self.recorder.close()
+        player = Replay(self.file.getvalue()).player()
+        for tick in [25, 3, len(self.states) - 1, 10]:
+            player.seek(tick)
+            self.assertEqual(state(player.game), self.states[tick])
+
+    def test_truncated(self):
+        # A recording cut off part way can still be played
+        data = self.file.getvalue()
+        replay = Replay(data)
+        self.assertGreater(len(replay.keyframes), 1)
+        player = replay.player()
+        player.seek(replay.keyframes[-1][0])
+        self.assertEqual(
+            state(player.game), self.states[replay.keyframes[-1][0]]
+        )
+
+    def test_keys_and_quit(self):
+        self.recorder.record_key('w')
+        self.game.quit()
+        self.recorder.close()
+        player = Replay(self.file.getvalue()).player()
+        player.run()
+        self.assertEqual(player.keys, [(self.game.ticks, 'w')])
+        self.assertEqual(player.game.snakes, [])
+
+    def test_compact(self):
+        self.recorder.close()
+        # Far smaller than a naive snapshot every tick
+        self.assertLess(len(self.file.getvalue()), 40 * len(self.states))
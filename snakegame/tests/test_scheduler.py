@@ -0,0 +1,128 @@
+import asyncio
+import time
+import unittest
+
+from snakegame.scheduler import FixedStepScheduler
+
+
+class FakeClock:
+    """A clock which only moves when slept on or told to"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.now += seconds
+
+
+def run(scheduler, update, render=None, paused=None):
+    return asyncio.run(scheduler.run(update, render, paused))
+
+
+class TestFixedStepScheduler(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+
+    def scheduler(self, tick_rate, **kwargs):
+        return FixedStepScheduler(
+            tick_rate, clock=self.clock, sleep=self.clock.sleep, spin=0,
+            **kwargs
+        )
+
+    def test_no_drift_under_load(self):
+        # Each tick takes 60% of the timestep, which a sleep after each tick
+        # would add on to every one
+        starts = []
+
+        def update():
+            starts.append(self.clock.now)
+            self.clock.now += 0.6 / 7
+            return len(starts) == 50
+
+        self.assertEqual(run(self.scheduler(7), update), 50)
+        for k, start in enumerate(starts):
+            self.assertAlmostEqual(start, k / 7)
+
+    def test_catch_up_is_capped(self):
+        starts = []
+
+        def update():
+            starts.append(self.clock.now)
+            if len(starts) == 3:
+                # Stall for eight ticks
+                self.clock.now += 1.0
+            return len(starts) == 20
+
+        scheduler = self.scheduler(8, max_catch_up=4)
+        run(scheduler, update)
+        # Three ticks run straight after the stall, then the rest are dropped
+        self.assertEqual(starts[3:6], [1.25, 1.25, 1.25])
+        self.assertEqual(scheduler.dropped, 5)
+        self.assertEqual(starts[6:8], [1.375, 1.5])
+
+    def test_render_rate(self):
+        frames = []
+        ticks = []
+
+        def update():
+            ticks.append(self.clock.now)
+            return len(ticks) == 8
+
+        run(self.scheduler(4, render_rate=30), update,
+            lambda: frames.append(self.clock.now))
+        # Two seconds of ticks at 30 frames per second, plus the last frame
+        self.assertAlmostEqual(len(frames), 1.75 * 30 + 2, delta=1)
+
+        frames.clear()
+        ticks.clear()
+        run(self.scheduler(4, render_rate=0), update,
+            lambda: frames.append(self.clock.now))
+        self.assertEqual(frames, [])
+
+        # By default, one frame per tick
+        ticks.clear()
+        run(self.scheduler(4), update, lambda: frames.append(self.clock.now))
+        self.assertEqual(frames, ticks)
+
+    def test_pause_restarts_schedule(self):
+        starts = []
+        paused = iter([False, True, True, False, False, False])
+
+        def update():
+            starts.append(self.clock.now)
+            return len(starts) == 3
+
+        run(self.scheduler(1), update, paused=lambda: next(paused, False))
+        # The tick due at 1s is lost to the pause, and the schedule picks up
+        # again from when the game is unpaused
+        self.assertEqual(starts, [0, 3, 4])
+
+    def test_jitter_with_real_clock(self):
+        # 100 ticks/s where each tick burns half the timestep
+        starts = []
+
+        def update():
+            starts.append(time.monotonic())
+            end = starts[-1] + 0.005
+            while time.monotonic() < end:
+                pass
+            return len(starts) == 100
+
+        run(FixedStepScheduler(100), update)
+        t0 = starts[0]
+        lateness = [start - (t0 + k / 100) for k, start in enumerate(starts)]
+        # Ticks never run early, and don't accumulate lateness. Another
+        # process can hold up the odd tick by a few milliseconds, but no
+        # tick is ever two timesteps late, which drifting by even 0.2ms a
+        # tick would be by the end.
+        self.assertGreaterEqual(min(lateness), -1e-3)
+        self.assertLess(max(lateness), 0.02)
+        self.assertLess(sum(lateness) / len(lateness), 0.001)
+
+    def test_bad_tick_rate(self):
+        with self.assertRaises(ValueError):
+            FixedStepScheduler(0)
@@ -0,0 +1,190 @@
+import asyncio
+import unittest
+from collections import Counter
+
+from snakegame import bots
+from snakegame.model.scenario import Scenario
+from snakegame.model.util import DOWN, LEFT, RIGHT, UP
+from snakegame.server import (
+    DELTA, END, KEYFRAME, GameMirror, GameServer, connect, read_frame
+)
+
+KEYS = {b'w': UP, b'd': RIGHT, b's': DOWN, b'a': LEFT}
+
+
+def make_server(**kwargs):
+    game = Scenario(
+        dimensions=(30, 30), snakes=6, snake_length=4, food=5
+    ).make_game(rng=1)
+    bot = bots.PathFinder()
+    return GameServer(
+        game, controllers={snake: bot for snake in game.snakes}, **kwargs
+    )
+
+
+def state(game):
+    return (
+        game.ticks,
+        sorted((s.name, tuple(s.points)) for s in game.snakes),
+        Counter(game.food),
+        sorted((s.name, score) for s, score in game.score.items()),
+    )
+
+
+class Watcher:
+    """A loopback client keeping a mirror of the game"""
+
+    def __init__(self, reader, writer):
+        self.reader, self.writer = reader, writer
+        self.mirror = GameMirror()
+        self.kinds = []
+
+    @classmethod
+    async def connect(cls, address, player=None):
+        return cls(*await connect(*address, player=player))
+
+    async def read(self, n):
+        for _ in range(n):
+            payload = await read_frame(self.reader)
+            self.kinds.append(self.mirror.apply(payload))
+
+
+class TestGameServer(unittest.TestCase):
+
+    def run_async(self, coroutine):
+        return asyncio.run(asyncio.wait_for(coroutine, 30))
+
+    def test_spectators_follow_the_game(self):
+        async def scenario():
+            server = make_server()
+            address = await server.start()
+            watchers = [await Watcher.connect(address) for _ in range(200)]
+            await asyncio.sleep(0.05)
+            for _ in range(20):
+                server.tick()
+                await asyncio.sleep(0)
+            await server.flush()
+            for watcher in watchers:
+                await watcher.read(21)
+            await server.close()
+            return server, watchers
+
+        server, watchers = self.run_async(scenario())
+        expected = state(server.game)
+        for watcher in watchers:
+            self.assertEqual(watcher.kinds, [KEYFRAME] + [DELTA] * 20)
+            self.assertEqual(state(watcher.mirror.game), expected)
+        self.assertTrue(server.game.deaths or server.game.ticks == 20)
+
+    def test_slow_client_doesnt_stall_the_game(self):
+        async def scenario():
+            server = make_server(max_pending=4)
+            address = await server.start()
+            slow = await Watcher.connect(address)
+            await asyncio.sleep(0.05)
+            # Stall the network to the slow client
+            client, = server.clients
+            stalled = asyncio.Event()
+            drain = client.writer.drain
+
+            async def stalled_drain():
+                await stalled.wait()
+                await drain()
+            client.writer.drain = stalled_drain
+
+            fast = await Watcher.connect(address)
+            await asyncio.sleep(0.05)
+            for _ in range(10):
+                server.tick()
+                await asyncio.sleep(0)
+            self.assertGreater(client.dropped, 0)
+            await fast.read(11)
+            self.assertEqual(state(fast.mirror.game), state(server.game))
+
+            # Once it's caught up it gets a keyframe and follows on
+            stalled.set()
+            await asyncio.sleep(0.05)
+            server.tick()
+            server.tick()
+            await server.flush()
+            await slow.read(2)
+            while slow.mirror.game.ticks < server.game.ticks:
+                await slow.read(1)
+            self.assertIn(KEYFRAME, slow.kinds[1:])
+            self.assertEqual(slow.kinds[-1], DELTA)
+            self.assertEqual(state(slow.mirror.game), state(server.game))
+            server.broadcast(bytes((END,)))
+            await slow.read(1)
+            self.assertTrue(slow.mirror.finished)
+            await server.close()
+
+        self.run_async(scenario())
+
+    def test_one_player_per_snake(self):
+        async def scenario():
+            server = make_server()
+            address = await server.start()
+            snake = server.snakes[2]
+            first = await Watcher.connect(address, player=2)
+            await asyncio.sleep(0.05)
+            keys = server.simulation.controllers[snake]
+            # Turned away without a frame
+            for index in [2, len(server.snakes), 300]:
+                other = await Watcher.connect(address, player=index)
+                self.assertIsNone(await read_frame(other.reader))
+                other.writer.close()
+            await asyncio.sleep(0.05)
+            self.assertIs(server.simulation.controllers[snake], keys)
+            first.writer.close()
+            await asyncio.sleep(0.05)
+            self.assertIsInstance(
+                server.simulation.controllers[snake], bots.PathFinder
+            )
+            self.assertEqual(server.players, {})
+            await server.close()
+
+        self.run_async(scenario())
+
+    def test_many_snakes(self):
+        async def scenario():
+            game = Scenario(
+                dimensions=(100, 100), snakes=300, snake_length=2, food=1
+            ).make_game(rng=1)
+            server = GameServer(game)
+            address = await server.start()
+            player = await Watcher.connect(address, player=299)
+            await player.read(1)
+            self.assertEqual(list(server.players), [server.snakes[299]])
+            player.writer.close()
+            await server.close()
+
+        self.run_async(scenario())
+
+    def test_player_steers_snake(self):
+        async def scenario():
+            server = make_server()
+            address = await server.start()
+            snake = server.snakes[2]
+            player = await Watcher.connect(address, player=2)
+            await asyncio.sleep(0.05)
+            self.assertNotIsInstance(
+                server.simulation.controllers[snake], bots.PathFinder
+            )
+            key, direction = next(
+                (key, direction) for key, direction in KEYS.items()
+                if direction not in (snake.facing, snake.blocked_direction)
+            )
+            player.writer.write(key)
+            await player.writer.drain()
+            await asyncio.sleep(0.05)
+            server.tick()
+            self.assertEqual(snake.facing, direction)
+            # The bot takes back over when the player leaves
+            player.writer.close()
+            await asyncio.sleep(0.05)
+            self.assertIsInstance(
+                server.simulation.controllers[snake], bots.PathFinder
+            )
+            await server.close()
+
+        self.run_async(scenario())
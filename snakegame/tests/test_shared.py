@@ -0,0 +1,125 @@
+import multiprocessing
+import threading
+import unittest
+from collections import Counter
+from multiprocessing import shared_memory
+
+from snakegame import bots
+from snakegame.model import Simulation
+from snakegame.model.scenario import Scenario
+from snakegame.shared import (
+    _SEQUENCE, SharedGame, SharedGameWriter, SharedSnake
+)
+
+
+def make_simulation(seed=0):
+    game = Scenario(
+        dimensions=(30, 20), snakes=6, snake_length=4, food=5
+    ).make_game(rng=seed)
+    bot = bots.PathFinder()
+    return Simulation(game, controllers={snake: bot for snake in game.snakes})
+
+
+def length(snake):
+    if isinstance(snake, SharedSnake):
+        return snake.length
+    return len(snake.points)
+
+
+def state(game):
+    """What a SharedGame and the Game it mirrors should agree on"""
+    snakes = sorted(
+        (snake.name, snake.head, snake.tail, snake.facing, length(snake))
+        for snake in game.snakes
+    )
+    return (
+        game.ticks, game.dimension_max, snakes, Counter(game.food),
+        sorted((snake.name, score) for snake, score in game.score.items()),
+    )
+
+
+def consistent(game):
+    """A snapshot, checking the board agrees with the snakes and food"""
+    snakes = game.snakes
+    lengths = sum(snake.length for snake in snakes)
+    n_food = len(game.food)
+    return game.ticks, sum(game.board) == lengths + n_food
+
+
+def watch(name, ticks, results):
+    """Read snapshots in another process until the game gets to a tick"""
+    with SharedGame(name) as game:
+        seen = []
+        while not seen or seen[-1][0] < ticks:
+            seen.append(game.read(consistent))
+    results.put(seen)
+
+
+class TestSharedGame(unittest.TestCase):
+
+    def test_mirrors_game(self):
+        simulation = make_simulation()
+        game = simulation.game
+        with SharedGameWriter(game) as writer:
+            shared = SharedGame(writer.name)
+            self.assertEqual(
+                [snake.name for snake in shared.all_snakes],
+                [snake.name for snake in game.snakes]
+            )
+            for _ in range(60):
+                simulation.step()
+                self.assertEqual(shared.read(state), state(game))
+                self.assertEqual(bytes(shared.board), bytes(game.grid.counts))
+            self.assertTrue(game.deaths)
+            game.quit()
+            self.assertEqual(shared.snakes, [])
+            shared.close()
+
+    def test_other_process_reads_consistent_states(self):
+        simulation = make_simulation(1)
+        game = simulation.game
+        context = multiprocessing.get_context('fork')
+        results = context.Queue()
+        with SharedGameWriter(game) as writer:
+            reader = context.Process(
+                target=watch, args=(writer.name, 200, results)
+            )
+            reader.start()
+            while game.ticks < 200:
+                simulation.step()
+            seen = results.get(timeout=30)
+            reader.join(10)
+        self.assertEqual(reader.exitcode, 0)
+        ticks = [tick for tick, _ in seen]
+        self.assertEqual(ticks, sorted(ticks))
+        self.assertTrue(all(ok for _, ok in seen))
+
+    def test_waits_for_writer(self):
+        game = make_simulation().game
+        with SharedGameWriter(game) as writer, \
+                SharedGame(writer.name) as shared:
+            # As if part way through a write
+            writer._header[_SEQUENCE] += 1
+            results = []
+            reader = threading.Thread(
+                target=lambda: results.append(shared.read(state))
+            )
+            reader.start()
+            reader.join(0.05)
+            self.assertTrue(reader.is_alive())
+            writer._header[_SEQUENCE] += 1
+            reader.join(5)
+            self.assertEqual(results, [state(game)])
+
+    def test_attach(self):
+        block = shared_memory.SharedMemory(create=True, size=256)
+        try:
+            with self.assertRaisesRegex(ValueError, "doesn't hold a game"):
+                SharedGame(block.name)
+        finally:
+            block.close()
+            block.unlink()
+        writer = SharedGameWriter(make_simulation().game)
+        writer.close()
+        with self.assertRaises(FileNotFoundError):
+            SharedGame(writer.name)
@@ -0,0 +1,78 @@
+import random
+import unittest
+
+from snakegame.bots import PathFinder
+from snakegame.model.util import DIRECTIONS
+from snakegame.tournament import (
+    MatchResult, Standings, SURVIVED, load_controller, run_tournament
+)
+
+
+def straight(game, snake):
+    return None
+
+
+class Counting:
+    """Goes straight, counting the ticks it's played"""
+
+    def __init__(self):
+        self.ticks = 0
+
+    def __call__(self, game, snake):
+        self.ticks += 1
+
+
+def wander(game, snake):
+    # Uses the global random module, which each match seeds
+    return random.choice(DIRECTIONS)
+
+
+class TestTournament(unittest.TestCase):
+
+    controllers = {'straight': straight, 'wander': wander,
+                   'wander2': wander}
+
+    def test_in_process(self):
+        results = list(run_tournament(self.controllers, rounds=2, workers=0))
+        self.assertEqual(len(results), 12)
+        self.assertEqual(
+            [r.index for r in results], list(range(12))
+        )
+        for result in results:
+            self.assertEqual(len(result.causes), 2)
+
+    def test_reproducible_across_workers(self):
+        in_process = list(run_tournament(self.controllers, seed=3, workers=0))
+        pooled = sorted(
+            run_tournament(self.controllers, seed=3, workers=2),
+            key=lambda result: result.index
+        )
+        self.assertEqual(in_process, pooled)
+
+    def test_fresh_controllers(self):
+        counting = Counting()
+        controllers = {'counting': counting, 'straight': straight}
+        list(run_tournament(controllers, rounds=2, workers=0))
+        self.assertEqual(counting.ticks, 0)
+
+    def test_standings(self):
+        standings = Standings()
+        standings.add(MatchResult(0, ('a', 'b'), 0, (2, 1), (10, 4),
+                                  ('boundary', 'self collision')))
+        standings.add(MatchResult(1, ('b', 'a'), 0, (1, 1), (50, 50),
+                                  (SURVIVED, SURVIVED)))
+        table = standings.table()
+        self.assertEqual([row['controller'] for row in table], ['a', 'b'])
+        self.assertEqual(table[0]['wins'], 1)
+        self.assertEqual(table[1]['draws'], 1)
+        self.assertEqual(table[1]['losses'], 1)
+        self.assertEqual(table[0]['mean_ticks'], 30)
+        self.assertEqual(table[0]['causes'], {'boundary': 1, SURVIVED: 1})
+
+    def test_load_controller(self):
+        self.assertIs(load_controller('random:choice'), random.choice)
+        self.assertIsInstance(
+            load_controller('snakegame.bots:PathFinder'), PathFinder
+        )
+        with self.assertRaises(ValueError):
+            load_controller('random')
@@ -0,0 +1,123 @@
+import json
+import os
+import tempfile
+import unittest
+
+try:
+    import numpy as np
+    from snakegame.env import SnakeEnv
+    from snakegame.trajectories import (
+        INDEX, TrajectoryReader, TrajectoryWriter, record_dtype
+    )
+except ImportError:
+    np = None
+
+BOARD_SHAPE = (2, 3, 5)
+
+
+def make_boards(n, seed=0):
+    return np.random.default_rng(seed).integers(
+        0, 2, size=(n,) + BOARD_SHAPE, dtype=np.uint8
+    )
+
+
+@unittest.skipIf(np is None, 'numpy is not installed')
+class TestTrajectories(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.directory = os.path.join(self._tmp.name, 'run')
+        # Ten records to a shard
+        self.shard_bytes = 10 * record_dtype(BOARD_SHAPE).itemsize
+
+    def write(self, boards):
+        """Write records whose reward is their position"""
+        n = len(boards)
+        with TrajectoryWriter(self.directory, BOARD_SHAPE,
+                              shard_bytes=self.shard_bytes) as writer:
+            for i in range(7):
+                writer.append(boards[i], i % 4, i, i == 6)
+            # Runs into the next shard
+            writer.extend(boards[7:], np.arange(7, n) % 4, np.arange(7, n),
+                          False)
+            self.assertEqual(len(writer), n)
+        return writer
+
+    def test_round_trip(self):
+        boards = make_boards(25)
+        writer = self.write(boards)
+        with open(os.path.join(self.directory, INDEX)) as f:
+            index = json.load(f)
+        self.assertEqual(index['board_shape'], list(BOARD_SHAPE))
+        self.assertEqual(
+            [(shard['offset'], shard['records']) for shard in index['shards']],
+            [(0, 10), (10, 10), (20, 5)]
+        )
+        # The last shard is cut down to its records
+        first, last = (os.path.join(self.directory, shard['file'])
+                       for shard in index['shards'][::2])
+        self.assertEqual(np.load(last).shape, (5,))
+        self.assertEqual(
+            os.path.getsize(first) - os.path.getsize(last),
+            5 * writer.dtype.itemsize
+        )
+
+        reader = TrajectoryReader(self.directory)
+        self.assertEqual(len(reader), 25)
+        read_boards, actions, rewards, dones = reader.records(
+            [24, 0, 9, 10, 6]
+        )
+        self.assertTrue((read_boards == boards[[24, 0, 9, 10, 6]]).all())
+        self.assertEqual(actions.tolist(), [0, 0, 1, 2, 2])
+        self.assertEqual(rewards.tolist(), [24, 0, 9, 10, 6])
+        self.assertEqual(dones.tolist(), [False, False, False, False, True])
+        with self.assertRaises(IndexError):
+            reader.records([25])
+
+    def test_sample(self):
+        boards = make_boards(25)
+        self.write(boards)
+        reader = TrajectoryReader(self.directory)
+        sampled, _, rewards, _ = reader.sample(200, rng=0)
+        self.assertEqual(sampled.shape, (200,) + BOARD_SHAPE)
+        positions = rewards.astype(int)
+        self.assertTrue((sampled == boards[positions]).all())
+        # From every shard
+        self.assertEqual(set(np.unique(positions // 10)), {0, 1, 2})
+        self.assertEqual(
+            reader.sample(20, rng=1)[2].tolist(),
+            reader.sample(20, rng=1)[2].tolist()
+        )
+
+    def test_read_while_writing(self):
+        writer = TrajectoryWriter(self.directory, BOARD_SHAPE,
+                                  shard_bytes=self.shard_bytes)
+        boards = make_boards(15)
+        writer.extend(boards, 0, 0.5, False)
+        writer.flush()
+        reader = TrajectoryReader(self.directory)
+        self.assertEqual(len(reader), 15)
+        self.assertTrue((reader.records(range(15))[0] == boards).all())
+        writer.close()
+        with self.assertRaises(FileExistsError):
+            TrajectoryWriter(self.directory, BOARD_SHAPE)
+        with self.assertRaises(ValueError):
+            TrajectoryWriter(os.path.join(self._tmp.name, 'other'),
+                             BOARD_SHAPE).extend(np.zeros((1, 2, 3)), 0, 0, 0)
+
+    def test_env_observations(self):
+        env = SnakeEnv(max_ticks=20)
+        obs = env.reset(seed=0)
+        kept = []
+        with TrajectoryWriter(self.directory, obs.shape[1:]) as writer:
+            done = False
+            while not done:
+                kept.append(obs[0].copy())
+                obs, rewards, done, _ = env.step(0)
+                writer.append(kept[-1], 0, rewards[0], done)
+        boards, _, _, dones = TrajectoryReader(self.directory).records(
+            range(len(kept))
+        )
+        self.assertTrue((boards == np.array(kept)).all())
+        self.assertEqual(dones.tolist(), [False] * (len(kept) - 1) + [True])
@@ -0,0 +1,288 @@
+"""Round-robin tournaments between snake controllers, played in parallel.
+
+A controller is any callable taking the game and the snake it steers and
+returning a direction, as used by snakegame.model.Simulation. Controllers
+are sent to worker processes, so they must be picklable: module level
+functions, or instances of module level classes. Each match gets a fresh
+copy of its controllers.
+"""
+import argparse
+import copy
+import importlib
+import json
+import os
+import random
+import sys
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import asdict, dataclass, field
+from itertools import combinations
+
+from snakegame.model import Simulation
+from snakegame.model.layouts import classic_game
+from snakegame.model.rng import GameRandom
+
+#: Reason recorded for snakes still alive when a match hits its tick limit
+SURVIVED = 'survived'
+
+
+@dataclass
+class MatchResult:
+    """The outcome of one match between two controllers"""
+    #: Position of the match in the tournament schedule
+    index: int
+    #: Names of the controllers playing snake1 and snake2
+    players: tuple
+    #: The seed the match was played with
+    seed: int
+    #: Food eaten by each player
+    scores: tuple
+    #: Ticks each player survived for
+    ticks: tuple
+    #: Why each player left the game, or SURVIVED
+    causes: tuple
+
+    @property
+    def winner(self):
+        """The name of the winning controller, or None for a draw.
+
+        The last snake standing wins, otherwise the higher score does.
+        """
+        (a, b), (score_a, score_b) = self.players, self.scores
+        ticks_a, ticks_b = self.ticks
+        if ticks_a != ticks_b:
+            return a if ticks_a > ticks_b else b
+        if score_a != score_b:
+            return a if score_a > score_b else b
+        return None
+
+
+@dataclass
+class Standings:
+    """Running totals for each controller over a tournament"""
+    played: Counter = field(default_factory=Counter)
+    wins: Counter = field(default_factory=Counter)
+    draws: Counter = field(default_factory=Counter)
+    score: Counter = field(default_factory=Counter)
+    ticks: Counter = field(default_factory=Counter)
+    #: Counts of (controller, cause) pairs
+    causes: Counter = field(default_factory=Counter)
+
+    def add(self, result):
+        """Include a match result in the totals"""
+        winner = result.winner
+        for name, score, ticks, cause in zip(
+            result.players, result.scores, result.ticks, result.causes
+        ):
+            self.played[name] += 1
+            self.score[name] += score
+            self.ticks[name] += ticks
+            self.causes[name, cause] += 1
+            if winner is None:
+                self.draws[name] += 1
+        if winner is not None:
+            self.wins[winner] += 1
+
+    def table(self):
+        """Rows of standings, best first, as dictionaries"""
+        rows = []
+        for name in self.played:
+            played = self.played[name]
+            rows.append({
+                'controller': name,
+                'played': played,
+                'wins': self.wins[name],
+                'draws': self.draws[name],
+                'losses': played - self.wins[name] - self.draws[name],
+                'mean_score': self.score[name] / played,
+                'mean_ticks': self.ticks[name] / played,
+                'causes': {
+                    cause: count for (n, cause), count
+                    in sorted(self.causes.items()) if n == name
+                },
+            })
+        rows.sort(key=lambda row: (-row['wins'], -row['draws'],
+                                   row['controller']))
+        return rows
+
+
+def match_seed(seed, index):
+    """The seed for one match, which depends only on the tournament seed and
+    the match's position in the schedule, not on which worker plays it"""
+    return GameRandom(seed).child(index).getrandbits(32)
+
+
+def schedule(controllers, rounds=1, seed=0, max_ticks=1000):
+    """List the matches of a round-robin tournament. Every pair of
+    controllers plays `rounds` times from each starting position.
+
+    Parameters
+    ----------
+    controllers: dict(str, callable)
+        The controllers, keyed by a name for the standings
+
+    Returns
+    -------
+    list(tuple)
+        Arguments for play_match
+    """
+    matches = []
+    for _ in range(rounds):
+        for pair in combinations(sorted(controllers), 2):
+            for players in (pair, pair[::-1]):
+                index = len(matches)
+                matches.append((
+                    index,
+                    tuple((name, controllers[name]) for name in players),
+                    match_seed(seed, index),
+                    max_ticks,
+                ))
+    return matches
+
+
+def play_match(index, players, seed, max_ticks):
+    """Play one match of the classic two player game
+
+    Parameters
+    ----------
+    index: int
+        Position of the match in the tournament schedule
+    players: tuple((str, callable), (str, callable))
+        Names and controllers for snake1 and snake2
+    seed: int
+        Seeds food placement and the global random module, which controllers
+        may use
+    max_ticks: int
+        The match is stopped after this many ticks
+    """
+    random.seed(seed)
+    game = classic_game(n_players=2, rng=GameRandom(seed))
+    snakes = list(game.snakes)
+    sim = Simulation(game, controllers={
+        snake: controller for snake, (_, controller) in zip(snakes, players)
+    })
+    sim.run(ticks=max_ticks)
+    ticks, causes = [], []
+    for snake in snakes:
+        tick, cause = game.deaths.get(snake, (game.ticks, SURVIVED))
+        ticks.append(tick)
+        causes.append(cause)
+    return MatchResult(
+        index=index,
+        players=tuple(name for name, _ in players),
+        seed=seed,
+        scores=tuple(game.score[snake] for snake in snakes),
+        ticks=tuple(ticks),
+        causes=tuple(causes),
+    )
+
+
+def _play(match):
+    return play_match(*match)
+
+
+def run_tournament(controllers, rounds=1, seed=0, max_ticks=1000,
+                   workers=None):
+    """Play a round-robin tournament, yielding results as matches finish.
+
+    Results arrive in completion order, but each depends only on the seed and
+    its place in the schedule, so the set of results (and any totals) is the
+    same for any number of workers.
+
+    Parameters
+    ----------
+    controllers: dict(str, callable)
+        The controllers, keyed by a name for the standings
+    rounds: int
+        Number of times each pair plays from each starting position
+    seed: int
+        Seed for the whole tournament
+    max_ticks: int
+        Matches are stopped after this many ticks
+    workers: int, optional
+        Number of worker processes, by default one per CPU. With 0 matches
+        are played in this process.
+
+    Yields
+    ------
+    MatchResult
+    """
+    matches = schedule(controllers, rounds, seed, max_ticks)
+    if workers == 0:
+        for match in matches:
+            # Copied, as a worker process would get a copy, so controllers
+            # which keep state behave the same for any number of workers
+            yield _play(copy.deepcopy(match))
+        return
+
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # Keep a bounded number of matches in flight, so huge tournaments
+        # don't queue every match up front
+        in_flight = 4 * workers
+        pending = set()
+        matches = iter(matches)
+        while True:
+            for match in matches:
+                pending.add(executor.submit(_play, match))
+                if len(pending) >= in_flight:
+                    break
+            if not pending:
+                break
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+
+
+def load_controller(spec):
+    """Import a controller given as 'package.module:name'. If it names a
+    class, such as one of the bots in snakegame.bots, an instance is made
+    with the default arguments."""
+    module_name, _, attr = spec.partition(':')
+    if not attr:
+        raise ValueError(f"Controller {spec!r} should be 'module:name'")
+    controller = getattr(importlib.import_module(module_name), attr)
+    if isinstance(controller, type):
+        controller = controller()
+    return controller
+
+
+def cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        'controllers', nargs='+',
+        help='Controllers to enter, as package.module:name'
+    )
+    parser.add_argument('--rounds', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--max-ticks', type=int, default=1000)
+    parser.add_argument(
+        '--workers', type=int, default=None,
+        help='Worker processes, defaults to one per CPU, 0 for none'
+    )
+    parser.add_argument(
+        '--results', type=str, default=None,
+        help='Stream each match result to this file as JSON lines'
+    )
+    args = parser.parse_args()
+
+    controllers = {spec: load_controller(spec) for spec in args.controllers}
+    standings = Standings()
+    out = open(args.results, 'w') if args.results else None
+    try:
+        for result in run_tournament(
+            controllers, args.rounds, args.seed, args.max_ticks, args.workers
+        ):
+            standings.add(result)
+            if out is not None:
+                out.write(json.dumps(asdict(result)) + '\n')
+                out.flush()
+    finally:
+        if out is not None:
+            out.close()
+    json.dump(standings.table(), sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,307 @@
+"""Streaming trajectories to disk for offline learning.
+
+A TrajectoryWriter appends (board, action, reward, done) records to .npy
+shards in a directory. Each shard is preallocated and memory-mapped, so
+records go straight to the file rather than piling up in Python lists, and
+a new shard is started once one is full. Boards, such as the observations
+from snakegame.env, are bit-packed to one bit per cell.
+
+The directory's index file, index.json, gives the board shape and lists
+each shard's file, the offset of its first record among all of them and its
+number of records. A TrajectoryReader memory-maps the shards and samples
+minibatches from across them, reading only the records sampled.
+
+Requires numpy, which can be installed with `pip install .[numpy]`.
+"""
+import io
+import json
+import os
+
+import numpy as np
+
+#: Name of the index file in a trajectory directory
+INDEX = 'index.json'
+#: Default size of a shard, in bytes
+SHARD_BYTES = 64 * 2 ** 20
+
+
+def record_dtype(board_shape):
+    """The numpy dtype of records with boards of some shape
+
+    Parameters
+    ----------
+    board_shape: tuple(int)
+        Shape of each board, whose cells are 0 or 1
+
+    Returns
+    -------
+    numpy.dtype
+        With fields 'board', the packed board, 'action', 'reward' and 'done'
+    """
+    n_bytes = -(-int(np.prod(board_shape)) // 8)
+    return np.dtype([
+        ('board', np.uint8, (n_bytes,)),
+        ('action', np.int8),
+        ('reward', np.float32),
+        ('done', np.bool_),
+    ])
+
+
+def _shrink(path, records):
+    """Cut a shard's file down to its first records, so a run's last shard
+    doesn't take up a whole shard's space. Left as it is if the header would
+    change size, or is in a later version of the format."""
+    with open(path, 'r+b') as f:
+        if np.lib.format.read_magic(f) != (1, 0):
+            return
+        shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+        data_offset = f.tell()
+        header = io.BytesIO()
+        np.lib.format.write_array_header_1_0(header, {
+            'shape': (records,), 'fortran_order': fortran_order,
+            'descr': np.lib.format.dtype_to_descr(dtype),
+        })
+        if len(header.getvalue()) != data_offset:
+            return
+        f.seek(0)
+        f.write(header.getvalue())
+        f.truncate(data_offset + records * dtype.itemsize)
+
+
+class TrajectoryWriter:
+    """Streams records to memory-mapped shards in a directory"""
+
+    def __init__(self, directory, board_shape, shard_bytes=SHARD_BYTES):
+        """
+        Parameters
+        ----------
+        directory: str
+            Where to write the shards and index, created if need be
+        board_shape: tuple(int)
+            Shape of each board, whose cells are 0 or 1
+        shard_bytes: int
+            Size to make each shard
+
+        Raises
+        ------
+        FileExistsError
+            If the directory already holds trajectories
+        """
+        os.makedirs(directory, exist_ok=True)
+        if os.path.exists(os.path.join(directory, INDEX)):
+            raise FileExistsError(
+                f'{directory} already holds trajectories'
+            )
+        self.directory = directory
+        self.board_shape = tuple(board_shape)
+        self.dtype = record_dtype(self.board_shape)
+        #: Number of records each shard holds
+        self.shard_records = max(shard_bytes // self.dtype.itemsize, 1)
+        #: The file name, offset and number of records of each shard
+        self.shards = []
+        self._shard = None
+        self._used = 0
+
+    def __len__(self):
+        if not self.shards:
+            return 0
+        return self.shards[-1]['offset'] + self._used
+
+    def _roll(self):
+        """Finish the current shard, if any, and start another"""
+        offset = len(self)
+        self._close_shard()
+        name = f'shard-{len(self.shards):05d}.npy'
+        self._shard = np.lib.format.open_memmap(
+            os.path.join(self.directory, name), mode='w+', dtype=self.dtype,
+            shape=(self.shard_records,)
+        )
+        # Plain arrays over the same memory, which index faster than memmaps
+        records = np.asarray(self._shard)
+        self._boards = records['board']
+        self._actions = records['action']
+        self._rewards = records['reward']
+        self._dones = records['done']
+        self._used = 0
+        self.shards.append({'file': name, 'offset': offset, 'records': 0})
+        self._write_index()
+
+    def _close_shard(self):
+        if self._shard is None:
+            return
+        self.flush()
+        self._shard = self._boards = self._actions = None
+        self._rewards = self._dones = None
+
+    def append(self, board, action, reward, done):
+        """Write a record
+
+        Parameters
+        ----------
+        board: numpy.ndarray
+            Of the writer's board shape
+        action: int
+            e.g. a direction code, as taken by snakegame.env
+        reward: float
+        done: bool
+        """
+        if self._shard is None or self._used == self.shard_records:
+            self._roll()
+        i = self._used
+        self._boards[i] = np.packbits(board, axis=None)
+        self._actions[i] = action
+        self._rewards[i] = reward
+        self._dones[i] = done
+        self._used = i + 1
+
+    def extend(self, boards, actions, rewards, dones):
+        """Write many records at once, e.g. one for each game and snake of a
+        VectorSnakeEnv step
+
+        Parameters
+        ----------
+        boards: numpy.ndarray
+            Of shape (n_records,) + the writer's board shape
+        actions, rewards, dones: array_like
+            Of shape (n_records,), or scalars shared by every record
+
+        Raises
+        ------
+        ValueError
+            If the boards are the wrong shape
+        """
+        boards = np.asarray(boards)
+        if boards.shape[1:] != self.board_shape:
+            raise ValueError(
+                f'Boards of shape {boards.shape[1:]} given to a writer of '
+                f'boards of shape {self.board_shape}'
+            )
+        n = len(boards)
+        packed = np.packbits(boards.reshape(n, -1), axis=1)
+        actions, rewards, dones = (
+            np.broadcast_to(values, (n,))
+            for values in (actions, rewards, dones)
+        )
+        start = 0
+        while start < n:
+            if self._shard is None or self._used == self.shard_records:
+                self._roll()
+            stop = min(n, start + self.shard_records - self._used)
+            records = slice(self._used, self._used + stop - start)
+            self._boards[records] = packed[start:stop]
+            self._actions[records] = actions[start:stop]
+            self._rewards[records] = rewards[start:stop]
+            self._dones[records] = dones[start:stop]
+            self._used += stop - start
+            start = stop
+
+    def flush(self):
+        """Write the current shard to disk and bring the index up to date,
+        so a reader sees every record so far"""
+        if self._shard is None:
+            return
+        self._shard.flush()
+        self.shards[-1]['records'] = self._used
+        self._write_index()
+
+    def _write_index(self):
+        path = os.path.join(self.directory, INDEX)
+        with open(path + '.tmp', 'w') as f:
+            json.dump({
+                'board_shape': self.board_shape, 'shards': self.shards
+            }, f, indent=2)
+        os.replace(path + '.tmp', path)
+
+    def close(self):
+        """Finish writing, cutting the last shard down to the records in it"""
+        self._close_shard()
+        if self.shards:
+            last = self.shards[-1]
+            _shrink(os.path.join(self.directory, last['file']),
+                    last['records'])
+        else:
+            self._write_index()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class TrajectoryReader:
+    """Random access to the records in a directory written by a
+    TrajectoryWriter, through memory maps of its shards"""
+
+    def __init__(self, directory):
+        """
+        Parameters
+        ----------
+        directory: str
+            Holding the shards and their index
+        """
+        with open(os.path.join(directory, INDEX)) as f:
+            index = json.load(f)
+        self.board_shape = tuple(index['board_shape'])
+        self.dtype = record_dtype(self.board_shape)
+        self._shards = [
+            np.load(os.path.join(directory, shard['file']),
+                    mmap_mode='r')[:shard['records']]
+            for shard in index['shards']
+        ]
+        #: Offset of each shard's first record, then the number of records
+        self.offsets = np.cumsum([0] + [len(s) for s in self._shards])
+
+    def __len__(self):
+        return int(self.offsets[-1])
+
+    def records(self, indices):
+        """Read some records
+
+        Parameters
+        ----------
+        indices: array_like
+            Positions of the records among all of them. Reading is quickest
+            with them sorted.
+
+        Returns
+        -------
+        boards: numpy.ndarray
+            Unpacked, of shape (len(indices),) + board_shape
+        actions, rewards, dones: numpy.ndarray
+            Of shape (len(indices),)
+        """
+        indices = np.asarray(indices, dtype=np.int64)
+        if len(indices) and (indices.min() < 0
+                             or indices.max() >= len(self)):
+            raise IndexError(
+                f'Record indices out of range for {len(self)} records'
+            )
+        shards = np.searchsorted(self.offsets, indices, side='right') - 1
+        out = np.empty(len(indices), dtype=self.dtype)
+        for shard in np.unique(shards):
+            chosen = shards == shard
+            out[chosen] = self._shards[shard][
+                indices[chosen] - self.offsets[shard]
+            ]
+        boards = np.unpackbits(
+            out['board'], axis=1, count=int(np.prod(self.board_shape))
+        ).reshape((len(indices),) + self.board_shape)
+        return boards, out['action'], out['reward'], out['done']
+
+    def sample(self, batch_size, rng=None):
+        """Read a minibatch of records chosen at random, with replacement,
+        from across every shard
+
+        Parameters
+        ----------
+        batch_size: int
+        rng: numpy.random.Generator or int, optional
+            Random number generator, or a seed for one
+
+        Returns
+        -------
+        As records
+        """
+        rng = np.random.default_rng(rng)
+        return self.records(np.sort(rng.integers(len(self), size=batch_size)))
@@ -1,155 +1,361 @@
-import asyncio
 import curses
+import time
 
+from snakegame.model.game import (
+    FOOD_EATEN, FOOD_SPAWNED, HEAD_ADVANCED, QUIT, RESET, TAIL_RETRACTED,
+    TAIL_STOLEN
+)
 from snakegame.model.util import Point
+from snakegame.scheduler import FixedStepScheduler
+from snakegame.view.viewport import Viewport
 
 char_map = {
     'snake_body': '@', 'snake_tail': 'o', 'snake_head': 'O', 'food': 'X',
     'horiz_border': '=', 'vert_border': '|'
 }
+# Events whose value is a square that changed
+_SQUARE_EVENTS = (TAIL_RETRACTED, TAIL_STOLEN, FOOD_EATEN, FOOD_SPAWNED)
+#: Games with more snakes than this show a summary instead of every score
+MAX_SCORE_LINES = 4
 
 
 class GameView:
     """A class which draws the current game state to screen"""
 
-    def __init__(self, game):
+    def __init__(self, game, tick_rate=1, timer=None, render_rate=None,
+                 n_colours=None, follow=None):
         """Get a reference to the game itself and set colours
 
         Parameters
         ----------
         game: Game
             The game state
+        tick_rate: float
+            Number of game updates per second
+        timer: profiling.FrameTimer, optional
+            Records how long each tick takes, shown below the scores
+        render_rate: float, optional
+            Number of frames drawn per second. By default a frame is drawn
+            after each tick, and with 0 nothing is drawn.
+        n_colours: int, optional
+            Number of curses colour pairs the snakes' colours cycle through,
+            by default one for each snake
+        follow: Snake, optional
+            The snake to keep in view, when the game area is bigger than
+            the terminal
         """
+        self.n_colours = n_colours or max(len(game.snakes), 1)
         self.snake_colour = {}
-        for i, snake in enumerate(game.snakes, start=1):
-            self.snake_colour[snake] = i
+        for i, snake in enumerate(game.snakes):
+            self.snake_colour[snake] = i % self.n_colours + 1
         self.game = game
+        self.tick_rate = tick_rate
+        self.render_rate = render_rate
         self.paused = False
+        self.timer = timer
 
-    async def update_and_draw(self, win):
-        """Update the game model and draw the current state at a frequency
-        determined by the tick rate.
+        #: The part of the game area shown, fitted to the terminal
+        self.viewport = Viewport(game.dimension_max, target=follow)
+        #: The curses pad the viewport is drawn on
+        self.pad = None
+        # The terminal size and number of lines below the game that the
+        # viewport was last fitted to
+        self._layout = None
+        # The occupancy grid drawn in the last full frame, or None when
+        # everything needs drawing again
+        self._grid = None
+        # Squares to redraw, and snakes whose ends to redraw, gathered from
+        # the game's changes since the last frame
+        self._changed = set()
+        self._moved = set()
+        # The lines showing the scores, or None if they've changed, and all
+        # the lines last displayed
+        self._scores = None
+        self._info = None
+        game.subscribe(self.game_changed)
+        #: Number of squares and bytes of text written in the last frame
+        self.frame_cells = 0
+        self.frame_bytes = 0
+
+    async def update_and_draw(self, win, step=None):
+        """Update the game model at the tick rate, and draw the current state
+        at the render rate.
 
         Parameters
         ----------
         win: curses.Window
             The main window
+        step: callable, optional
+            Advances the game by one tick, returning True when it's over. By
+            default the game's own update method.
         """
-        while True:
-            if self.paused is False:
-                self.game.update()
-                win = self.draw_game(win)
-                # End the game when we run out of snakes
-                if not self.game.snakes:
-                    break
-            await asyncio.sleep(1.0 / self.game.tick_rate)
+        step = step or self.game.update
+        timer = self.timer
+
+        def update():
+            if timer is None:
+                finished = step()
+            else:
+                start = time.perf_counter()
+                finished = step()
+                timer.add('update', time.perf_counter() - start)
+                timer.tick(start)
+            # End the game when we run out of snakes
+            return finished or not self.game.snakes
+
+        def render():
+            if timer is None:
+                self.draw_game(win)
+            else:
+                start = time.perf_counter()
+                self.draw_game(win)
+                timer.add('render', time.perf_counter() - start)
+
+        scheduler = FixedStepScheduler(self.tick_rate, self.render_rate)
+        await scheduler.run(update, render, paused=lambda: self.paused)
+
+    def game_changed(self, game, events):
+        """Note which squares and scores to redraw, as the game's
+        subscriber"""
+        changed, moved = self._changed, self._moved
+        for kind, snake, value in events:
+            if kind == HEAD_ADVANCED:
+                # The old head is drawn as body now
+                changed.add(value)
+                changed.add(value - snake.facing)
+            elif kind in _SQUARE_EVENTS:
+                changed.add(value)
+            elif kind == RESET or kind == QUIT:
+                self._grid = None
+                continue
+            else:
+                self._scores = None
+            if snake is not None:
+                moved.add(snake)
 
     def toggle_pause_state(self):
         self.paused = not self.paused
 
+    def pan(self, direction):
+        """Move the view over the game area, when it's bigger than the
+        terminal, and stop following a snake"""
+        self.viewport.pan(direction)
+
+    def follow(self, snake=None):
+        """Follow a snake, by default the one last followed"""
+        self.viewport.follow(snake)
+
     def draw_game(self, window):
         """Draw the current game state.
 
+        The part of the game area in the viewport is drawn on a pad, with
+        the scores below it. The first frame, and any after the viewport
+        moves, are drawn in full, after which only the squares that changed
+        since the previous frame are redrawn. Either way only squares in
+        view are touched, so a frame costs no more than the size of the
+        terminal however big the game is. Everything is flushed to the
+        terminal with a single update.
+
         Parameters
         ----------
         window: curses.Window
             The main window
         """
-        window.clear()
-        window = self.draw_game_border(window)
-        window = self.draw_items(window)
-        window = self.display_info(window)
+        self.frame_cells = self.frame_bytes = 0
+        if self._grid is not self.game.grid:
+            # First frame, or the game's contents were replaced wholesale
+            self._grid = None
+            self._scores = None
+        lines = self.info_lines()
+        viewport = self.viewport
+        layout = window.getmaxyx(), len(lines)
+        resized = False
+        if layout != self._layout:
+            (rows, columns), n_lines = self._layout = layout
+            # Leave room for a blank line and the scores below the game
+            resized = viewport.resize((columns, rows - n_lines - 1))
+        moved = viewport.update()
+        if self.pad is None or resized:
+            width, height = viewport.size
+            # With a spare column, as curses can't write the last square
+            self.pad = curses.newpad(height, width + 1)
+            window.erase()
+            self._info = None
+            self._grid = None
+        pad = self.pad
+        if self._grid is None or moved:
+            pad.erase()
+            pad = self.draw_game_border(pad)
+            pad = self.draw_items(pad)
+            self._grid = self.game.grid
+        else:
+            pad = self.draw_changes(pad)
+        self._changed.clear()
+        self._moved.clear()
+        window = self.display_info(window, lines)
+        window.noutrefresh()
+        width, height = viewport.size
+        pad.noutrefresh(0, 0, 0, 0, height - 1, width - 1)
+        curses.doupdate()
         return window
 
+    def _put(self, window, pos, text, attr=0):
+        """Write to the pad, starting on a square in view, counting what
+        was written"""
+        origin = self.viewport.origin
+        window.addstr(pos[1] - origin[1], pos[0] - origin[0], text, attr)
+        self.frame_cells += len(text)
+        self.frame_bytes += len(text.encode())
+
+    def _tail_attr(self, snake):
+        return curses.color_pair(
+            self.snake_colour[snake] % self.n_colours + 1
+        )
+
     def draw_game_border(self, window):
-        """Draw the border of the game area
+        """Draw the part of the border of the game area in view
 
         Parameters
         ----------
         window: curses.Window
-            The main window
+            The pad
         """
-        chars = {
-            pos: char_map['vert_border']
-            for pos in [
-                Point(0, i) for i in range(1, self.game.dimension_max[0])
-            ]
-        }
-        chars.update({
-            pos: char_map['vert_border']
-            for pos in [
-                Point(self.game.dimension_max[1], i)
-                for i in range(1, self.game.dimension_max[0])
-            ]
-        })
-        chars.update({
-            pos: char_map['horiz_border']
-            for pos in [
-                Point(i, 0) for i in range(1, self.game.dimension_max[1])
-            ]
-        })
-        chars.update({
-            pos: char_map['horiz_border']
-            for pos in [
-                Point(i, self.game.dimension_max[0])
-                for i in range(1, self.game.dimension_max[1])
-            ]
-        })
-
-        for pos, char in chars.items():
-            window.addch(pos.y, pos.x, char)
-        window.refresh()
-
+        x_max, y_max = self.game.dimension_max
+        (x0, y0), (width, height) = self.viewport.origin, self.viewport.size
+        x_start, x_end = max(x0, 1), min(x0 + width, x_max)
+        y_start, y_end = max(y0, 1), min(y0 + height, y_max)
+        for x in (0, x_max):
+            if x0 <= x < x0 + width:
+                for y in range(y_start, y_end):
+                    self._put(window, (x, y), char_map['vert_border'])
+        for y in (0, y_max):
+            if y0 <= y < y0 + height and x_start < x_end:
+                self._put(
+                    window, (x_start, y),
+                    char_map['horiz_border'] * (x_end - x_start)
+                )
         return window
 
     def draw_items(self, window):
-        """Draw the snakes and other items
+        """Draw the snakes and other items in view, finding them with the
+        game's occupancy grid rather than going through every snake
 
         Parameters
         ----------
         window: curses.Window
-            The main window
+            The pad
         """
-        for snake in self.game.snakes:
-            chars = {}
-            chars.update({pos: char_map['snake_body'] for pos in snake.body})
-            chars.update({snake.head: char_map['snake_head']})
-            for point, char in chars.items():
-                window.addstr(
-                    point.y, point.x, char,
-                    curses.color_pair(self.snake_colour[snake])
-                )
-            window.addstr(
-                snake.tail.y, snake.tail.x, char_map['snake_tail'],
-                curses.color_pair(
-                    self.snake_colour[snake] % len(self.snake_colour) + 1
-                )
-            )
+        grid = self.game.grid
+        (x0, y0), (width, height) = self.viewport.origin, self.viewport.size
+        for y in range(y0, y0 + height):
+            start = y * grid.width + x0
+            row = grid.counts[start:start + width]
+            if not any(row):
+                continue
+            for i, count in enumerate(row):
+                if count:
+                    pos = Point(x0 + i, y)
+                    self._put(window, pos, *self.square(pos))
+        return window
 
-        for food in self.game.food:
-            chars = {}
-            chars.update({food: char_map['food']})
-            for point, char in chars.items():
-                window.addstr(point.y, point.x, char)
-        window.refresh()
+    def draw_changes(self, window):
+        """Redraw only the squares in view which changed since the last
+        frame: those the game's events say items arrived on or left, and
+        the heads and tails of the snakes that moved, whose characters
+        change with them
+
+        Parameters
+        ----------
+        window: curses.Window
+            The pad
+        """
+        changed = self._changed
+        width, height = self.viewport.size
+        for snake in self._moved:
+            if snake.grid is not None:
+                changed.add(snake.head)
+                changed.add(snake.tail)
+            elif len(snake.points) > width * height:
+                # Removed, uncovering more squares than are in view
+                window.erase()
+                self.draw_game_border(window)
+                return self.draw_items(window)
+            else:
+                changed.update(snake.points)
+        contains = self.viewport.contains
+        for pos in changed:
+            if contains(pos):
+                self._put(window, pos, *self.square(pos))
         return window
 
-    def display_info(self, window):
-        """Display scores below the game area
+    def square(self, pos):
+        """The character and attributes to draw on a square, with later
+        snakes drawn over earlier ones
+
+        Parameters
+        ----------
+        pos: Point
+            A square of the game area, or its border
+        """
+        if self.game.has_food(pos):
+            return char_map['food'], 0
+        grid = self.game.grid
+        owners = grid.owners.get(grid.index(pos))
+        if owners:
+            # Later snakes are drawn over earlier ones
+            snake = (
+                next(iter(owners)) if len(owners) == 1
+                else max(owners, key=self.game.snakes.index)
+            )
+            if pos == snake.tail:
+                return char_map['snake_tail'], self._tail_attr(snake)
+            attr = curses.color_pair(self.snake_colour[snake])
+            if pos == snake.head:
+                return char_map['snake_head'], attr
+            return char_map['snake_body'], attr
+        x_max, y_max = self.game.dimension_max
+        if pos.x in (0, x_max) and 0 < pos.y < y_max:
+            return char_map['vert_border'], 0
+        if pos.y in (0, y_max) and 0 < pos.x < x_max:
+            return char_map['horiz_border'], 0
+        return ' ', 0
+
+    def info_lines(self):
+        """The lines to show below the game area: the scores, the controls
+        and recent frame timings if a timer is set"""
+        if self._scores is None:
+            scores = self.game.score.values()
+            if len(scores) <= MAX_SCORE_LINES:
+                self._scores = [
+                    f"Snake {i}: {score}" for i, score in enumerate(scores)
+                ]
+            else:
+                self._scores = [
+                    f"Snakes left: {len(self.game.snakes)} of "
+                    f"{len(scores)}, best score: {max(scores)}"
+                ]
+        lines = self._scores + ['quit: q, pause: space']
+        if self.timer is not None:
+            # Pad so that shorter lines cover longer ones from last frame
+            lines.extend(line.ljust(40) for line in self.timer.overlay())
+        return lines
+
+    def display_info(self, window, lines):
+        """Display lines below the game area, when they've changed
 
         Parameters
         ----------
         window: curses.Window
             The main window
+        lines: list(str)
+            As returned by info_lines
         """
-        for i, score in enumerate(self.game.score.values()):
-            score_str = f"Snake {i}: {score}"
-            window.addstr(self.game.dimension_max[1] + 2 + i, 1, score_str)
-        window.addstr(
-            self.game.dimension_max[1] + 3 + i, 1,
-            'quit: q, pause: space'
-        )
-
-        window.refresh()
+        if lines != self._info:
+            top = self.viewport.size[1] + 1
+            width = window.getmaxyx()[1] - 2
+            for i, line in enumerate(lines):
+                window.addstr(top + i, 1, line[:width])
+                self.frame_bytes += len(line[:width].encode())
+            self._info = lines
 
         return window
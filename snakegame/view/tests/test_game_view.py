@@ -0,0 +1,149 @@
+import curses
+import random
+import unittest
+from unittest import mock
+
+from snakegame.model import Game, Snake
+from snakegame.model.util import DIRECTIONS, Point
+from snakegame.view.game_view import GameView
+from snakegame.view.viewport import Viewport
+
+
+class FakeWindow:
+    """Stands in for a curses window or pad, remembering what is on each
+    square, and failing like curses when writing past its edges"""
+
+    def __init__(self, rows=100, columns=100):
+        self.rows, self.columns = rows, columns
+        self.screen = {}
+
+    def getmaxyx(self):
+        return self.rows, self.columns
+
+    def addstr(self, y, x, text, attr=0):
+        if not (0 <= y < self.rows and 0 <= x
+                and x + len(text) <= self.columns):
+            raise curses.error('addstr() returned ERR')
+        for i, char in enumerate(text):
+            self.screen[y, x + i] = (char, attr)
+
+    def erase(self):
+        self.screen.clear()
+
+    def noutrefresh(self, *args):
+        pass
+
+
+def make_game(seed):
+    game = Game(dimensions=(12, 12), rng=random.Random(seed))
+    game.add_snake(Snake('a', [[2, 2], [2, 3], [2, 4]]))
+    game.add_snake(Snake('b', [[9, 9], [9, 8], [9, 7]]))
+    game.add_food(Point(5, 5))
+    return game
+
+
+def visible(window):
+    """The screen without blank squares, which erase leaves out"""
+    return {k: v for k, v in window.screen.items() if v[0] != ' '}
+
+
+def draw_fresh(game, view, window):
+    """Draw a game in full with a new view, looking where another does"""
+    fresh = GameView(game)
+    fresh.snake_colour = view.snake_colour
+    fresh.viewport.resize(view.viewport.size)
+    fresh.viewport.origin = view.viewport.origin
+    fresh.draw_game(window)
+    return fresh.pad
+
+
+@mock.patch('curses.newpad', FakeWindow)
+@mock.patch('curses.doupdate', lambda: None)
+@mock.patch('curses.color_pair', lambda n: n << 8)
+class TestGameView(unittest.TestCase):
+
+    def test_incremental_matches_full_redraw(self):
+        for seed in range(5):
+            rng = random.Random(seed)
+            game = make_game(seed)
+            view = GameView(game)
+            window = FakeWindow()
+            view.draw_game(window)
+            while game.snakes:
+                for snake in game.snakes:
+                    if rng.random() < 0.3:
+                        snake.facing = rng.choice(DIRECTIONS)
+                game.update()
+                view.draw_game(window)
+                full = draw_fresh(game, view, FakeWindow())
+                self.assertEqual(visible(view.pad), visible(full))
+
+    def test_frames_write_few_squares(self):
+        game = make_game(0)
+        view = GameView(game)
+        window = FakeWindow()
+        view.draw_game(window)
+        full_cells = view.frame_cells
+        game.update()
+        view.draw_game(window)
+        # Each snake moves its head and tail, so only a handful of squares
+        # are redrawn, and the unchanged scores aren't written again
+        self.assertLess(view.frame_cells, 10)
+        self.assertLess(view.frame_cells, full_cells / 4)
+        self.assertEqual(view.frame_bytes, view.frame_cells)
+
+    def test_new_grid_redraws_everything(self):
+        game = make_game(0)
+        view = GameView(game)
+        window = FakeWindow()
+        view.draw_game(window)
+        game.quit()
+        view.draw_game(window)
+        self.assertNotIn('O', {char for char, _ in view.pad.screen.values()})
+
+    def test_scrolls_to_follow(self):
+        game = Game(dimensions=(1000, 1000), rng=random.Random(0))
+        snake = Snake('a', [[500, y] for y in range(500, 497, -1)])
+        game.add_snake(snake)
+        view = GameView(game, follow=snake)
+        window = FakeWindow(20, 40)
+        view.draw_game(window)
+        self.assertTrue(view.viewport.contains(snake.head))
+        for _ in range(50):
+            game.update()
+            view.draw_game(window)
+            self.assertTrue(view.viewport.contains(snake.head))
+            # A frame never writes more than fits in the terminal
+            self.assertLessEqual(view.frame_cells, 20 * 40)
+            self.assertEqual(visible(view.pad), visible(
+                draw_fresh(game, view, FakeWindow(20, 40))
+            ))
+        self.assertLess(view.viewport.origin.y, 500 - 40)
+
+    def test_pan(self):
+        game = make_game(0)
+        view = GameView(game, follow=game.snakes[0])
+        window = FakeWindow(10, 8)
+        view.draw_game(window)
+        origin = view.viewport.origin
+        view.pan(DIRECTIONS[1])
+        view.draw_game(window)
+        self.assertEqual(view.viewport.origin, origin + Point(2, 0))
+        self.assertFalse(view.viewport.following)
+        view.follow()
+        view.draw_game(window)
+        self.assertTrue(view.viewport.contains(game.snakes[0].head))
+
+
+class TestViewport(unittest.TestCase):
+
+    def test_clamped_to_board(self):
+        viewport = Viewport((100, 50), size=(200, 20))
+        self.assertEqual(viewport.size, (101, 20))
+        viewport.pan(DIRECTIONS[0])
+        self.assertEqual(viewport.origin, Point(0, 0))
+        for _ in range(10):
+            viewport.pan(DIRECTIONS[2])
+        self.assertEqual(viewport.origin, Point(0, 31))
+        self.assertTrue(viewport.contains(Point(100, 50)))
+        self.assertFalse(viewport.contains(Point(0, 30)))
@@ -0,0 +1,120 @@
+from snakegame.model.util import Point
+
+
+class Viewport:
+    """The rectangle of the game area shown on screen, for boards bigger
+    than the terminal.
+
+    The viewport can follow a snake, only scrolling once its head gets near
+    an edge so that most frames don't move the view, or be panned around by
+    hand.
+    """
+
+    def __init__(self, dimensions, size=None, target=None):
+        """
+        Parameters
+        ----------
+        dimensions: tuple(int, int)
+            The maximum x and y coordinates of the game area, whose border
+            lies on them
+        size: tuple(int, int), optional
+            Number of columns and rows of squares shown, by default enough
+            for the whole game area
+        target: Snake, optional
+            A snake to keep in view
+        """
+        #: Number of columns and rows of squares in the game area, border
+        #: included
+        self.board = (dimensions[0] + 1, dimensions[1] + 1)
+        self.size = self.board
+        #: The top left square shown
+        self.origin = Point(0, 0)
+        #: The snake to follow
+        self.target = target
+        #: Whether the view is following the target, rather than panned
+        self.following = target is not None
+        if size is not None:
+            self.resize(size)
+
+    def resize(self, size):
+        """Show a different number of columns and rows, no more than the
+        board has and at least one of each
+
+        Returns
+        -------
+        bool
+            Whether the size changed
+        """
+        size = tuple(
+            max(min(n, board), 1) for n, board in zip(size, self.board)
+        )
+        if size == self.size:
+            return False
+        self.size = size
+        self.origin = self._clamp(self.origin)
+        return True
+
+    def contains(self, pos):
+        """Check if a square is shown"""
+        x, y = pos[0] - self.origin[0], pos[1] - self.origin[1]
+        return 0 <= x < self.size[0] and 0 <= y < self.size[1]
+
+    def pan(self, direction):
+        """Move the view a quarter of its size in a direction, and stop
+        following the target
+
+        Parameters
+        ----------
+        direction: Point
+            One of the LEFT, RIGHT, UP, DOWN points in util
+        """
+        self.following = False
+        step_x, step_y = (max(n // 4, 1) for n in self.size)
+        self.origin = self._clamp((
+            self.origin[0] + direction[0] * step_x,
+            self.origin[1] + direction[1] * step_y,
+        ))
+
+    def follow(self, target=None):
+        """Follow a snake, by default the last one followed"""
+        if target is not None:
+            self.target = target
+        self.following = self.target is not None
+
+    def update(self):
+        """Scroll to keep the target's head away from the edges, centring
+        the view on it once it's within a quarter of the size of one
+
+        Returns
+        -------
+        bool
+            Whether the view moved
+        """
+        target = self.target
+        if (not self.following or target.grid is None
+                or self.size == self.board):
+            # Not following, the snake has left the game, or there's
+            # nowhere to scroll to
+            return False
+        head = target.head
+        for i in range(2):
+            margin = self.size[i] // 4
+            offset = head[i] - self.origin[i]
+            if not margin <= offset < self.size[i] - margin:
+                break
+        else:
+            return False
+        origin = self._clamp(
+            (head[0] - self.size[0] // 2, head[1] - self.size[1] // 2)
+        )
+        if origin == self.origin:
+            return False
+        self.origin = origin
+        return True
+
+    def _clamp(self, origin):
+        """The nearest origin to one which keeps the view on the board"""
+        return Point(*(
+            max(min(o, board - n), 0)
+            for o, board, n in zip(origin, self.board, self.size)
+        ))